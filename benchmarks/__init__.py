@@ -0,0 +1,19 @@
+"""
+Offline benchmarks for the ZaubaCorp client and API.
+
+Nothing here talks to zaubacorp.com: company pages and typeahead responses
+are replayed from ``benchmarks/fixtures`` by a local stand-in server. The
+bundled fixtures are synthetic pages in ZaubaCorp's layout; replace them
+with live recordings via ``python -m benchmarks.record_fixtures``.
+
+    python -m benchmarks.micro                     # parsing micro-benchmarks
+    python -m benchmarks.load --concurrency 50     # end-to-end against main.app
+    python -m benchmarks.cold_start                # import + first request, fresh processes
+    python -m benchmarks.sessions                  # throughput vs. number of upstream sessions
+    python -m benchmarks.mock_server --port 8765   # stand-in server on its own
+
+Every runner prints throughput, p50/p95/p99 latency and peak RSS. Pass
+``--save-baseline FILE`` to record a run and ``--baseline FILE`` to compare
+against one; the runner exits non-zero when a benchmark regresses by more
+than ``--tolerance``.
+"""
@@ -0,0 +1,127 @@
+# ============================================================================
+# benchmarks/cold_start.py
+# ============================================================================
+
+"""Cold-start cost of main.py: import time and first-request latency in fresh processes"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+from .common import add_report_arguments, peak_rss_mb, report, summarize
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+async def first_request(app, path: str) -> int:
+    """Run the app's startup handlers, then one bare ASGI GET; returns the status
+
+    Talks ASGI directly so no HTTP client is imported into the measured process.
+    """
+    await app.router.startup()
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    path, _, query = path.partition("?")
+    await app({
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query.encode(),
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 0),
+        "server": ("bench", 80),
+    }, receive, send)
+    return status
+
+
+def child(path: str):
+    """Measured side: import main, serve ``path`` once and print the timings as JSON"""
+    started = time.perf_counter()
+    import main
+    imported = time.perf_counter()
+    status = asyncio.run(first_request(main.app, path))
+    finished = time.perf_counter()
+    print(json.dumps({
+        "import_s": imported - started,
+        "first_request_s": finished - imported,
+        "status": status,
+        "peak_rss_mb": peak_rss_mb(),
+    }))
+
+
+def spawn(path: str, env: Dict[str, str]) -> Dict:
+    started = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.cold_start", "--child", path],
+        cwd=ROOT, env=env, check=True, capture_output=True, text=True).stdout
+    sample = json.loads(output.strip().splitlines()[-1])
+    sample["process_s"] = time.perf_counter() - started
+    return sample
+
+
+def run(args: argparse.Namespace) -> List[Dict]:
+    from .mock_server import MockZaubaServer
+
+    server = MockZaubaServer(latency=args.latency).start()
+    base_env = dict(os.environ, ZAUBA_BASE_URL=server.url,
+                    ZAUBA_PAGE_RATE="0", ZAUBA_TYPEAHEAD_RATE="0")
+    base_env.pop("VERCEL", None)
+    paths = ["/health", "/", "/company/BENCH1"]
+
+    results = []
+    try:
+        for mode in ("eager", "lazy"):
+            env = dict(base_env, ZAUBA_LAZY_INIT="1" if mode == "lazy" else "0")
+            for path in paths:
+                samples = [spawn(path, env) for _ in range(args.samples)]
+                bad = [sample["status"] for sample in samples if sample["status"] != 200]
+                if bad:
+                    raise RuntimeError(f"GET {path} ({mode}) answered {bad[0]}")
+                # Importing does not depend on the path; report it once per mode
+                metrics = [("first GET " + path, "first_request_s"), ("process " + path, "process_s")]
+                if path == paths[0]:
+                    metrics.insert(0, ("import main", "import_s"))
+                for label, key in metrics:
+                    latencies = [sample[key] for sample in samples]
+                    result = summarize(f"{label} [{mode}]", latencies, sum(latencies))
+                    result["peak_rss_mb"] = max(sample["peak_rss_mb"] for sample in samples)
+                    results.append(result)
+    finally:
+        server.stop()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--samples", type=int, default=5, help="fresh processes per scenario")
+    parser.add_argument("--latency", type=float, default=0.05, help="stand-in server latency, seconds")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    add_report_arguments(parser)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child)
+        return
+    sys.exit(report(run(args), args))
+
+
+if __name__ == "__main__":
+    main()
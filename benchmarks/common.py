@@ -0,0 +1,100 @@
+# ============================================================================
+# benchmarks/common.py
+# ============================================================================
+
+import argparse
+import json
+import os
+import resource
+import sys
+from typing import Dict, List
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def load_fixture(name: str) -> bytes:
+    """Read a recorded response from benchmarks/fixtures"""
+    with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+        return f.read()
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1,
+                      int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MiB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and KiB on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def summarize(name: str, latencies: List[float], elapsed: float) -> Dict:
+    """Throughput and latency percentiles for one benchmark, latencies in seconds"""
+    ordered = sorted(latencies)
+    return {
+        "name": name,
+        "count": len(ordered),
+        "throughput": len(ordered) / elapsed if elapsed > 0 else 0.0,
+        "p50_ms": percentile(ordered, 50) * 1000,
+        "p95_ms": percentile(ordered, 95) * 1000,
+        "p99_ms": percentile(ordered, 99) * 1000,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def add_report_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--baseline", help="compare against a saved baseline JSON file")
+    parser.add_argument("--save-baseline", help="write this run to a baseline JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.20,
+                        help="allowed slowdown vs baseline before failing (default 0.20)")
+
+
+def find_regressions(results: List[Dict], baseline: List[Dict], tolerance: float) -> List[str]:
+    """Benchmarks whose p50/p95 grew or throughput dropped by more than ``tolerance``"""
+    previous = {result["name"]: result for result in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get(result["name"])
+        if before is None:
+            continue
+        for key in ("p50_ms", "p95_ms"):
+            if before[key] > 0 and result[key] > before[key] * (1 + tolerance):
+                regressions.append(
+                    f"{result['name']}: {key} {before[key]:.3f} -> {result[key]:.3f}")
+        if before["throughput"] > 0 and result["throughput"] < before["throughput"] * (1 - tolerance):
+            regressions.append(
+                f"{result['name']}: throughput {before['throughput']:.1f} -> {result['throughput']:.1f}/s")
+    return regressions
+
+
+def report(results: List[Dict], args: argparse.Namespace) -> int:
+    """Print results, handle baselines and return the process exit code"""
+    print(f"{'benchmark':<40} {'count':>7} {'ops/s':>11} {'p50 ms':>10} "
+          f"{'p95 ms':>10} {'p99 ms':>10} {'rss MiB':>9}")
+    for result in results:
+        print(f"{result['name']:<40} {result['count']:>7} {result['throughput']:>11.1f} "
+              f"{result['p50_ms']:>10.3f} {result['p95_ms']:>10.3f} "
+              f"{result['p99_ms']:>10.3f} {result['peak_rss_mb']:>9.1f}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline written to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = find_regressions(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\nRegressions beyond {args.tolerance:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\nNo regressions beyond {args.tolerance:.0%} vs {args.baseline}")
+    return 0
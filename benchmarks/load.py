@@ -0,0 +1,104 @@
+# ============================================================================
+# benchmarks/load.py
+# ============================================================================
+
+"""End-to-end load test of the FastAPI app in main.py against the local stand-in server"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from typing import Dict, List
+
+import httpx
+
+from .common import add_report_arguments, report, summarize
+from .mock_server import MockZaubaServer
+
+
+async def drive(app, paths: List[str], concurrency: int, method: str = "GET") -> Dict:
+    """Send every path through the app with at most ``concurrency`` requests in flight"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    failures = 0
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as http:
+        async def one(path: str):
+            nonlocal failures
+            async with semaphore:
+                t0 = time.perf_counter()
+                response = await http.request(method, path)
+                latencies.append(time.perf_counter() - t0)
+                if response.status_code != 200 or '"success":false' in response.text:
+                    failures += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(path) for path in paths))
+        elapsed = time.perf_counter() - started
+
+    return {"latencies": latencies, "elapsed": elapsed, "failures": failures}
+
+
+def run(args: argparse.Namespace) -> List[Dict]:
+    server = MockZaubaServer(latency=args.latency, jitter=args.jitter).start()
+
+    # main.py builds its client from the environment at import time
+    os.environ["ZAUBA_BASE_URL"] = server.url
+    os.environ.setdefault("ZAUBA_PAGE_RATE", "0")
+    os.environ.setdefault("ZAUBA_TYPEAHEAD_RATE", "0")
+    if args.parser:
+        os.environ["ZAUBA_PARSER"] = args.parser
+    import main
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    scenarios = {
+        "GET /company (cold)": [f"/company/BENCH-{i}" for i in range(args.requests)],
+        "GET /company (cached)": [f"/company/HOT-{i % 10}" for i in range(args.requests)],
+        "GET /search (cold)": [f"/search?query=bench{i}" for i in range(args.requests)],
+    }
+
+    # One event loop for every scenario: the app's pooled client is bound to it
+    async def run_scenarios() -> List[Dict]:
+        results = []
+        for name, paths in scenarios.items():
+            before = server.requests
+            outcome = await drive(main.app, paths, args.concurrency)
+            result = summarize(f"{name} c={args.concurrency}",
+                               outcome["latencies"], outcome["elapsed"])
+            result["failures"] = outcome["failures"]
+            result["upstream_requests"] = server.requests - before
+            results.append(result)
+        return results
+
+    try:
+        return asyncio.run(run_scenarios())
+    finally:
+        server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05, help="stand-in server latency, seconds")
+    parser.add_argument("--jitter", type=float, default=0.02, help="extra random latency, seconds")
+    parser.add_argument("--parser", help="ZAUBA_PARSER engine for the app under test")
+    add_report_arguments(parser)
+    args = parser.parse_args()
+
+    results = run(args)
+    exit_code = report(results, args)
+    print()
+    for result in results:
+        print(f"{result['name']}: {result['upstream_requests']} upstream requests")
+        if result["failures"]:
+            print(f"{result['name']}: {result['failures']} failed requests")
+            exit_code = 1
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# ============================================================================
+# benchmarks/micro.py
+# ============================================================================
+
+"""Micro-benchmarks for the HTML extraction helpers, replayed from recorded fixtures"""
+
+import argparse
+import gzip
+import sys
+import time
+from typing import Callable, Dict, List
+
+from bs4 import BeautifulSoup
+
+from zaubacorp_lib import ZaubaCorpClient, CompanySearchResult, Selection
+from zaubacorp_lib.extraction import parse_company_page, parse_search_page
+from zaubacorp_lib.parsers import LXML_AVAILABLE, SELECTOLAX_AVAILABLE
+from zaubacorp_lib.streaming import STREAM_READ_SIZE, StreamingPageParser
+
+from .common import add_report_arguments, load_fixture, report, summarize
+
+
+def measure(name: str, func: Callable[[], object], samples: int, inner: int) -> Dict:
+    """Time ``samples`` batches of ``inner`` calls; per-call latency is batch time / inner"""
+    func()  # warm up
+    latencies: List[float] = []
+    started = time.perf_counter()
+    for _ in range(samples):
+        t0 = time.perf_counter()
+        for _ in range(inner):
+            func()
+        latencies.append((time.perf_counter() - t0) / inner)
+    # Scale elapsed time so throughput counts calls rather than batches
+    return summarize(name, latencies, (time.perf_counter() - started) / inner)
+
+
+def run(samples: int) -> List[Dict]:
+    client = ZaubaCorpClient(parser_engine="bs4")
+    page = load_fixture("company_page.html")
+    page_text = page.decode("utf-8")
+    typeahead = load_fixture("typeahead.html").decode("utf-8")
+
+    soup = BeautifulSoup(page_text, "html.parser")
+    largest_table = max(soup.find_all("table"), key=lambda table: len(table.find_all("tr")))
+    cell_text = largest_table.find_all("td")[-1].get_text()
+    typeahead_divs = BeautifulSoup(typeahead, "html.parser").find_all("div", class_="show")
+
+    results = [
+        measure("_clean_text", lambda: client._clean_text(cell_text), samples, 1000),
+        measure("_extract_table_data", lambda: client._extract_table_data(largest_table), samples, 5),
+        measure("_extract_rc_sections", lambda: client._extract_rc_sections(soup), samples, 1),
+        measure("CompanySearchResult.from_html_div",
+                lambda: [CompanySearchResult.from_html_div(div) for div in typeahead_divs],
+                samples, 100),
+        measure("parse_search_page", lambda: parse_search_page(typeahead), samples, 20),
+    ]
+
+    engines = ["bs4", "stream"]
+    if LXML_AVAILABLE:
+        engines.append("lxml")
+    if SELECTOLAX_AVAILABLE:
+        engines.append("selectolax")
+    for engine in engines:
+        results.append(measure(f"parse_company_page[{engine}]",
+                               lambda engine=engine: parse_company_page(page, engine),
+                               samples, 1))
+    # Narrow lookups: the two leading sections only
+    narrow = Selection("basic information,share capital")
+    for engine in engines:
+        results.append(measure(f"parse_company_page[{engine}+sel]",
+                               lambda engine=engine: parse_company_page(page, engine, narrow),
+                               samples, 1))
+
+    # Whole gzipped body decoded then parsed, vs fed chunk by chunk as it would arrive
+    page_gz = gzip.compress(page)
+    chunks = [page_gz[start:start + STREAM_READ_SIZE]
+              for start in range(0, len(page_gz), STREAM_READ_SIZE)]
+
+    def stream_parse():
+        parser = StreamingPageParser("gzip")
+        for chunk in chunks:
+            parser.feed(chunk)
+        return parser.close()
+
+    results.append(measure("gunzip+parse_company_page[stream]",
+                           lambda: parse_company_page(gzip.decompress(page_gz), "stream"), samples, 1))
+    results.append(measure("StreamingPageParser[gzip]", stream_parse, samples, 1))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--samples", type=int, default=50, help="timed batches per benchmark")
+    add_report_arguments(parser)
+    args = parser.parse_args()
+    sys.exit(report(run(args.samples), args))
+
+
+if __name__ == "__main__":
+    main()
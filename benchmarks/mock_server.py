@@ -0,0 +1,169 @@
+# ============================================================================
+# benchmarks/mock_server.py
+# ============================================================================
+
+"""Local stand-in for zaubacorp.com that replays recorded fixtures with injected latency"""
+
+import argparse
+import gzip
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Set
+
+from .common import load_fixture
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+
+def encode_variants(body: bytes) -> Dict[str, bytes]:
+    """The body under every content-coding the server offers, in order of preference"""
+    variants = {}
+    if BROTLI_AVAILABLE:
+        variants["br"] = brotli.compress(body)
+    variants["gzip"] = gzip.compress(body)
+    variants["deflate"] = zlib.compress(body)
+    return variants
+
+
+class MockZaubaServer:
+    """Serve the company page fixture for any GET and the typeahead fixture for POST /typeahead
+
+    Each response waits ``latency`` seconds plus up to ``jitter`` seconds,
+    is compressed with the first of br, gzip and deflate the client
+    accepts, and carries an ETag so conditional requests can be answered
+    with 304. ``bandwidth`` (bytes per second) trickles bodies out in
+    small writes, like a slow upstream transfer.
+
+    Requests are counted per ZCSESSID cookie in ``session_requests``;
+    those carrying a ZCSESSID in ``challenged_sessions`` get a Cloudflare
+    challenge (403, ``cf-mitigated: challenge``).
+    """
+
+    def __init__(self,
+                 host: str = "127.0.0.1",
+                 port: int = 0,
+                 latency: float = 0.05,
+                 jitter: float = 0.0,
+                 company_fixture: str = "company_page.html",
+                 typeahead_fixture: str = "typeahead.html",
+                 bandwidth: Optional[float] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.bandwidth = bandwidth
+        self.company_page = load_fixture(company_fixture)
+        self.typeahead = load_fixture(typeahead_fixture)
+        self.company_page_encoded = encode_variants(self.company_page)
+        self.typeahead_encoded = encode_variants(self.typeahead)
+        self.requests = 0
+        self.session_requests: Dict[str, int] = {}
+        self.challenged_sessions: Set[str] = set()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _respond(self, body: bytes, encoded: Dict[str, bytes]):
+                session = next((cookie.strip()[len("ZCSESSID="):]
+                                for cookie in self.headers.get("Cookie", "").split(";")
+                                if cookie.strip().startswith("ZCSESSID=")), "")
+                with server._lock:
+                    server.requests += 1
+                    server.session_requests[session] = server.session_requests.get(session, 0) + 1
+                delay = server.latency + random.uniform(0, server.jitter)
+                if delay > 0:
+                    time.sleep(delay)
+
+                if session in server.challenged_sessions:
+                    self.send_response(403)
+                    self.send_header("cf-mitigated", "challenge")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                etag = '"fixture"'
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                accepted = {coding.split(";")[0].strip()
+                            for coding in self.headers.get("Accept-Encoding", "").split(",")}
+                coding = next((coding for coding in encoded if coding in accepted), None)
+                payload = encoded[coding] if coding else body
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("ETag", etag)
+                if coding:
+                    self.send_header("Content-Encoding", coding)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                if not server.bandwidth:
+                    self.wfile.write(payload)
+                    return
+                step = 4096
+                for start in range(0, len(payload), step):
+                    self.wfile.write(payload[start:start + step])
+                    self.wfile.flush()
+                    time.sleep(step / server.bandwidth)
+
+            def do_GET(self):
+                self._respond(server.company_page, server.company_page_encoded)
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                self._respond(server.typeahead, server.typeahead_encoded)
+
+        return Handler
+
+    def start(self) -> "MockZaubaServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random latency, in seconds")
+    parser.add_argument("--bandwidth", type=float, help="bytes per second to send bodies at")
+    args = parser.parse_args()
+
+    server = MockZaubaServer(args.host, args.port, args.latency, args.jitter, bandwidth=args.bandwidth)
+    print(f"Serving fixtures on {server.url} (point ZAUBA_BASE_URL here)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
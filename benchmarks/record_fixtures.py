@@ -0,0 +1,41 @@
+# ============================================================================
+# benchmarks/record_fixtures.py
+# ============================================================================
+
+"""Record live zaubacorp.com responses into benchmarks/fixtures for offline replay"""
+
+import argparse
+import os
+
+from zaubacorp_lib import ZaubaCorpClient, SearchFilter
+
+from .common import FIXTURES_DIR
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--company-id", help="company page to record as company_page.html")
+    parser.add_argument("--query", help="typeahead query to record as typeahead.html")
+    args = parser.parse_args()
+
+    client = ZaubaCorpClient()
+    try:
+        if args.company_id:
+            page = client._fetch_page(args.company_id)
+            if not page.content:
+                raise SystemExit(f"Could not fetch {args.company_id} (status {page.status})")
+            with open(os.path.join(FIXTURES_DIR, "company_page.html"), "wb") as f:
+                f.write(page.content)
+            print(f"Recorded {args.company_id} ({len(page.content)} bytes)")
+
+        if args.query:
+            page = client._post_typeahead(args.query, SearchFilter.COMPANY)
+            with open(os.path.join(FIXTURES_DIR, "typeahead.html"), "wb") as f:
+                f.write(page.content)
+            print(f"Recorded typeahead for {args.query!r} ({len(page.content)} bytes)")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+# ============================================================================
+# benchmarks/redis_server.py
+# ============================================================================
+
+"""Local stand-in for Redis covering the commands RedisBackend sends"""
+
+import argparse
+import socketserver
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from zaubacorp_lib.shared import RedisBackend
+
+
+class StandInRedisServer:
+    """In-memory RESP server: PING, AUTH, SELECT, GET, SET (EX/PX/NX/XX), DEL, EXISTS,
+    INCR, EXPIRE, PEXPIRE, PTTL, DBSIZE, FLUSHDB and RedisBackend's compare-and-delete
+    EVAL script, with key expiry
+
+    Point ``RedisBackend`` (or ``ZAUBA_SHARED_BACKEND``) at ``url`` to run
+    several workers against one shared state without a Redis install.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        # key -> (value, expires_at monotonic or None)
+        self.data: Dict[bytes, Tuple[bytes, Optional[float]]] = {}
+        self.commands = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.server = socketserver.ThreadingTCPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+    def _live(self, key: bytes) -> Optional[bytes]:
+        item = self.data.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.data[key]
+            return None
+        return value
+
+    def execute(self, args: List[bytes]):
+        """Run one command; returns the reply, or an Exception for an error reply"""
+        command = args[0].upper()
+        with self._lock:
+            self.commands += 1
+            if command == b"PING":
+                return "PONG"
+            if command in (b"AUTH", b"SELECT"):
+                return "OK"
+            if command == b"GET":
+                return self._live(args[1])
+            if command == b"SET":
+                key, value = args[1], args[2]
+                expires_at = None
+                nx = xx = False
+                options = [option.upper() for option in args[3:]]
+                for i, option in enumerate(options):
+                    if option == b"NX":
+                        nx = True
+                    elif option == b"XX":
+                        xx = True
+                    elif option == b"EX":
+                        expires_at = time.monotonic() + int(args[4 + i])
+                    elif option == b"PX":
+                        expires_at = time.monotonic() + int(args[4 + i]) / 1000
+                exists = self._live(key) is not None
+                if (nx and exists) or (xx and not exists):
+                    return None
+                self.data[key] = (value, expires_at)
+                return "OK"
+            if command == b"EVAL" and args[1].decode() == RedisBackend.DELETE_IF_EQUAL:
+                # The one script RedisBackend sends: compare-and-delete
+                if self._live(args[3]) != args[4]:
+                    return 0
+                del self.data[args[3]]
+                return 1
+            if command == b"DEL":
+                return sum(1 for key in args[1:]
+                           if self._live(key) is not None and self.data.pop(key, None))
+            if command == b"EXISTS":
+                return sum(1 for key in args[1:] if self._live(key) is not None)
+            if command == b"INCR":
+                current = self._live(args[1])
+                try:
+                    count = int(current or 0) + 1
+                except ValueError:
+                    return ValueError("ERR value is not an integer or out of range")
+                expires_at = self.data[args[1]][1] if current is not None else None
+                self.data[args[1]] = (str(count).encode(), expires_at)
+                return count
+            if command in (b"EXPIRE", b"PEXPIRE"):
+                current = self._live(args[1])
+                if current is None:
+                    return 0
+                seconds = int(args[2]) / (1000 if command == b"PEXPIRE" else 1)
+                self.data[args[1]] = (current, time.monotonic() + seconds)
+                return 1
+            if command == b"PTTL":
+                if self._live(args[1]) is None:
+                    return -2
+                expires_at = self.data[args[1]][1]
+                return -1 if expires_at is None else int((expires_at - time.monotonic()) * 1000)
+            if command == b"DBSIZE":
+                return sum(1 for key in list(self.data) if self._live(key) is not None)
+            if command == b"FLUSHDB":
+                self.data.clear()
+                return "OK"
+        return ValueError(f"ERR unknown command '{command.decode()}'")
+
+    @staticmethod
+    def _encode(reply) -> bytes:
+        if reply is None:
+            return b"$-1\r\n"
+        if isinstance(reply, Exception):
+            return b"-" + str(reply).encode() + b"\r\n"
+        if isinstance(reply, int):
+            return b":%d\r\n" % reply
+        if isinstance(reply, str):
+            return b"+" + reply.encode() + b"\r\n"
+        return b"$%d\r\n%s\r\n" % (len(reply), reply)
+
+    def _handler(self):
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                while True:
+                    line = self.rfile.readline()
+                    if not line:
+                        return
+                    count = int(line[1:-2])
+                    args = []
+                    for _ in range(count):
+                        length = int(self.rfile.readline()[1:-2])
+                        args.append(self.rfile.read(length + 2)[:-2])
+                    self.wfile.write(server._encode(server.execute(args)))
+
+        return Handler
+
+    def start(self) -> "StandInRedisServer":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6379)
+    args = parser.parse_args()
+
+    server = StandInRedisServer(args.host, args.port)
+    print(f"Serving Redis stand-in on {server.url} (point ZAUBA_SHARED_BACKEND here)")
+    try:
+        server.server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# ============================================================================
+# benchmarks/sessions.py
+# ============================================================================
+
+"""Company page throughput with 1..N upstream sessions, each on its own rate budget,
+including one challenged session that has to be quarantined"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from typing import Dict, List
+
+from .common import add_report_arguments, report, summarize
+from .mock_server import MockZaubaServer
+
+
+async def fetch_pages(client, count: int, concurrency: int) -> Dict:
+    """Fetch ``count`` distinct company pages with at most ``concurrency`` in flight"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    failures = 0
+
+    async def one(i: int):
+        nonlocal failures
+        async with semaphore:
+            t0 = time.perf_counter()
+            company_data = await client.get_company_data(f"company/BENCH-{i}/U{i:05d}")
+            latencies.append(time.perf_counter() - t0)
+            if not company_data.success:
+                failures += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(count)))
+    return {"latencies": latencies, "elapsed": time.perf_counter() - started, "failures": failures}
+
+
+def run(args: argparse.Namespace) -> List[Dict]:
+    from zaubacorp_lib import AsyncZaubaCorpClient, RateLimiter, RetryPolicy, SessionPool
+
+    server = MockZaubaServer(latency=args.latency).start()
+    limits = dict(typeahead_rate=1.0, page_rate=args.page_rate, page_burst=1)
+    scenarios = [(count, 0) for count in args.sessions] + [(max(args.sessions), 1)]
+
+    async def run_scenarios() -> List[Dict]:
+        results = []
+        for count, challenged in scenarios:
+            server.challenged_sessions = {f"bench-{i}" for i in range(challenged)}
+            pool = SessionPool.from_config(
+                [{"name": f"s{i}", "cookie": f"ZCSESSID=bench-{i}"} for i in range(count)],
+                defaults=limits)
+            client = AsyncZaubaCorpClient(
+                base_url=server.url,
+                rate_limiter=RateLimiter(typeahead_rate=None, page_rate=None),
+                retry_policy=RetryPolicy(base_delay=0.01),
+                session_pool=pool)
+            try:
+                outcome = await fetch_pages(client, args.requests, args.concurrency)
+            finally:
+                await client.aclose()
+            label = f"{count} sessions" + (f", {challenged} challenged" if challenged else "")
+            result = summarize(label, outcome["latencies"], outcome["elapsed"])
+            result["failures"] = outcome["failures"]
+            result["quarantines"] = sum(session.quarantines for session in pool.sessions)
+            results.append(result)
+        return results
+
+    try:
+        return asyncio.run(run_scenarios())
+    finally:
+        server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4],
+                        help="pool sizes to compare")
+    parser.add_argument("--requests", type=int, default=80, help="company pages per scenario")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--page-rate", type=float, default=10.0,
+                        help="company pages per second allowed per session")
+    parser.add_argument("--latency", type=float, default=0.02, help="stand-in server latency, seconds")
+    add_report_arguments(parser)
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    sys.exit(report(run(args), args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+# ============================================================================
+# conftest.py
+# ============================================================================
+
+# Present so pytest puts the repository root on sys.path for tests/
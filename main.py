@@ -5,27 +5,44 @@ Integrates financial document analysis, company search, and credit report genera
 
 import os
 import asyncio
+import time
 from datetime import datetime
 from typing import Optional
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 import logging
-from concurrent.futures import ThreadPoolExecutor
-import httpx
-from models import CompanySearchResponse, CompanyDataResponse
+from responses import (
+    CompressionMiddleware,
+    FastJSONResponse,
+    company_batch_json,
+    company_data_json,
+    dump_json,
+    search_results_json
+)
+from models import (
+    CompanySearchResponse,
+    CompanyDataResponse,
+    CompanyBatchRequest,
+    CompanyBatchResponse,
+    CompanyStreamRequest,
+    CrawlRequest,
+    WatchlistRequest,
+    ChangesResponse
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 try:
+    # Only the light modules; the client and its HTTP/HTML stack are
+    # imported by init_zauba()
     from zaubacorp_lib import (
-        ZaubaCorpClient,  # Use sync wrapper
+        Metrics,
+        Selection,
         SearchFilter,
-        CompanySearchResult,
-        CompanyData,
         ZaubaCorpError
     )
     ZAUBACORP_AVAILABLE = True
@@ -53,28 +70,242 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-zauba_client = None
-thread_pool = ThreadPoolExecutor(max_workers=10)
+# ZAUBA_COMPRESSION=1 compresses bodies of at least ZAUBA_COMPRESSION_MIN_SIZE
+# bytes with brotli (if installed) or gzip, per the client's Accept-Encoding
+if os.getenv("ZAUBA_COMPRESSION", "0") == "1":
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=int(os.getenv("ZAUBA_COMPRESSION_MIN_SIZE", "1024")),
+        gzip_level=int(os.getenv("ZAUBA_GZIP_LEVEL", "6")),
+        brotli_quality=int(os.getenv("ZAUBA_BROTLI_QUALITY", "4"))
+    )
 
-# Initialize ZaubaCorp client
-if ZAUBACORP_AVAILABLE:
+zauba_client = None
+company_index = None
+watchlist = None
+prefetcher = None
+shared_backend = None
+# ZAUBA_METRICS=1 turns on per-stage timings and the /metrics endpoint
+metrics = Metrics(enabled=os.getenv("ZAUBA_METRICS", "0") == "1") if ZAUBACORP_AVAILABLE else None
+MAX_BATCH_SIZE = int(os.getenv("ZAUBA_MAX_BATCH_SIZE", "500"))
+MAX_BATCH_CONCURRENCY = int(os.getenv("ZAUBA_MAX_BATCH_CONCURRENCY", "20"))
+# Upper bounds for a single /crawl request
+MAX_CRAWL_NODES = int(os.getenv("ZAUBA_MAX_CRAWL_NODES", "500"))
+MAX_CRAWL_DEPTH = int(os.getenv("ZAUBA_MAX_CRAWL_DEPTH", "4"))
+# Only HTML parsing runs in these pools; network I/O stays on the event loop.
+# ZAUBA_PARSE_PROCESSES > 0 moves parsing out of the GIL into worker processes
+thread_pool = None
+process_pool = None
+
+# Every search result seen is indexed locally; ZAUBA_INDEX_PATH persists the
+# index across restarts and ZAUBA_INDEX_SEED bulk-loads a CSV/JSONL dump of
+# id/name records. ZAUBA_LOCAL_FIRST=1 makes /search answer from it by default.
+LOCAL_FIRST_DEFAULT = os.getenv("ZAUBA_LOCAL_FIRST", "0") == "1"
+# ZAUBA_WATCHLIST_PATH persists watched companies and their change log;
+# ZAUBA_WATCHLIST_INTERVAL > 0 refreshes them every that many seconds
+WATCHLIST_INTERVAL = float(os.getenv("ZAUBA_WATCHLIST_INTERVAL", "0"))
+# ZAUBA_PREFETCH=1 keeps likely lookups warm in the cache: the top
+# ZAUBA_PREFETCH_SEARCH_RESULTS companies of each search, the watchlist plus
+# the comma-separated ZAUBA_PREFETCH_WATCHLIST, and recently requested pages
+PREFETCH_SEARCH_RESULTS = int(os.getenv("ZAUBA_PREFETCH_SEARCH_RESULTS", "3"))
+# ZAUBA_SHARED_BACKEND (redis://host:port/db or sqlite:///path) shares the
+# second cache tier, the upstream rate budget and in-flight fetches between
+# every worker process pointed at it, replacing ZAUBA_CACHE_PATH
+SHARED_BACKEND_URL = os.getenv("ZAUBA_SHARED_BACKEND")
+# ZAUBA_LAZY_INIT=1 (the default on Vercel) builds the client, its pools and
+# stores on the first request that needs them instead of at import, so cold
+# starts answering /, /health or /metrics skip requests, httpx and bs4
+LAZY_INIT = os.getenv("ZAUBA_LAZY_INIT", "1" if os.getenv("VERCEL") else "0") == "1"
+# ZAUBA_SESSIONS (a JSON list inline, or a path to one) holds several upstream
+# credential sets, e.g. [{"name": "a", "cookie": "ZCSESSID=...; cf_clearance=..."}].
+# Requests are spread across them and the ZAUBA_*_RATE/BURST budgets apply per
+# session, so throughput scales with their number. A session challenged, failing
+# ZAUBA_SESSION_FAILURES times in a row or below ZAUBA_SESSION_MIN_SUCCESS is
+# quarantined for ZAUBA_SESSION_QUARANTINE seconds, doubling on relapse
+SESSIONS_SOURCE = os.getenv("ZAUBA_SESSIONS")
+zauba_initialized = False
+
+
+def init_zauba():
+    """Build the ZaubaCorp client and what it uses; runs once"""
+    global zauba_initialized, ZAUBACORP_AVAILABLE, thread_pool, process_pool
+    global zauba_client, company_index, watchlist, prefetcher, shared_backend
+    if zauba_initialized:
+        return
+    zauba_initialized = True
+    if not ZAUBACORP_AVAILABLE:
+        return
+    try:
+        from zaubacorp_lib import (
+            AsyncZaubaCorpClient,
+            RateLimiter,
+            ResponseCache,
+            LRUCache,
+            SQLiteCache,
+            RetryPolicy,
+            CircuitBreaker,
+            CompanyIndex,
+            Watchlist,
+            PrefetchScheduler,
+            SharedCache,
+            SharedRateLimiter,
+            SharedSingleFlight,
+            SessionPool,
+            backend_from_url
+        )
+    except ImportError as e:
+        logger.warning(f"⚠️  Warning: Could not import zaubacorp_lib: {e}")
+        ZAUBACORP_AVAILABLE = False
+        return
+    from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+    thread_pool = ThreadPoolExecutor(max_workers=10)
+    parse_processes = int(os.getenv("ZAUBA_PARSE_PROCESSES", "0"))
+    process_pool = ProcessPoolExecutor(
+        max_workers=parse_processes) if parse_processes > 0 else None
     try:
-        zauba_client = ZaubaCorpClient(delay_between_requests=1.0)
+        company_index = CompanyIndex(os.getenv("ZAUBA_INDEX_PATH") or None)
+        if os.getenv("ZAUBA_INDEX_SEED"):
+            loaded = company_index.load_file(os.environ["ZAUBA_INDEX_SEED"])
+            logger.info(f"Company index seeded with {loaded} new entries ({len(company_index)} total)")
+        watchlist = Watchlist(os.getenv("ZAUBA_WATCHLIST_PATH") or None)
+        disk_cache_ttl = float(os.getenv("ZAUBA_DISK_CACHE_TTL", "86400"))
+        rate_limits = dict(
+            typeahead_rate=float(os.getenv("ZAUBA_TYPEAHEAD_RATE", "1.0")),
+            typeahead_burst=int(os.getenv("ZAUBA_TYPEAHEAD_BURST", "3")),
+            page_rate=float(os.getenv("ZAUBA_PAGE_RATE", "5.0")),
+            page_burst=int(os.getenv("ZAUBA_PAGE_BURST", "10"))
+        )
+        if SHARED_BACKEND_URL:
+            shared_backend = backend_from_url(SHARED_BACKEND_URL)
+            disk_cache = SharedCache(shared_backend, ttl=disk_cache_ttl)
+            rate_limiter = SharedRateLimiter(shared_backend, **rate_limits)
+            logger.info(f"Sharing cache, rate budget and fetches via {SHARED_BACKEND_URL}")
+        else:
+            disk_cache = SQLiteCache(
+                os.environ["ZAUBA_CACHE_PATH"], ttl=disk_cache_ttl
+            ) if os.getenv("ZAUBA_CACHE_PATH") else None
+            rate_limiter = RateLimiter(**rate_limits)
+        session_pool = None
+        if SESSIONS_SOURCE:
+            if shared_backend:
+                def session_budget(name, limits):
+                    return SharedRateLimiter(shared_backend, prefix=f"zauba:ratelimit:{name}:", **limits)
+            else:
+                def session_budget(name, limits):
+                    return RateLimiter(**limits)
+            session_pool = SessionPool.load(
+                SESSIONS_SOURCE,
+                defaults=rate_limits,
+                rate_limiter_factory=session_budget,
+                failure_threshold=int(os.getenv("ZAUBA_SESSION_FAILURES", "3")),
+                min_success_rate=float(os.getenv("ZAUBA_SESSION_MIN_SUCCESS", "0.5")),
+                quarantine_seconds=float(os.getenv("ZAUBA_SESSION_QUARANTINE", "60"))
+            )
+            # The budgets are per session now; nothing else caps the total
+            rate_limiter = RateLimiter(typeahead_rate=None, page_rate=None)
+            logger.info(f"Spreading upstream requests over {len(session_pool)} sessions")
+        zauba_client = AsyncZaubaCorpClient(
+            parse_executor=process_pool or thread_pool,
+            parser_engine=os.getenv("ZAUBA_PARSER", "auto"),
+            base_url=os.getenv("ZAUBA_BASE_URL", "https://www.zaubacorp.com"),
+            cache=ResponseCache(
+                memory=LRUCache(
+                    max_entries=int(os.getenv("ZAUBA_CACHE_SIZE", "2048")),
+                    ttl=float(os.getenv("ZAUBA_CACHE_TTL", "3600")),
+                    # Approximate, as the JSON length of the cached pages
+                    max_bytes=int(os.environ["ZAUBA_CACHE_MAX_BYTES"]) if os.getenv("ZAUBA_CACHE_MAX_BYTES") else None
+                ),
+                disk=disk_cache
+            ),
+            rate_limiter=rate_limiter,
+            session_pool=session_pool,
+            shared_flight=SharedSingleFlight(shared_backend) if shared_backend else None,
+            metrics=metrics,
+            index=company_index,
+            # Retries back off with jitter inside ZAUBA_RETRY_DEADLINE seconds;
+            # ZAUBA_BREAKER_THRESHOLD failures in a row open the circuit for
+            # ZAUBA_BREAKER_RECOVERY seconds, serving stale cache or failing fast
+            retry_policy=RetryPolicy(
+                max_attempts=int(os.getenv("ZAUBA_RETRY_ATTEMPTS", "3")),
+                base_delay=float(os.getenv("ZAUBA_RETRY_BASE_DELAY", "0.25")),
+                max_retry_after=float(os.getenv("ZAUBA_RETRY_MAX_RETRY_AFTER", "10")),
+                deadline=float(os.getenv("ZAUBA_RETRY_DEADLINE", "15"))
+            ),
+            # Expired pages up to ZAUBA_MAX_STALE seconds past their TTL are
+            # served at once, flagged stale, and refreshed in the background
+            max_stale=float(os.getenv("ZAUBA_MAX_STALE", "0")),
+            # ZAUBA_STREAM_PARSE=1 parses company pages while they download
+            stream_parse=os.getenv("ZAUBA_STREAM_PARSE", "0") == "1",
+            circuit_breaker=CircuitBreaker(
+                failure_threshold=int(os.getenv("ZAUBA_BREAKER_THRESHOLD", "5")),
+                recovery_timeout=float(os.getenv("ZAUBA_BREAKER_RECOVERY", "30"))
+            )
+        )
+        if os.getenv("ZAUBA_PREFETCH", "0") == "1":
+            prefetcher = PrefetchScheduler(
+                zauba_client,
+                workers=int(os.getenv("ZAUBA_PREFETCH_WORKERS", "2")),
+                refresh_ahead=float(os.getenv("ZAUBA_PREFETCH_REFRESH_AHEAD", "0.1")),
+                keep_warm=float(os.getenv("ZAUBA_PREFETCH_KEEP_WARM", "3600")),
+                headroom=float(os.getenv("ZAUBA_PREFETCH_HEADROOM", "1"))
+            )
+            prefetcher.watch(watchlist.company_ids())
+            prefetcher.watch(
+                company_id.strip()
+                for company_id in os.getenv("ZAUBA_PREFETCH_WATCHLIST", "").split(",")
+                if company_id.strip())
         logger.info("✅ ZaubaCorp client initialized successfully")
     except Exception as e:
         logger.error(f"❌ Could not initialize ZaubaCorp client: {e}")
 
+
+def start_background_tasks():
+    """Start the prefetch workers and, with ZAUBA_WATCHLIST_INTERVAL, watchlist refreshes"""
+    if prefetcher is not None:
+        prefetcher.start()
+    if (zauba_client and watchlist is not None and WATCHLIST_INTERVAL > 0
+            and getattr(app.state, "watchlist_poller", None) is None):
+        app.state.watchlist_poller = asyncio.create_task(_poll_watchlist())
+
+
+def get_zauba_client():
+    """The client, or None if unavailable; with ZAUBA_LAZY_INIT the first call builds it
+
+    Only call from a running event loop, which the background tasks start on.
+    """
+    if not zauba_initialized:
+        started = time.perf_counter()
+        init_zauba()
+        start_background_tasks()
+        logger.info(f"ZaubaCorp client initialized lazily in {time.perf_counter() - started:.3f}s")
+    return zauba_client
+
+
+if not LAZY_INIT:
+    init_zauba()
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Observe end-to-end latency per route, method and status"""
+    if metrics is None or not metrics.enabled:
+        return await call_next(request)
+
+    started = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    metrics.observe("http_request_seconds", time.perf_counter() - started,
+                    route=getattr(route, "path", "unmatched"),
+                    method=request.method,
+                    status=str(response.status_code))
+    return response
+
 # =============================================================================
 # API ENDPOINTS - HEALTH & INFO
 # =============================================================================
 
 
-async def run_in_thread(func, *args, **kwargs):
-    """Run synchronous function in thread pool"""
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(thread_pool, func, *args, **kwargs)
-
-
 @app.get("/")
 async def root():
     return {
@@ -96,10 +327,29 @@ async def health_check():
         "services": {}
     }
     # Check ZaubaCorp
-    health_status["services"]["zaubacorp"] = "available" if zauba_client else "not_available"
+    if zauba_client:
+        health_status["services"]["zaubacorp"] = "available"
+    elif ZAUBACORP_AVAILABLE and not zauba_initialized:
+        health_status["services"]["zaubacorp"] = "not_initialized"
+    else:
+        health_status["services"]["zaubacorp"] = "not_available"
+    if zauba_client:
+        health_status["upstream_circuit"] = zauba_client.circuit_breaker.state
+        health_status["sessions"] = zauba_client.sessions.snapshot()
+    if zauba_client and zauba_client.cache is not None:
+        health_status["cache_revalidation"] = zauba_client.cache.stats.as_dict()
+    if prefetcher is not None:
+        health_status["prefetch"] = prefetcher.stats
 
     return health_status
 
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """Prometheus scrape endpoint; empty unless ZAUBA_METRICS=1"""
+    body = metrics.render() if metrics is not None and metrics.enabled else ""
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
+
 # =============================================================================
 # API ENDPOINTS - COMPANY SEARCH (ZaubaCorp)
 # =============================================================================
@@ -109,10 +359,15 @@ async def health_check():
 async def search_companies(
     query: str,
     filter_type: str = "company",
-    max_results: Optional[int] = 10
+    max_results: Optional[int] = 10,
+    local_first: Optional[bool] = None
 ):
-    """Search for companies using ZaubaCorp API"""
-    if not zauba_client:
+    """Search for companies using ZaubaCorp API
+
+    ``local_first=true`` answers from the local company index when it has
+    matches and only goes upstream when it has none.
+    """
+    if not get_zauba_client():
         raise HTTPException(
             status_code=503,
             detail="ZaubaCorp service not available"
@@ -128,34 +383,20 @@ async def search_companies(
                 detail=f"Invalid filter_type. Must be one of: {[f.value for f in SearchFilter]}"
             )
 
-        # Perform search in thread pool
-        results = await run_in_thread(
-            zauba_client.search_companies,
+        results = await zauba_client.search_companies(
             query,
             search_filter,
-            max_results
+            max_results,
+            local_first=LOCAL_FIRST_DEFAULT if local_first is None else local_first
         )
+        if prefetcher is not None:
+            prefetcher.prefetch_search_results(results, PREFETCH_SEARCH_RESULTS)
 
-        # Convert results to dict format
-        results_dict = [
-            {"id": result.id, "name": result.name}
-            for result in results
-        ]
-
-        return CompanySearchResponse(
-            success=True,
-            results=results_dict,
-            total_found=len(results_dict)
-        )
+        return FastJSONResponse(search_results_json(results))
 
     except ZaubaCorpError as e:
         logger.error(f"ZaubaCorp search error: {str(e)}")
-        return CompanySearchResponse(
-            success=False,
-            results=[],
-            total_found=0,
-            error_message=str(e)
-        )
+        return FastJSONResponse(search_results_json([], error_message=str(e)))
     except Exception as e:
         logger.error(f"Unexpected search error: {str(e)}")
         raise HTTPException(
@@ -164,29 +405,81 @@ async def search_companies(
         )
 
 
+def _parse_cache_control(value: Optional[str]):
+    """(max_age, max_stale, no_cache) from a request Cache-Control header
+
+    ``no-cache`` asks for a revalidated page, never a stale one; a bare
+    ``max-stale`` accepts any staleness.
+    """
+    max_age = max_stale = None
+    no_cache = False
+    for directive in (value or "").split(","):
+        name, _, argument = directive.strip().lower().partition("=")
+        argument = argument.strip('"')
+        try:
+            if name == "max-age":
+                max_age = float(argument)
+            elif name == "no-cache":
+                no_cache = True
+            elif name == "max-stale":
+                max_stale = float(argument) if argument else float("inf")
+        except ValueError:
+            continue
+    return max_age, max_stale, no_cache
+
+
 @app.get("/company/{company_id}", response_model=CompanyDataResponse)
-async def get_company_data(company_id: str):
-    """Get complete company data by company ID from ZaubaCorp"""
-    if not zauba_client:
+async def get_company_data(company_id: str,
+                           request: Request,
+                           refresh: bool = False,
+                           sections: Optional[str] = None,
+                           fields: Optional[str] = None,
+                           max_age: Optional[float] = None,
+                           max_stale: Optional[float] = None):
+    """Get complete company data by company ID from ZaubaCorp
+
+    ``refresh=true`` (or ``Cache-Control: no-cache``) revalidates the cached
+    page with a conditional request.
+    ``sections=director,charges`` returns only the first section whose title
+    contains each name, and ``fields=tables`` only those parts of each section.
+
+    ``max_age`` and ``max_stale`` (seconds; also read from the request's
+    ``Cache-Control`` header) bound the cached page's age. A page past
+    ``max_age`` but within ``max_stale`` is returned at once with
+    ``stale=true`` while it is refreshed in the background.
+    """
+    if not get_zauba_client():
         raise HTTPException(
             status_code=503,
             detail="ZaubaCorp service not available"
         )
 
     try:
-        # Get company data in thread pool
-        company_data = await run_in_thread(
-            zauba_client.get_company_data,
-            company_id
-        )
+        Selection(sections, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        return CompanyDataResponse(
-            success=company_data.success,
-            company_id=company_data.company_id,
-            rc_sections=company_data.rc_sections,
-            extraction_timestamp=company_data.extraction_timestamp,
-            error_message=company_data.error_message
-        )
+    header_max_age, header_max_stale, no_cache = _parse_cache_control(request.headers.get("cache-control"))
+    refresh = refresh or no_cache
+    if max_age is None:
+        max_age = header_max_age
+    if max_stale is None:
+        max_stale = header_max_stale
+
+    if prefetcher is not None:
+        prefetcher.touch(company_id)
+
+    try:
+        company_data = await zauba_client.get_company_data(
+            company_id, refresh=refresh, sections=sections, fields=fields,
+            max_age=max_age, max_stale=max_stale)
+
+        response = FastJSONResponse(company_data_json(company_data))
+        if company_data.cache_hit and company_data.cache_age is not None:
+            response.headers["Age"] = str(int(company_data.cache_age))
+        if company_data.stale:
+            response.headers["Warning"] = '110 - "Response is Stale"'
+        return response
 
     except Exception as e:
         logger.error(f"Unexpected error getting company data: {str(e)}")
@@ -195,17 +488,256 @@ async def get_company_data(company_id: str):
             detail="Internal server error during data extraction"
         )
 
+
+@app.post("/companies/batch", response_model=CompanyBatchResponse)
+async def get_companies_batch(request: CompanyBatchRequest):
+    """Get data for many companies at once, results in request order"""
+    if not get_zauba_client():
+        raise HTTPException(
+            status_code=503,
+            detail="ZaubaCorp service not available"
+        )
+
+    if len(request.company_ids) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many company_ids. Maximum batch size is {MAX_BATCH_SIZE}"
+        )
+
+    concurrency = min(request.concurrency or MAX_BATCH_CONCURRENCY,
+                      MAX_BATCH_CONCURRENCY)
+
+    try:
+        companies = await zauba_client.get_companies_data(
+            request.company_ids,
+            concurrency=concurrency
+        )
+
+        return FastJSONResponse(company_batch_json(companies))
+
+    except Exception as e:
+        logger.error(f"Unexpected error getting batch company data: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail="Internal server error during batch data extraction"
+        )
+
+
+@app.post("/companies/stream")
+async def stream_companies(request: CompanyStreamRequest):
+    """Stream one CompanyDataResponse JSON line per company as soon as it is parsed
+
+    Takes either ``company_ids`` or a search ``query``. Lines arrive in
+    completion order, not request order.
+    """
+    if not get_zauba_client():
+        raise HTTPException(
+            status_code=503,
+            detail="ZaubaCorp service not available"
+        )
+
+    if bool(request.company_ids) == bool(request.query):
+        raise HTTPException(
+            status_code=400,
+            detail="Provide exactly one of company_ids or query"
+        )
+
+    company_ids = request.company_ids
+    if request.query:
+        try:
+            search_filter = SearchFilter(request.filter_type)
+        except ValueError:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid filter_type. Must be one of: {[f.value for f in SearchFilter]}"
+            )
+        try:
+            results = await zauba_client.search_companies(
+                request.query,
+                search_filter,
+                request.max_results
+            )
+        except ZaubaCorpError as e:
+            raise HTTPException(status_code=502, detail=str(e))
+        company_ids = [result.id for result in results]
+
+    concurrency = min(request.concurrency or MAX_BATCH_CONCURRENCY,
+                      MAX_BATCH_CONCURRENCY)
+
+    async def ndjson_lines():
+        async for company_data in zauba_client.iter_companies_data(
+                company_ids, concurrency=concurrency):
+            yield company_data_json(company_data) + b"\n"
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+
+@app.post("/crawl")
+async def crawl(request: CrawlRequest):
+    """Stream the company/director network around the seeds as NDJSON
+
+    Each line is a node (``"type": "node"``) once its page is fetched, or
+    an edge (``"type": "edge"``) found on it. Depth, node count and
+    concurrency are capped by the server.
+    """
+    if not get_zauba_client():
+        raise HTTPException(
+            status_code=503,
+            detail="ZaubaCorp service not available"
+        )
+
+    if not request.company_ids and not request.director_names:
+        raise HTTPException(
+            status_code=400,
+            detail="Provide company_ids and/or director_names"
+        )
+
+    from zaubacorp_lib.crawler import Crawler
+
+    crawler = Crawler(
+        zauba_client,
+        max_depth=max(0, min(request.max_depth, MAX_CRAWL_DEPTH)),
+        max_nodes=min(request.max_nodes or MAX_CRAWL_NODES, MAX_CRAWL_NODES),
+        concurrency=min(request.concurrency or MAX_BATCH_CONCURRENCY, MAX_BATCH_CONCURRENCY)
+    )
+
+    async def ndjson_lines():
+        try:
+            async for event in crawler.crawl(request.company_ids, request.director_names):
+                yield dump_json(event.to_dict()) + b"\n"
+        except ZaubaCorpError as e:
+            yield dump_json({'type': 'error', 'error_message': str(e)}) + b"\n"
+        finally:
+            crawler.close()
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+# =============================================================================
+# API ENDPOINTS - WATCHLIST & CHANGES
+# =============================================================================
+
+
+def _require_watchlist():
+    if not get_zauba_client() or watchlist is None:
+        raise HTTPException(
+            status_code=503,
+            detail="ZaubaCorp service not available"
+        )
+
+
+@app.get("/watchlist")
+async def get_watchlist():
+    """Company IDs currently watched"""
+    _require_watchlist()
+    company_ids = watchlist.company_ids()
+    return {"company_ids": company_ids, "total": len(company_ids)}
+
+
+@app.post("/watchlist")
+async def add_to_watchlist(request: WatchlistRequest):
+    """Watch more companies; their first refresh records a baseline snapshot"""
+    _require_watchlist()
+    added = watchlist.add(request.company_ids)
+    if prefetcher is not None:
+        prefetcher.watch(request.company_ids)
+    return {"added": added, "total": len(watchlist)}
+
+
+@app.delete("/watchlist/{company_id:path}")
+async def remove_from_watchlist(company_id: str):
+    _require_watchlist()
+    removed = watchlist.remove([company_id])
+    if prefetcher is not None:
+        prefetcher.unwatch([company_id])
+    if not removed:
+        raise HTTPException(status_code=404, detail="Company is not watched")
+    return {"removed": removed, "total": len(watchlist)}
+
+
+@app.post("/watchlist/refresh", response_model=ChangesResponse)
+async def refresh_watchlist(concurrency: Optional[int] = None):
+    """Refetch every watched company now and return the changes found"""
+    _require_watchlist()
+    try:
+        changes = await zauba_client.refresh_watchlist(
+            watchlist,
+            concurrency=min(concurrency or MAX_BATCH_CONCURRENCY, MAX_BATCH_CONCURRENCY)
+        )
+    except Exception as e:
+        logger.error(f"Unexpected error refreshing watchlist: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail="Internal server error during watchlist refresh"
+        )
+    return FastJSONResponse(dump_json({
+        "changes": [company_changes.to_dict() for company_changes in changes],
+        "next_since": max((company_changes.sequence for company_changes in changes), default=0)
+    }))
+
+
+@app.get("/changes", response_model=ChangesResponse)
+async def get_changes(since: int = 0,
+                      company_id: Optional[str] = None,
+                      limit: int = 100):
+    """Changes detected on watched companies after sequence ``since``, oldest first
+
+    Pass the returned ``next_since`` back to read only newer changes.
+    """
+    _require_watchlist()
+    changes = watchlist.changes(since=since, company_id=company_id,
+                                limit=max(1, min(limit, MAX_BATCH_SIZE)))
+    return FastJSONResponse(dump_json({
+        "changes": [company_changes.to_dict() for company_changes in changes],
+        "next_since": changes[-1].sequence if changes else since
+    }))
+
+
+async def _poll_watchlist():
+    while True:
+        await asyncio.sleep(WATCHLIST_INTERVAL)
+        try:
+            changes = await zauba_client.refresh_watchlist(
+                watchlist, concurrency=MAX_BATCH_CONCURRENCY)
+            if changes:
+                logger.info(f"Watchlist refresh found changes in {len(changes)} companies")
+        except Exception as e:
+            logger.error(f"Watchlist refresh failed: {str(e)}")
+
+
+@app.on_event("startup")
+async def startup_event():
+    """Start background tasks of a client built at import; lazy clients start them on first use"""
+    if zauba_initialized:
+        start_background_tasks()
+
 # Cleanup on shutdown
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Clean up resources on shutdown"""
+    poller = getattr(app.state, "watchlist_poller", None)
+    if poller is not None:
+        poller.cancel()
+    if prefetcher is not None:
+        await prefetcher.stop()
     if zauba_client:
         try:
-            zauba_client.close()
+            await zauba_client.aclose()
+            if zauba_client.cache is not None:
+                zauba_client.cache.close()
+            if zauba_client.index is not None:
+                zauba_client.index.close()
+            if watchlist is not None:
+                watchlist.close()
+            if shared_backend is not None:
+                shared_backend.close()
         except:
             pass
+    if thread_pool:
+        thread_pool.shutdown(wait=False)
+    if process_pool:
+        process_pool.shutdown(wait=False)
 
 # =============================================================================
 # MAIN
@@ -53,6 +53,47 @@ class CompanyDataResponse(BaseModel):
     rc_sections: Dict[str, Any]
     extraction_timestamp: str
     error_message: Optional[str] = None
+    cache_hit: bool = False
+    cache_age: Optional[float] = None
+    stale: bool = False
+
+
+class CompanyBatchRequest(BaseModel):
+    company_ids: List[str]
+    concurrency: Optional[int] = None
+
+
+class CompanyStreamRequest(BaseModel):
+    company_ids: Optional[List[str]] = None
+    query: Optional[str] = None
+    filter_type: str = "company"
+    max_results: Optional[int] = 10
+    concurrency: Optional[int] = None
+
+
+class CrawlRequest(BaseModel):
+    company_ids: List[str] = []
+    director_names: List[str] = []
+    max_depth: int = 2
+    max_nodes: Optional[int] = None
+    concurrency: Optional[int] = None
+
+
+class CompanyBatchResponse(BaseModel):
+    success: bool
+    results: List[CompanyDataResponse]
+    total: int
+    succeeded: int
+    failed: int
+
+
+class WatchlistRequest(BaseModel):
+    company_ids: List[str]
+
+
+class ChangesResponse(BaseModel):
+    changes: List[Dict[str, Any]]
+    next_since: int
 
 # Credit report models
 
@@ -0,0 +1,166 @@
+# =============================================================================
+# RESPONSE SERIALIZATION & COMPRESSION
+# =============================================================================
+
+"""Fast JSON response bodies and gzip/brotli compression for main.py
+
+Bodies are byte-for-byte what FastAPI's default ``JSONResponse`` renders
+for the same response models (compact separators, UTF-8, model field
+order), only without building and re-validating the Pydantic models.
+orjson and brotli are optional: without them the stdlib encoder is used
+and only gzip is offered.
+"""
+
+import json
+from typing import Any, Dict
+
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipResponder, IdentityResponder
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+
+def _dumps_std(content: Any) -> str:
+    return json.dumps(content, ensure_ascii=False, allow_nan=False,
+                      indent=None, separators=(",", ":"))
+
+
+def dump_json(content: Any) -> bytes:
+    """Compact UTF-8 JSON for string/int/bool/None trees, via orjson when installed
+
+    Floats are left to the stdlib encoder: orjson writes exponents as
+    ``1e-5`` where ``json`` writes ``1e-05``.
+    """
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(content)
+        except TypeError:
+            pass
+    return _dumps_std(content).encode("utf-8")
+
+
+def _splice(head: Dict, key: str, raw: str, tail: Dict) -> str:
+    """``{**head, key: <raw JSON>, **tail}`` serialized in that key order"""
+    parts = [_dumps_std(head)[:-1]]
+    if head:
+        parts.append(",")
+    parts.append(f'"{key}":{raw}')
+    if tail:
+        parts.append("," + _dumps_std(tail)[1:])
+    else:
+        parts.append("}")
+    return "".join(parts)
+
+
+def _company_data_text(company_data) -> str:
+    rc_sections = company_data.rc_sections
+    # RcSections serialize themselves (memoized); failures carry a plain dict
+    raw = rc_sections.to_json() if hasattr(rc_sections, "to_json") else _dumps_std(rc_sections)
+    return _splice(
+        {"success": company_data.success, "company_id": company_data.company_id},
+        "rc_sections", raw,
+        {
+            "extraction_timestamp": company_data.extraction_timestamp,
+            "error_message": company_data.error_message,
+            "cache_hit": company_data.cache_hit,
+            "cache_age": company_data.cache_age,
+            "stale": company_data.stale
+        })
+
+
+def company_data_json(company_data) -> bytes:
+    """CompanyDataResponse body for library CompanyData
+
+    rc_sections comes from its compact, memoized serializer; only the small
+    envelope goes through json.dumps.
+    """
+    return _company_data_text(company_data).encode("utf-8")
+
+
+def company_batch_json(companies) -> bytes:
+    """CompanyBatchResponse body for a list of library CompanyData"""
+    succeeded = sum(1 for company in companies if company.success)
+    results = "[" + ",".join(_company_data_text(company) for company in companies) + "]"
+    return _splice(
+        {"success": succeeded == len(companies)},
+        "results", results,
+        {"total": len(companies), "succeeded": succeeded,
+         "failed": len(companies) - succeeded}).encode("utf-8")
+
+
+def search_results_json(results, error_message=None) -> bytes:
+    """CompanySearchResponse body for library CompanySearchResult objects"""
+    return dump_json({
+        "success": error_message is None,
+        "results": [{"id": result.id, "name": result.name} for result in results],
+        "total_found": len(results),
+        "error_message": error_message
+    })
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when installed; also accepts a pre-rendered body"""
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dump_json(content)
+
+
+class BrotliResponder(IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app: ASGIApp, minimum_size: int, quality: int = 4) -> None:
+        super().__init__(app, minimum_size)
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        if more_body:
+            # Flush so streamed NDJSON lines reach the client as they are produced
+            return self.compressor.process(body) + self.compressor.flush()
+        return self.compressor.process(body) + self.compressor.finish()
+
+
+class CompressionMiddleware:
+    """Brotli when the client accepts it and brotli is installed, else gzip
+
+    Bodies under ``minimum_size`` bytes and responses that already carry a
+    Content-Encoding are passed through untouched.
+    """
+
+    def __init__(self,
+                 app: ASGIApp,
+                 minimum_size: int = 1024,
+                 gzip_level: int = 6,
+                 brotli_quality: int = 4) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = Headers(scope=scope).get("Accept-Encoding", "")
+        responder: ASGIApp
+        if BROTLI_AVAILABLE and "br" in accept_encoding:
+            responder = BrotliResponder(self.app, self.minimum_size, self.brotli_quality)
+        elif "gzip" in accept_encoding:
+            responder = GZipResponder(self.app, self.minimum_size, compresslevel=self.gzip_level)
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size)
+        await responder(scope, receive, send)
@@ -0,0 +1,134 @@
+# ============================================================================
+# tests/test_cache.py
+# ============================================================================
+
+"""The two cache tiers expire, evict, promote and revalidate entries consistently"""
+
+import time
+
+import pytest
+
+from zaubacorp_lib.cache import LRUCache, ResponseCache, SQLiteCache
+from zaubacorp_lib.models import CompanyData, CompanySearchResult, PageFetch, SearchFilter
+from zaubacorp_lib.sections import RcSections
+
+COMPANY_ID = "company/ACME/U00001"
+RC_SECTIONS = {"Basic Information": {"descriptions": ["ACME PRIVATE LIMITED"]}}
+
+
+@pytest.fixture
+def disk(tmp_path):
+    disk = SQLiteCache(str(tmp_path / "cache.db"), ttl=3600.0)
+    yield disk
+    disk.close()
+
+
+def test_hit_and_miss():
+    cache = LRUCache()
+    assert cache.get("a") is None
+    cache.set("a", {"x": 1})
+    assert cache.get("a").value == {"x": 1}
+    cache.delete("a")
+    assert cache.get("a") is None and len(cache) == 0
+
+
+def test_ttl():
+    cache = LRUCache(ttl=60.0)
+    cache.set("old", 1, stored_at=time.time() - 61)
+    cache.set("new", 2, stored_at=time.time() - 59)
+    cache.set("pinned", 3, stored_at=time.time() - 61, ttl=120.0)
+    assert cache.get("old") is None
+    assert cache.get("old", allow_stale=True).value == 1
+    assert cache.get("new").value == 2
+    assert cache.get("pinned").value == 3
+
+
+def test_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert [cache.get(key).value for key in ("a", "c")] == [1, 3]
+
+
+def test_evicts_by_bytes():
+    cache = LRUCache(max_bytes=25)
+    cache.set("a", "x" * 8)
+    cache.set("b", "y" * 8)
+    assert cache.size_bytes == 20
+    cache.set("c", "z" * 8)
+    assert cache.get("a") is None and len(cache) == 2 and cache.size_bytes == 20
+    cache.set("b", "y")
+    assert cache.size_bytes == 13
+    cache.set("big", "w" * 40)
+    assert cache.get("big") is None and len(cache) == 2 and cache.size_bytes == 13
+    cache.clear()
+    assert cache.size_bytes == 0
+
+
+def test_byte_size_of_compact_sections():
+    cache = LRUCache(max_bytes=10 ** 6)
+    rc_sections = RcSections.from_dict(RC_SECTIONS)
+    cache.set("company", {"rc_sections": rc_sections})
+    # Sizing must not memoize the JSON text on the shared entry
+    assert rc_sections._json is None
+    assert abs(cache.size_bytes - len('{"rc_sections": ' + rc_sections.to_json() + '}')) <= 4
+
+
+def test_disk_hit_promoted_into_memory(disk):
+    cache = ResponseCache(memory=LRUCache(ttl=60.0), disk=disk)
+    disk.set(ResponseCache.company_key(COMPANY_ID), {
+        "rc_sections": RC_SECTIONS, "extraction_timestamp": "now"}, stored_at=time.time() - 600)
+
+    company = cache.get_company(COMPANY_ID)
+    assert company.cache_tier == "disk"
+    assert company.rc_sections["Basic Information"] == RC_SECTIONS["Basic Information"]
+    # Older than the memory TTL, yet fresh in memory while the disk tier would serve it
+    company = cache.get_company(COMPANY_ID)
+    assert company.cache_tier == "memory"
+    assert 600 <= company.cache_age < 610
+    assert cache.get_company(COMPANY_ID, max_age=300) is None
+
+
+def test_promoted_entry_expires_with_memory_ttl(disk):
+    cache = ResponseCache(memory=LRUCache(ttl=60.0), disk=disk)
+    key = ResponseCache.company_key(COMPANY_ID)
+    disk.set(key, {"rc_sections": RC_SECTIONS, "extraction_timestamp": "now"}, stored_at=time.time() - 3000)
+    assert cache.get_company(COMPANY_ID).cache_tier == "disk"
+    assert 3060 <= cache.memory.get(key).ttl < 3070
+    disk.set(key, {"rc_sections": RC_SECTIONS, "extraction_timestamp": "now"}, stored_at=time.time() - 3590)
+    cache.memory.clear()
+    assert cache.get_company(COMPANY_ID).cache_tier == "disk"
+    assert cache.memory.get(key).ttl == 3600.0
+
+
+def test_expired_entry_served_stale_then_revalidated(disk):
+    cache = ResponseCache(memory=LRUCache(ttl=60.0), disk=disk)
+    cache.set_company(CompanyData(COMPANY_ID, RC_SECTIONS, "now"), PageFetch(200, etag='"v1"'), digest="d1")
+    key = ResponseCache.company_key(COMPANY_ID)
+    cache.memory.clear()
+    disk.set(key, disk.get(key).value, stored_at=time.time() - 3700)
+
+    assert cache.get_company(COMPANY_ID) is None
+    assert cache.get_company(COMPANY_ID, max_stale=60) is None
+    assert cache.get_company(COMPANY_ID, max_stale=200).stale
+    stale = cache.get_stale_company(COMPANY_ID)
+    assert stale.value["etag"] == '"v1"'
+
+    company = cache.revalidate_company(COMPANY_ID, stale, PageFetch(304))
+    assert company.cache_tier == "revalidated"
+    assert cache.stats.as_dict()["not_modified"] == 1
+    fresh = cache.get_company(COMPANY_ID)
+    assert fresh.cache_tier == "memory" and fresh.cache_age < 5
+    assert disk.get(key).value["content_hash"] == "d1"
+
+
+def test_search_results_round_trip(disk):
+    cache = ResponseCache(disk=disk)
+    assert cache.get_search("acme", SearchFilter.COMPANY) is None
+    cache.set_search("ACME ", SearchFilter.COMPANY, [CompanySearchResult(id=COMPANY_ID, name="ACME")])
+    cache.memory.clear()
+    results = cache.get_search("acme", SearchFilter.COMPANY)
+    assert [(result.id, result.name) for result in results] == [(COMPANY_ID, "ACME")]
@@ -0,0 +1,44 @@
+# ============================================================================
+# tests/test_cache_control.py
+# ============================================================================
+
+"""A request's Cache-Control header bounds the cached company page it may get"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from zaubacorp_lib.models import CompanyData
+
+
+class RecordingClient:
+    def __init__(self):
+        self.calls = []
+
+    async def get_company_data(self, company_id, **kwargs):
+        self.calls.append(kwargs)
+        return CompanyData(company_id, {}, "now")
+
+
+@pytest.fixture
+def recording(monkeypatch):
+    client = RecordingClient()
+    monkeypatch.setattr(main, "zauba_client", client)
+    monkeypatch.setattr(main, "zauba_initialized", True)
+    monkeypatch.setattr(main, "prefetcher", None)
+    return client
+
+
+@pytest.mark.parametrize("header, refresh, max_age, max_stale", [
+    (None, False, None, None),
+    ("no-cache", True, None, None),
+    ("max-age=60, max-stale", False, 60.0, float("inf")),
+    ('max-age="30", max-stale=10', False, 30.0, 10.0),
+    ("max-age=0", False, 0.0, None),
+])
+def test_cache_control(recording, header, refresh, max_age, max_stale):
+    headers = {"Cache-Control": header} if header else {}
+    response = TestClient(main.app).get("/company/U00001MH2010PTC000001", headers=headers)
+    assert response.status_code == 200
+    call, = recording.calls
+    assert (call["refresh"], call["max_age"], call["max_stale"]) == (refresh, max_age, max_stale)
@@ -0,0 +1,74 @@
+# ============================================================================
+# tests/test_crawler.py
+# ============================================================================
+
+"""A crawl resumed from its checkpoint emits every edge the interrupted run did not"""
+
+import asyncio
+
+from zaubacorp_lib.crawler import CrawlEdge, CrawlNode, Crawler, node_id
+from zaubacorp_lib.metrics import DISABLED_METRICS
+from zaubacorp_lib.models import CompanyData
+
+SEED_CIN = "U00001MH2010PTC000001"
+DIRECTORS = {"00000001": "PERSON 1", "00000002": "PERSON 2", "00000003": "PERSON 3"}
+
+
+def company_page():
+    rows = [{"column_0": "DIN", "column_1": "Director Name", "column_2": "Designation"}]
+    rows += [{"column_0": din, "column_1": name, "column_2": "Director"} for din, name in DIRECTORS.items()]
+    return {"Director Details": {"tables": [{"caption": "Current Directors", "data": rows}]}}
+
+
+class FakeClient:
+    """One company whose board links to three directors with empty pages"""
+
+    metrics = DISABLED_METRICS
+
+    async def get_company_data(self, page_id):
+        await asyncio.sleep(0)
+        if page_id.startswith("director/"):
+            return CompanyData(page_id, {}, "now")
+        return CompanyData(page_id, company_page(), "now")
+
+
+def edges_of(events):
+    return {(event.source, event.target, event.relation) for event in events if isinstance(event, CrawlEdge)}
+
+
+def test_resume_emits_edges_not_yet_taken(tmp_path):
+    path = str(tmp_path / "crawl.db")
+    seed = node_id("company", "ACME 1 PRIVATE LIMITED", SEED_CIN)
+
+    async def interrupted():
+        crawler = Crawler(FakeClient(), max_depth=1, checkpoint=path)
+        taken = []
+        events = crawler.crawl(company_ids=[seed])
+        async for event in events:
+            taken.append(event)
+            if isinstance(event, CrawlEdge):
+                break
+        await events.aclose()
+        crawler.close()
+        return taken
+
+    async def resumed():
+        crawler = Crawler(FakeClient(), max_depth=1, checkpoint=path)
+        try:
+            return [event async for event in crawler.crawl()]
+        finally:
+            crawler.close()
+
+    async def full():
+        return [event async for event in Crawler(FakeClient(), max_depth=1).crawl(company_ids=[seed])]
+
+    first = asyncio.run(interrupted())
+    assert len(edges_of(first)) == 1
+    second = asyncio.run(resumed())
+    expected = edges_of(asyncio.run(full()))
+    assert len(expected) == len(DIRECTORS)
+    assert edges_of(first) | edges_of(second) == expected
+    assert seed in [event.id for event in second if isinstance(event, CrawlNode)]
+
+    # Once the node is finished, its edges are not emitted again
+    assert edges_of(asyncio.run(resumed())) == set()
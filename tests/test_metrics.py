@@ -0,0 +1,44 @@
+# ============================================================================
+# tests/test_metrics.py
+# ============================================================================
+
+"""Counters and histograms render in the Prometheus text format without losing precision"""
+
+import pytest
+
+from zaubacorp_lib.metrics import Metrics
+
+
+@pytest.mark.parametrize("amount, rendered", [
+    (1, "1"),
+    (1234567, "1234567"),
+    (2 ** 53, "9007199254740992"),
+    (0.1, "0.1"),
+    (1234567.25, "1234567.25"),
+    (float("inf"), "+Inf"),
+])
+def test_counter_value(amount, rendered):
+    metrics = Metrics()
+    metrics.inc("requests_total", amount, kind="company")
+    assert f'zauba_requests_total{{kind="company"}} {rendered}\n' in metrics.render()
+
+
+def test_histogram():
+    metrics = Metrics(buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 1234567.25):
+        metrics.observe("request_seconds", value, kind="company")
+    lines = metrics.render().splitlines()
+    assert "# TYPE zauba_request_seconds histogram" in lines
+    assert lines[-5:] == [
+        'zauba_request_seconds_bucket{kind="company",le="0.1"} 1',
+        'zauba_request_seconds_bucket{kind="company",le="1"} 3',
+        'zauba_request_seconds_bucket{kind="company",le="+Inf"} 4',
+        'zauba_request_seconds_sum{kind="company"} 1234568.3',
+        'zauba_request_seconds_count{kind="company"} 4',
+    ]
+
+
+def test_histogram_sum_keeps_small_values():
+    metrics = Metrics()
+    metrics.observe("stage_seconds", 1e-7, stage="parse")
+    assert 'zauba_stage_seconds_sum{stage="parse"} 1e-07\n' in metrics.render()
@@ -0,0 +1,72 @@
+# ============================================================================
+# tests/test_parsers.py
+# ============================================================================
+
+"""Every parser engine against bs4 on the fixture page and a corpus of malformed pages"""
+
+import os
+
+import pytest
+
+from zaubacorp_lib.extraction import parse_company_page
+from zaubacorp_lib.parsers import LXML_AVAILABLE, SELECTOLAX_AVAILABLE, resolve_parser_engine
+
+FIXTURE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                       "benchmarks", "fixtures", "company_page.html")
+
+
+def page(body: str) -> bytes:
+    return ('<html><body><div class="container">' + body + '</div></body></html>').encode()
+
+
+MALFORMED = {
+    "unclosed_p": page('<div class="rc"><h3 class="rh">A</h3><p class="rp">one<p class="rp">two</div>'),
+    "unclosed_td": page('<div class="rc"><h3 class="rh">T</h3>'
+                        '<table><tr><td>k<td>v</tr><tr><td>a<td>b<td>c</table></div>'),
+    "div_in_p": page('<div class="rc"><h3 class="rh">D</h3><p class="rp">x<div>inner</div>y</p></div>'),
+    "table_in_p": page('<div class="rc"><h3 class="rh">D</h3>'
+                       '<p class="rp">x<table><tr><td>k</td><td>v</td></tr></table></p></div>'),
+    "p_in_h3": page('<div class="rc"><h3 class="rh">Title<p class="rp">para</p></h3>'
+                    '<p class="rp">after</p></div>'),
+    "unknown_entity": page('<div class="rc"><h3 class="rh">E</h3><p class="rp">a &unknown; b &amp; c</p></div>'),
+    "unclosed_rc_div": page('<div class="rc"><h3 class="rh">U1</h3><p class="rp">one</p>'
+                            '<div class="rc"><h3 class="rh">U2</h3><p class="rp">two</p>'),
+    "untitled": page('<div class="rc"><p class="rp">x</p></div>'
+                     '<div class="rc"><h3 class="rh">B</h3><p class="rp">y</p></div>'),
+}
+
+# Cases where browser-style tree repair differs from html.parser (see parsers.py)
+KNOWN_DIVERGENCES = {
+    "lxml": {"unclosed_p", "unclosed_td", "div_in_p", "table_in_p", "p_in_h3", "unknown_entity"},
+    "selectolax": {"unclosed_p", "unclosed_td", "div_in_p", "unknown_entity"},
+}
+
+ENGINES = [
+    "stream",
+    pytest.param("lxml", marks=pytest.mark.skipif(not LXML_AVAILABLE, reason="lxml not installed")),
+    pytest.param("selectolax", marks=pytest.mark.skipif(not SELECTOLAX_AVAILABLE,
+                                                        reason="selectolax not installed")),
+]
+
+
+def test_auto_matches_bs4():
+    assert resolve_parser_engine("auto") == "stream"
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_fixture_matches_bs4(engine):
+    with open(FIXTURE, "rb") as f:
+        content = f.read()
+    assert parse_company_page(content, engine).to_dict() == parse_company_page(content, "bs4").to_dict()
+
+
+@pytest.mark.parametrize("case", sorted(MALFORMED))
+@pytest.mark.parametrize("engine", ENGINES)
+def test_malformed_matches_bs4(engine, case):
+    expected = parse_company_page(MALFORMED[case], "bs4").to_dict()
+    result = parse_company_page(MALFORMED[case], engine).to_dict()
+    if case in KNOWN_DIVERGENCES.get(engine, ()):
+        # Documented divergence; flag it if a parser upgrade makes it go away
+        assert result != expected
+    else:
+        assert result == expected
@@ -0,0 +1,93 @@
+# ============================================================================
+# tests/test_prefetch.py
+# ============================================================================
+
+"""Prefetch workers survive failing jobs and leave headroom in every page budget"""
+
+import asyncio
+
+from zaubacorp_lib import AsyncZaubaCorpClient, RateLimiter
+from zaubacorp_lib.cache import ResponseCache
+from zaubacorp_lib.models import CompanyData
+from zaubacorp_lib.prefetch import PrefetchScheduler
+from zaubacorp_lib.sessions import SessionPool
+
+
+def test_cache_error_fails_job_not_worker():
+    async def run():
+        client = AsyncZaubaCorpClient(rate_limiter=RateLimiter(typeahead_rate=None, page_rate=None),
+                                      cache=ResponseCache())
+        get_company = client.cache.get_company
+
+        def failing_get_company(company_id, *args):
+            if company_id == "company/BAD/U00001":
+                raise OSError("cache unavailable")
+            return get_company(company_id, *args)
+
+        async def get_company_data(company_id, refresh=False):
+            return CompanyData(company_id, {}, "now")
+
+        client.cache.get_company = failing_get_company
+        client.get_company_data = get_company_data
+        scheduler = PrefetchScheduler(client, workers=1, headroom=0)
+        scheduler.watch(["company/BAD/U00001", "company/GOOD/U00002"])
+        scheduler.start()
+        try:
+            for _ in range(100):
+                if scheduler.stats['failed'] + scheduler.stats['fetched'] == 2:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await scheduler.stop()
+            await client.aclose()
+        return scheduler.stats
+
+    stats = asyncio.run(run())
+    assert stats['failed'] == 1
+    assert stats['fetched'] == 1
+
+
+def test_headroom_counts_session_budgets():
+    async def run():
+        pool = SessionPool.from_config(["ZCSESSID=a", "ZCSESSID=b"],
+                                       defaults={'typeahead_rate': None, 'page_rate': 2.0})
+        client = AsyncZaubaCorpClient(rate_limiter=RateLimiter(typeahead_rate=None, page_rate=None),
+                                      cache=ResponseCache(), session_pool=pool)
+        scheduler = PrefetchScheduler(client, headroom=1)
+        try:
+            waits = [scheduler._budget_wait()]
+            pool.acquire(RateLimiter.COMPANY_PAGE)
+            waits.append(scheduler._budget_wait())
+        finally:
+            await client.aclose()
+        return waits
+
+    assert asyncio.run(run()) == [None, 0.25]
+
+
+def test_cached_company_is_not_refetched():
+    async def run():
+        client = AsyncZaubaCorpClient(rate_limiter=RateLimiter(typeahead_rate=None, page_rate=None),
+                                      cache=ResponseCache())
+        client.cache.set_company(CompanyData("company/ACME/U00001", {}, "now"))
+        fetched = []
+
+        async def get_company_data(company_id, refresh=False):
+            fetched.append(company_id)
+            return CompanyData(company_id, {}, "now")
+
+        client.get_company_data = get_company_data
+        scheduler = PrefetchScheduler(client, workers=1, headroom=0)
+        scheduler.watch(["company/ACME/U00001"])
+        scheduler.start()
+        try:
+            for _ in range(100):
+                if scheduler.stats['cached']:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await scheduler.stop()
+            await client.aclose()
+        return fetched, await client.cached_company("company/OTHER/U00002")
+
+    assert asyncio.run(run()) == ([], None)
@@ -0,0 +1,153 @@
+# ============================================================================
+# tests/test_retry.py
+# ============================================================================
+
+"""Which upstream responses are retried, and how the circuit breaker lets requests through"""
+
+import asyncio
+import time
+from email.utils import formatdate
+
+import pytest
+
+from benchmarks.mock_server import MockZaubaServer
+from zaubacorp_lib import AsyncZaubaCorpClient, RateLimiter, SessionPool, ZaubaCorpClient
+from zaubacorp_lib.retry import CircuitBreaker, RetryPolicy, parse_retry_after
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, None),
+    ("", None),
+    ("3", 3.0),
+    (" 1.5 ", 1.5),
+    ("-2", 0.0),
+    ("soon", None),
+])
+def test_parse_retry_after(value, expected):
+    assert parse_retry_after(value) == expected
+
+
+def test_parse_retry_after_http_date():
+    assert 8 < parse_retry_after(formatdate(time.time() + 10, usegmt=True)) <= 10
+
+
+@pytest.mark.parametrize("status, headers, outcome", [
+    (200, None, RetryPolicy.OK),
+    (304, None, RetryPolicy.OK),
+    (404, None, RetryPolicy.OK),
+    (403, None, RetryPolicy.OK),
+    (429, None, RetryPolicy.RETRY),
+    (503, None, RetryPolicy.RETRY),
+    (522, None, RetryPolicy.RETRY),
+    (501, None, RetryPolicy.FAIL),
+    (403, {'cf-mitigated': 'challenge'}, RetryPolicy.FAIL),
+    (503, {'cf-mitigated': 'challenge'}, RetryPolicy.FAIL),
+])
+def test_classify(status, headers, outcome):
+    assert RetryPolicy().classify(status, headers) == outcome
+
+
+def test_challenged_and_unavailable():
+    policy = RetryPolicy()
+    assert policy.challenged(403)
+    assert policy.challenged(200, {'cf-mitigated': 'challenge'})
+    assert not policy.challenged(429)
+    assert [status for status in (0, 200, 304, 403, 404, 429, 501) if policy.unavailable(status)] == [0, 403, 429, 501]
+
+
+def test_next_delay():
+    policy = RetryPolicy(max_attempts=3, base_delay=1.0, max_delay=1.5, max_retry_after=5.0, deadline=10.0)
+    assert all(0 <= policy.next_delay(1, 0.0) <= 1.0 for _ in range(50))
+    assert all(0 <= policy.next_delay(2, 0.0) <= 1.5 for _ in range(50))
+    assert policy.next_delay(3, 0.0) is None
+    assert policy.next_delay(1, 0.0, retry_after=4.0) == 4.0
+    assert policy.next_delay(1, 0.0, retry_after=6.0) is None
+    assert policy.next_delay(1, 9.0, retry_after=2.0) is None
+    assert RetryPolicy.disabled().next_delay(1, 0.0) is None
+
+
+def test_breaker_opens_after_threshold():
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=60.0)
+    breaker.record_failure()
+    assert breaker.allow() and breaker.state == CircuitBreaker.CLOSED
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    assert 59 < breaker.retry_in <= 60
+
+
+def test_breaker_half_open_lets_one_probe_through():
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    assert breaker.allow() and breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    time.sleep(0.02)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.allow()
+
+
+def test_breaker_released_probe_lets_next_through():
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=60.0)
+    breaker.release_probe()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker._changed_at -= 60.0
+    breaker.record_failure()
+    breaker._changed_at -= 60.0
+    assert breaker.allow() and not breaker.allow()
+    breaker.release_probe()
+    assert breaker.retry_in == 0.0
+    assert breaker.allow() and breaker.state == CircuitBreaker.HALF_OPEN
+
+
+@pytest.fixture
+def challenging_server():
+    server = MockZaubaServer(latency=0.0)
+    server.challenged_sessions = {"challenged"}
+    server.start()
+    yield server
+    server.stop()
+
+
+def half_open_setup():
+    """A pool whose first session is challenged, and a breaker due for its probe"""
+    pool = SessionPool.from_config(["ZCSESSID=challenged", "ZCSESSID=clear"])
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=60.0)
+    breaker.record_failure()
+    breaker._changed_at -= 60.0
+    return dict(session_pool=pool, circuit_breaker=breaker,
+                rate_limiter=RateLimiter(typeahead_rate=None, page_rate=None),
+                retry_policy=RetryPolicy(base_delay=0.0))
+
+
+def test_challenged_probe_switches_session(challenging_server):
+    options = half_open_setup()
+    client = ZaubaCorpClient(base_url=challenging_server.url, **options)
+    try:
+        assert client.get_company_data("company/ACME/U00001").success
+    finally:
+        client.close()
+    assert challenging_server.session_requests == {"challenged": 1, "clear": 1}
+    assert options['circuit_breaker'].state == CircuitBreaker.CLOSED
+
+
+def test_challenged_probe_switches_session_async(challenging_server):
+    options = half_open_setup()
+
+    async def run():
+        client = AsyncZaubaCorpClient(base_url=challenging_server.url, **options)
+        try:
+            return await client.get_company_data("company/ACME/U00001")
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(run()).success
+    assert challenging_server.session_requests == {"challenged": 1, "clear": 1}
+    assert options['circuit_breaker'].state == CircuitBreaker.CLOSED
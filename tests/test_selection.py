@@ -0,0 +1,162 @@
+# ============================================================================
+# tests/test_selection.py
+# ============================================================================
+
+"""A selective parse returns what narrowing the full parse returns, so cold fetches match cache hits"""
+
+import os
+
+import pytest
+
+from zaubacorp_lib.extraction import parse_company_page
+from zaubacorp_lib.parsers import LXML_AVAILABLE, RAW_EXTRACTORS, SELECTOLAX_AVAILABLE
+from zaubacorp_lib.selection import Selection
+from zaubacorp_lib.streaming import StreamingPageParser
+
+FIXTURE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                       "benchmarks", "fixtures", "company_page.html")
+
+ENGINES = [
+    "bs4",
+    "stream",
+    pytest.param("lxml", marks=pytest.mark.skipif(not LXML_AVAILABLE, reason="lxml not installed")),
+    pytest.param("selectolax", marks=pytest.mark.skipif(not SELECTOLAX_AVAILABLE,
+                                                        reason="selectolax not installed")),
+]
+
+SELECTIONS = [
+    (None, "descriptions"),
+    (None, "tables"),
+    ("director", None),
+    ("director", "descriptions"),
+    ("basic information,share capital", None),
+    ("charges,director,similar", "tables"),
+    ("no such section", None),
+]
+
+
+def section(title, body):
+    heading = f'<h3 class="rh">{title}</h3>' if title is not None else ''
+    return f'<div class="rc">{heading}{body}</div>'
+
+
+PARAGRAPH = '<p class="rp">{}</p>'
+TABLE = '<table><tr><td>{}</td><td>value</td></tr></table>'
+
+# Pages built around the edge cases: untitled sections after table-only ones,
+# an empty section claiming a name, and duplicate titles
+PAGES = {
+    "untitled_after_tables": [
+        section("Tables Only", TABLE.format("k")),
+        section(None, PARAGRAPH.format("untitled")),
+        section("Text", PARAGRAPH.format("text")),
+    ],
+    "empty_match_first": [
+        section("Director Network", ""),
+        section("Director Details", TABLE.format("din")),
+    ],
+    "duplicate_titles": [
+        section("Director Details", PARAGRAPH.format("first")),
+        section("Other", PARAGRAPH.format("other")),
+        section("Director Details", PARAGRAPH.format("second") + TABLE.format("din")),
+    ],
+    "duplicate_empty_later": [
+        section("Director Details", PARAGRAPH.format("first")),
+        section("Director Details", ""),
+    ],
+    "claimed_by_other_field": [
+        section("Director Details", PARAGRAPH.format("text only")),
+        section("Director Network", TABLE.format("din")),
+    ],
+    "duplicate_after_claimed": [
+        section("Director Details", TABLE.format("first")),
+        section("Director Network", PARAGRAPH.format("network")),
+        section("Charges", TABLE.format("charge")),
+        section("Director Details", PARAGRAPH.format("second")),
+    ],
+    "nested": [
+        '<div class="rc"><h3 class="rh">Director Details</h3>'
+        + section("Director Network", PARAGRAPH.format("inner")) + TABLE.format("outer") + '</div>',
+        section("Director Network", TABLE.format("later")),
+    ],
+}
+
+
+def fixture_page() -> bytes:
+    with open(FIXTURE, "rb") as f:
+        return f.read()
+
+
+def built_page(sections) -> bytes:
+    return ('<html><body>' + ''.join(sections) + '</body></html>').encode()
+
+
+def streamed(content: bytes, selection) -> dict:
+    parser = StreamingPageParser(None, selection)
+    for start in range(0, len(content), 512):
+        parser.feed(content[start:start + 512])
+    return parser.close().to_dict()
+
+
+@pytest.mark.parametrize("sections,fields", SELECTIONS)
+@pytest.mark.parametrize("engine", ENGINES)
+def test_fixture_parse_matches_apply(engine, sections, fields):
+    content = fixture_page()
+    selection = Selection(sections, fields)
+    expected = selection.apply(parse_company_page(content, engine)).to_dict()
+    assert parse_company_page(content, engine, selection).to_dict() == expected
+
+
+@pytest.mark.parametrize("sections,fields", SELECTIONS + [("director details", None), ("text", None)])
+@pytest.mark.parametrize("name", sorted(PAGES))
+@pytest.mark.parametrize("engine", ENGINES)
+def test_edge_cases_parse_matches_apply(engine, name, sections, fields):
+    content = built_page(PAGES[name])
+    selection = Selection(sections, fields)
+    expected = selection.apply(parse_company_page(content, engine)).to_dict()
+    assert parse_company_page(content, engine, selection).to_dict() == expected
+
+
+@pytest.mark.parametrize("sections,fields", SELECTIONS)
+def test_streaming_parse_matches_apply(sections, fields):
+    content = fixture_page()
+    selection = Selection(sections, fields)
+    expected = selection.apply(parse_company_page(content, "stream")).to_dict()
+    assert streamed(content, selection) == expected
+
+
+def test_untitled_section_numbered_on_full_page():
+    content = built_page(PAGES["untitled_after_tables"])
+    parsed = parse_company_page(content, "stream", Selection(fields="descriptions")).to_dict()
+    assert list(parsed) == ["section_1", "Text"]
+
+
+def test_empty_section_does_not_claim_name():
+    content = built_page(PAGES["empty_match_first"])
+    assert list(parse_company_page(content, "stream", Selection("director")).to_dict()) == ["Director Details"]
+
+
+def test_duplicate_title_keeps_last_like_full_parse():
+    content = built_page(PAGES["duplicate_titles"])
+    parsed = parse_company_page(content, "stream", Selection("director", "descriptions")).to_dict()
+    assert parsed == {"Director Details": {"descriptions": ["second"]}}
+
+
+RAW_ENGINES = [engine for engine in ENGINES if getattr(engine, "values", (engine,))[0] in RAW_EXTRACTORS]
+
+
+@pytest.mark.parametrize("engine", RAW_ENGINES)
+def test_unrequested_fields_are_not_extracted(engine):
+    raw = RAW_EXTRACTORS[engine](fixture_page().decode(), Selection("director,charges", "tables"))
+    assert [title.strip() for title, _, _ in raw] == ["Director Details", "Charges"]
+    assert not any(text for _, paragraphs, _ in raw for text in paragraphs)
+    assert all(rows for _, _, tables in raw for _, rows in tables)
+
+    raw = RAW_EXTRACTORS[engine](fixture_page().decode(), Selection("director", "descriptions"))
+    assert not any(caption or rows for _, _, tables in raw for caption, rows in tables)
+
+
+@pytest.mark.parametrize("engine", RAW_ENGINES)
+def test_only_duplicates_extracted_once_names_are_claimed(engine):
+    raw = RAW_EXTRACTORS[engine](built_page(PAGES["duplicate_after_claimed"]).decode(), Selection("director"))
+    assert [title for title, _, _ in raw] == ["Director Details", "Director Details"]
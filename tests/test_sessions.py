@@ -0,0 +1,45 @@
+# ============================================================================
+# tests/test_sessions.py
+# ============================================================================
+
+"""A quarantined session comes back through exactly one probe request"""
+
+import threading
+import time
+
+from zaubacorp_lib.rate_limit import RateLimiter
+from zaubacorp_lib.sessions import SessionPool, UpstreamSession
+
+
+class BarrierLimiter(RateLimiter):
+    """Unthrottled budget whose lookups wait until ``parties`` threads are in them"""
+
+    def __init__(self, parties: int):
+        super().__init__(typeahead_rate=None, page_rate=None)
+        self.barrier = threading.Barrier(parties, timeout=5)
+
+    def available(self, kind: str) -> float:
+        self.barrier.wait()
+        return super().available(kind)
+
+
+def test_concurrent_acquires_probe_once():
+    probed = UpstreamSession("probed", "ZCSESSID=a", rate_limiter=BarrierLimiter(2))
+    spare = UpstreamSession("spare", "ZCSESSID=b",
+                            rate_limiter=RateLimiter(typeahead_rate=None, page_rate=1.0))
+    spare.rate_limiter.reserve(RateLimiter.COMPANY_PAGE)
+    pool = SessionPool([probed, spare])
+    probed.state = UpstreamSession.QUARANTINED
+    probed.quarantined_until = time.monotonic() - 1
+
+    picked = []
+    threads = [threading.Thread(target=lambda: picked.append(pool.acquire(RateLimiter.COMPANY_PAGE)[0]))
+               for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(session.name for session in picked) == ["probed", "spare"]
+    assert probed.state == UpstreamSession.PROBING
+    assert probed.inflight == 1
@@ -0,0 +1,119 @@
+# ============================================================================
+# tests/test_shared.py
+# ============================================================================
+
+"""An unreachable shared backend degrades to local state instead of failing requests"""
+
+import asyncio
+import socket
+
+import pytest
+
+from benchmarks.redis_server import StandInRedisServer
+from zaubacorp_lib.rate_limit import RateLimiter
+from zaubacorp_lib.sessions import SessionPool
+from zaubacorp_lib.shared import (RedisBackend, SharedBackend, SharedCache, SharedRateLimiter,
+                                  SharedSingleFlight, SQLiteBackend)
+
+
+@pytest.fixture
+def down_backend():
+    """A RedisBackend pointed at a port nothing listens on"""
+    probe = socket.socket()
+    probe.bind(("127.0.0.1", 0))
+    port = probe.getsockname()[1]
+    probe.close()
+    backend = RedisBackend(f"redis://127.0.0.1:{port}/0", timeout=0.5)
+    yield backend
+    backend.close()
+
+
+def test_cache_misses_without_backend(down_backend):
+    cache = SharedCache(down_backend)
+    cache.set("company:X", {"a": 1})
+    cache.delete("company:X")
+    assert cache.get("company:X") is None
+
+
+def test_rate_limiter_falls_back_to_local_budget(down_backend):
+    limiter = SharedRateLimiter(down_backend, typeahead_rate=1.0, typeahead_burst=1)
+    assert limiter.reserve(RateLimiter.TYPEAHEAD) == 0.0
+    assert limiter.reserve(RateLimiter.TYPEAHEAD) > 0.5
+    assert limiter.available(RateLimiter.TYPEAHEAD) <= 0
+
+
+def test_single_flight_leads_without_backend(down_backend):
+    flight = SharedSingleFlight(down_backend)
+    with flight.hold("company:X") as leader:
+        assert leader
+
+    async def hold():
+        async with flight.hold_async("company:X") as leader:
+            return leader
+
+    assert asyncio.run(hold())
+
+
+def test_async_paths_use_backend(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "shared.db"))
+    flight = SharedSingleFlight(backend, wait_timeout=0.2, poll_interval=0.01)
+    limiter = SharedRateLimiter(backend, typeahead_rate=None, page_rate=100.0, page_burst=2)
+    pool = SessionPool.from_config(["ZCSESSID=a", "ZCSESSID=b"],
+                                   rate_limiter_factory=lambda name, limits: limiter)
+
+    async def run():
+        async with flight.hold_async("company:X") as leader:
+            assert leader
+            async with flight.hold_async("company:X") as follower:
+                assert not follower
+        assert await limiter.acquire_async(RateLimiter.COMPANY_PAGE) == 0.0
+        session, wait = await pool.acquire_async(RateLimiter.COMPANY_PAGE)
+        pool.release(session, ok=True)
+        return wait
+
+    try:
+        assert asyncio.run(run()) == 0.0
+    finally:
+        backend.close()
+
+
+def test_incomplete_backend_fails_on_construction():
+    class GetOnly(SharedBackend):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnly()
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def backend(request, tmp_path):
+    if request.param == "sqlite":
+        backend = SQLiteBackend(str(tmp_path / "shared.db"))
+        yield backend
+        backend.close()
+        return
+    server = StandInRedisServer()
+    server.start()
+    backend = RedisBackend(server.url)
+    yield backend
+    backend.close()
+    server.stop()
+
+
+def test_delete_if_equal(backend):
+    backend.set("lock:X", b"mine", ttl=30)
+    assert not backend.delete_if_equal("lock:X", b"theirs")
+    assert backend.get("lock:X") == b"mine"
+    assert backend.delete_if_equal("lock:X", b"mine")
+    assert backend.get("lock:X") is None
+    assert not backend.delete_if_equal("lock:X", b"mine")
+
+
+def test_single_flight_keeps_lock_taken_over(backend):
+    flight = SharedSingleFlight(backend)
+    with flight.hold("company:X") as leader:
+        assert leader
+        # Our lock_ttl ran out and another worker took the lock
+        backend.set(flight.prefix + "company:X", b"other", ttl=30)
+    assert backend.get(flight.prefix + "company:X") == b"other"
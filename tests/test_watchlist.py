@@ -0,0 +1,126 @@
+# ============================================================================
+# tests/test_watchlist.py
+# ============================================================================
+
+"""Refreshes of watched companies log what changed, section by section and row by row"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from zaubacorp_lib.models import CompanyData
+from zaubacorp_lib.sections import RcSections
+from zaubacorp_lib.watchlist import Watchlist, diff_rc_sections
+
+COMPANY_ID = "company/ACME/U00001"
+
+
+def directors(*rows):
+    header = {"column_0": "DIN", "column_1": "Director Name", "column_2": "Designation"}
+    return {"caption": "Current Directors", "data": [header] + [
+        {"column_0": din, "column_1": name, "column_2": "Director"} for din, name in rows]}
+
+
+OLD = {
+    "Basic Information": {
+        "descriptions": ["ACME PRIVATE LIMITED is a private company"],
+        "tables": [{"caption": "", "data": [{"Status": "Active"}, {"Category": "Private"}]}],
+    },
+    "Director Details": {"tables": [directors(("00000001", "PERSON 1"), ("00000002", "PERSON 2"))]},
+    "Charges": {"descriptions": ["No charges"]},
+}
+
+NEW = {
+    "Basic Information": {
+        "descriptions": ["ACME PRIVATE LIMITED is a private company", "Its last AGM was held on 2026-09-30"],
+        "tables": [{"caption": "", "data": [{"Status": "Strike Off"}, {"Category": "Private"}]}],
+    },
+    "Director Details": {"tables": [directors(("00000001", "PERSON 1"), ("00000003", "PERSON 3"))]},
+    "Contact Details": {"descriptions": ["Email: info@example.com"]},
+}
+
+
+def test_diff_rc_sections():
+    changes = {change.title: change for change in diff_rc_sections(OLD, NEW)}
+    assert {title: change.change for title, change in changes.items()} == {
+        "Basic Information": "modified",
+        "Director Details": "modified",
+        "Contact Details": "added",
+        "Charges": "removed",
+    }
+
+    basic = changes["Basic Information"]
+    assert basic.added_descriptions == ["Its last AGM was held on 2026-09-30"]
+    assert basic.removed_descriptions == []
+    table, = basic.tables
+    assert (table.change, table.added_rows, table.removed_rows) == ("modified", [], [])
+    assert table.changed_rows == [{"key": "Status", "old": "Active", "new": "Strike Off"}]
+
+    table, = changes["Director Details"].tables
+    assert table.caption == "Current Directors"
+    assert table.added_rows == [{"column_0": "00000003", "column_1": "PERSON 3", "column_2": "Director"}]
+    assert table.removed_rows == [{"column_0": "00000002", "column_1": "PERSON 2", "column_2": "Director"}]
+    assert table.changed_rows == []
+
+    assert changes["Contact Details"].added_descriptions == ["Email: info@example.com"]
+    assert changes["Charges"].removed_descriptions == ["No charges"]
+
+
+def test_diff_accepts_compact_sections():
+    assert diff_rc_sections(RcSections.from_dict(OLD), OLD) == []
+    assert ([change.to_dict() for change in diff_rc_sections(RcSections.from_dict(OLD), NEW)]
+            == [change.to_dict() for change in diff_rc_sections(OLD, NEW)])
+
+
+def test_record_logs_changes_after_baseline():
+    watchlist = Watchlist()
+    try:
+        assert watchlist.record(CompanyData(COMPANY_ID, OLD, "now")) is None
+        watchlist.add([COMPANY_ID])
+        assert watchlist.record(CompanyData(COMPANY_ID, OLD, "now")) is None
+        assert watchlist.record(CompanyData(COMPANY_ID, RcSections.from_dict(OLD), "now")) is None
+        changes = watchlist.record(CompanyData(COMPANY_ID, NEW, "now"))
+        assert changes.sequence == 1 and len(changes.sections) == 4
+        assert watchlist.record(CompanyData(COMPANY_ID, {}, "now", success=False)) is None
+        assert [logged.to_dict() for logged in watchlist.changes()] == [changes.to_dict()]
+    finally:
+        watchlist.close()
+
+
+@pytest.fixture
+def api(monkeypatch):
+    watchlist = Watchlist()
+    monkeypatch.setattr(main, "zauba_client", object())
+    monkeypatch.setattr(main, "zauba_initialized", True)
+    monkeypatch.setattr(main, "prefetcher", None)
+    monkeypatch.setattr(main, "watchlist", watchlist)
+    yield TestClient(main.app), watchlist
+    watchlist.close()
+
+
+def test_changes_endpoint(api):
+    client, watchlist = api
+    assert client.post("/watchlist", json={"company_ids": [COMPANY_ID, "company/OTHER/U00002"]}).json() == {
+        "added": 2, "total": 2}
+    for company_id in (COMPANY_ID, "company/OTHER/U00002"):
+        watchlist.record(CompanyData(company_id, OLD, "now"))
+    watchlist.record(CompanyData(COMPANY_ID, NEW, "now"))
+    watchlist.record(CompanyData("company/OTHER/U00002", NEW, "now"))
+
+    body = client.get("/changes").json()
+    assert [change["company_id"] for change in body["changes"]] == [COMPANY_ID, "company/OTHER/U00002"]
+    assert body["next_since"] == 2
+    assert body["changes"][0]["sections"][0]["title"] == "Basic Information"
+
+    body = client.get("/changes", params={"since": 1}).json()
+    assert [change["sequence"] for change in body["changes"]] == [2]
+    body = client.get("/changes", params={"since": 2}).json()
+    assert body == {"changes": [], "next_since": 2}
+    body = client.get("/changes", params={"company_id": COMPANY_ID, "limit": 1}).json()
+    assert [change["sequence"] for change in body["changes"]] == [1]
+
+
+def test_changes_endpoint_without_watchlist(api, monkeypatch):
+    client, _ = api
+    monkeypatch.setattr(main, "watchlist", None)
+    assert client.get("/changes").status_code == 503
@@ -6,21 +6,121 @@
 ZaubaCorp Library - Internal company data extraction library
 """
 
-from .client import ZaubaCorpClient
-from .models import SearchFilter, CompanySearchResult, CompanyData
-from .exceptions import ZaubaCorpError, SearchError, ExtractionError, NetworkError
+import importlib
+
+# Public names and the submodule defining each. They are imported on first
+# access, so ``import zaubacorp_lib`` (or pulling in only the models and
+# metrics) does not load requests, httpx and BeautifulSoup.
+_EXPORTS = {
+    ".client": ("ZaubaCorpClient",),
+    ".async_client": ("AsyncZaubaCorpClient",),
+    ".models": ("SearchFilter", "CompanySearchResult", "CompanyData"),
+    ".rate_limit": ("RateLimiter", "TokenBucket"),
+    ".cache": ("ResponseCache", "LRUCache", "SQLiteCache"),
+    ".singleflight": ("SingleFlight", "AsyncSingleFlight"),
+    ".shared": (
+        "SharedBackend",
+        "SQLiteBackend",
+        "RedisBackend",
+        "SharedCache",
+        "SharedRateLimiter",
+        "SharedSingleFlight",
+        "backend_from_url"
+    ),
+    ".sessions": ("SessionPool", "UpstreamSession"),
+    ".selection": ("Selection", "SECTION_FIELDS"),
+    ".index": ("CompanyIndex",),
+    ".prefetch": ("PrefetchScheduler",),
+    ".crawler": ("Crawler", "CrawlNode", "CrawlEdge", "extract_links"),
+    ".watchlist": ("Watchlist", "CompanyChanges", "SectionChange", "TableChange", "diff_rc_sections"),
+    ".sections": ("RcSections", "RcSection", "RcTable", "RcRow", "rc_sections_json"),
+    ".parsers": ("PARSER_ENGINES",),
+    ".extraction": ("parse_company_page", "parse_company_page_timed", "parse_search_page"),
+    ".streaming": ("StreamingPageParser", "ContentDecoder"),
+    ".metrics": ("Metrics",),
+    ".retry": ("RetryPolicy", "CircuitBreaker"),
+    ".exceptions": (
+        "ZaubaCorpError",
+        "SearchError",
+        "ExtractionError",
+        "NetworkError",
+        "CircuitOpenError",
+        "SharedBackendError"
+    )
+}
+_MODULES = {name: module for module, names in _EXPORTS.items() for name in names}
+
+
+def __getattr__(name):
+    module = _MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_MODULES))
+
 
 __version__ = "1.0.0"
 __author__ = "Your Team"
 __all__ = [
     "ZaubaCorpClient",
+    "AsyncZaubaCorpClient",
     "SearchFilter",
     "CompanySearchResult",
     "CompanyData",
+    "RateLimiter",
+    "TokenBucket",
+    "ResponseCache",
+    "LRUCache",
+    "SQLiteCache",
+    "SingleFlight",
+    "AsyncSingleFlight",
+    "SharedBackend",
+    "SQLiteBackend",
+    "RedisBackend",
+    "SharedCache",
+    "SharedRateLimiter",
+    "SharedSingleFlight",
+    "backend_from_url",
+    "SessionPool",
+    "UpstreamSession",
+    "CompanyIndex",
+    "PrefetchScheduler",
+    "Crawler",
+    "CrawlNode",
+    "CrawlEdge",
+    "extract_links",
+    "Watchlist",
+    "CompanyChanges",
+    "SectionChange",
+    "TableChange",
+    "diff_rc_sections",
+    "Selection",
+    "SECTION_FIELDS",
+    "RcSections",
+    "RcSection",
+    "RcTable",
+    "RcRow",
+    "rc_sections_json",
+    "PARSER_ENGINES",
+    "parse_company_page",
+    "parse_company_page_timed",
+    "StreamingPageParser",
+    "ContentDecoder",
+    "Metrics",
+    "RetryPolicy",
+    "CircuitBreaker",
+    "parse_search_page",
     "ZaubaCorpError",
     "SearchError",
     "ExtractionError",
     "NetworkError",
+    "CircuitOpenError",
+    "SharedBackendError",
     "search_companies",
     "get_company_data",
     "search_and_get_data"
@@ -0,0 +1,632 @@
+# ============================================================================
+# zaubacorp_lib/async_client.py
+# ============================================================================
+
+import httpx
+import asyncio
+import time
+from dataclasses import replace
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Union
+
+from .models import SearchFilter, CompanySearchResult, CompanyData, PageFetch
+from .exceptions import ZaubaCorpError, SearchError, NetworkError, CircuitOpenError
+from .extraction import (
+    HtmlExtractionMixin,
+    parse_company_page,
+    parse_company_page_timed,
+    parse_search_page
+)
+from .metrics import Metrics, DISABLED_METRICS
+from .index import CompanyIndex
+from .watchlist import Watchlist, CompanyChanges
+from .rate_limit import RateLimiter
+from .retry import RetryPolicy, CircuitBreaker, parse_retry_after
+from .cache import ResponseCache, content_hash, conditional_headers
+from .parsers import resolve_parser_engine
+from .selection import Selection
+from .sessions import SessionPool
+from .shared import SharedCache, SharedSingleFlight
+from .streaming import ACCEPT_ENCODING, STREAM_READ_SIZE, StreamingPageParser
+from .singleflight import AsyncSingleFlight
+from .client import BASE_URL, USER_AGENT, SESSION_COOKIE
+
+
+class AsyncZaubaCorpClient(HtmlExtractionMixin):
+    """Asyncio ZaubaCorp client backed by a shared, keep-alive httpx.AsyncClient"""
+
+    def __init__(self,
+                 delay_between_requests: float = 1.0,
+                 max_connections: int = 20,
+                 max_keepalive_connections: int = 10,
+                 timeout: float = 30.0,
+                 parse_executor: Optional[Executor] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 cache: Optional[ResponseCache] = None,
+                 parser_engine: str = "auto",
+                 base_url: str = BASE_URL,
+                 metrics: Optional[Metrics] = None,
+                 index: Optional[CompanyIndex] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None,
+                 max_stale: float = 0.0,
+                 shared_flight: Optional[SharedSingleFlight] = None,
+                 stream_parse: bool = False,
+                 session_pool: Optional[SessionPool] = None):
+        """Initialize async ZaubaCorp client
+
+        HTML parsing is CPU bound, so it is handed to ``parse_executor``
+        (the loop's default executor when None) to keep the event loop free.
+        Only raw page bytes go in and rc_sections come out, so a
+        ProcessPoolExecutor works as well as a thread pool.
+        Outbound requests wait on ``rate_limiter`` without holding a thread.
+        ``parser_engine``, ``metrics``, ``index``, ``retry_policy``,
+        ``circuit_breaker``, ``max_stale``, ``shared_flight``,
+        ``stream_parse`` and ``session_pool`` are as for
+        ``ZaubaCorpClient``; backoff sleeps, session budget waits and
+        background refreshes run on the event loop. Streamed pages are fed
+        to the parser chunk by chunk in ``parse_executor`` (the default
+        executor if that is a process pool, which cannot keep parser state).
+        """
+        self.base_url = base_url
+        self.delay = delay_between_requests
+        self.rate_limiter = rate_limiter or RateLimiter.from_delay(
+            delay_between_requests)
+        self.cache = cache
+        self.parser_engine = resolve_parser_engine(parser_engine)
+        self._inflight = AsyncSingleFlight()
+        self.max_stale = max_stale
+        self.shared_flight = shared_flight
+        self.stream_parse = stream_parse
+        self.sessions = session_pool if session_pool is not None else SessionPool.single(SESSION_COOKIE)
+        self._background: Dict[str, asyncio.Task] = {}
+        self.parse_executor = parse_executor
+        self.metrics = metrics if metrics is not None else DISABLED_METRICS
+        self.index = index
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.circuit_breaker = circuit_breaker if circuit_breaker is not None else CircuitBreaker()
+        self.http = httpx.AsyncClient(
+            headers={
+                'User-Agent': USER_AGENT,
+                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+                'Accept-Language': 'en-US,en;q=0.9',
+                'Accept-Encoding': ACCEPT_ENCODING,
+                'DNT': '1',
+                'Connection': 'keep-alive',
+                'Upgrade-Insecure-Requests': '1'
+            },
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections
+            ),
+            timeout=timeout,
+            follow_redirects=True
+        )
+
+    async def _run_parser(self, func, *args):
+        """Run a module-level parse stage function off the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.parse_executor, func, *args)
+
+    async def _cached(self, method: str, *args):
+        """Call a ``ResponseCache`` method, off the event loop when it reaches a shared tier"""
+        func = getattr(self.cache, method)
+        if not isinstance(self.cache.disk, SharedCache):
+            return func(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, func, *args)
+
+    async def _request(self,
+                       kind: str,
+                       method: str,
+                       url: str,
+                       stream: bool = False,
+                       **kwargs) -> httpx.Response:
+        """Send one upstream request under the retry policy and circuit breaker
+
+        Returns the last response, which may still be an error status, and
+        re-raises the last connection error once retries are exhausted.
+        Each attempt goes out through a session from ``sessions``; a
+        challenged attempt is retried on another one when the pool has more.
+        With ``stream`` the body is left unread and the caller closes it.
+        """
+        started = time.monotonic()
+        attempts = 0
+        while True:
+            if not self.circuit_breaker.allow():
+                self.metrics.inc('circuit_rejections_total', kind=kind)
+                raise CircuitOpenError(
+                    f"Upstream circuit open; retry in {self.circuit_breaker.retry_in:.1f}s")
+
+            waited = await self.rate_limiter.acquire_async(kind)
+            session, session_wait = await self.sessions.acquire_async(kind)
+            attempts += 1
+            retry_after = None
+            try:
+                if session_wait > 0:
+                    await asyncio.sleep(session_wait)
+                self.metrics.observe_stages({'rate_limit_wait': waited + session_wait}, kind=kind)
+                request_kwargs = {**kwargs, 'headers': {**session.headers, **(kwargs.get('headers') or {})}}
+                sent = time.monotonic()
+                with self.metrics.timer('stage_seconds', stage='fetch', kind=kind):
+                    if stream:
+                        response = await self.http.send(
+                            self.http.build_request(method, url, **request_kwargs), stream=True)
+                    else:
+                        response = await self.http.request(method, url, **request_kwargs)
+            except httpx.HTTPError as e:
+                self._release_session(session, kind, ok=False)
+                self.metrics.record_error('fetch', e)
+                self.circuit_breaker.record_failure()
+                reason = type(e).__name__
+                delay = self.retry_policy.next_delay(attempts, time.monotonic() - started)
+                if delay is None:
+                    raise
+            except BaseException:
+                self.sessions.abandon(session)
+                raise
+            else:
+                self.metrics.inc('upstream_responses_total', kind=kind,
+                                 status=str(response.status_code))
+                outcome = self.retry_policy.classify(response.status_code, response.headers)
+                challenged = self.retry_policy.challenged(response.status_code, response.headers)
+                self._release_session(
+                    session, kind, ok=outcome == RetryPolicy.OK, latency=time.monotonic() - sent,
+                    challenged=challenged, cookies=response.cookies)
+                # A challenge refuses one identity; another session may get through
+                switch_session = challenged and len(self.sessions) > 1
+                if outcome == RetryPolicy.OK and not switch_session:
+                    self.circuit_breaker.record_success()
+                    return response
+                if switch_session:
+                    self.circuit_breaker.release_probe()
+                else:
+                    self.circuit_breaker.record_failure()
+                if outcome == RetryPolicy.FAIL and not switch_session:
+                    return response
+                reason = str(response.status_code)
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                delay = self.retry_policy.next_delay(
+                    attempts, time.monotonic() - started, retry_after)
+                if delay is None:
+                    return response
+                await response.aclose()
+
+            self.metrics.inc('retries_total', kind=kind, reason=reason)
+            await asyncio.sleep(delay)
+
+    def _release_session(self, session, kind: str, ok: bool, **outcome):
+        """Report a request's outcome to the session pool and count it per session"""
+        self.metrics.inc('session_requests_total', session=session.name, kind=kind,
+                         result='ok' if ok else 'error')
+        if self.sessions.release(session, ok, **outcome):
+            self.metrics.inc('session_quarantines_total', session=session.name)
+
+    async def _post_typeahead(self,
+                              query: str,
+                              filter_type: SearchFilter,
+                              validators: Optional[Dict] = None) -> PageFetch:
+        """POST a query to the typeahead API"""
+        headers = {'Cache-Control': 'max-age=0'}
+        headers.update(conditional_headers(validators))
+        response = await self._request(
+            RateLimiter.TYPEAHEAD, 'POST', f"{self.base_url}/typeahead",
+            data={
+                'search': query,
+                'filter': filter_type.value
+            },
+            headers=headers
+        )
+        return PageFetch(
+            status=response.status_code,
+            content=response.content if response.status_code == 200 else None,
+            etag=response.headers.get('ETag'),
+            last_modified=response.headers.get('Last-Modified')
+        )
+
+    async def search_companies(self,
+                               query: str,
+                               filter_type: SearchFilter = SearchFilter.COMPANY,
+                               max_results: Optional[int] = None,
+                               local_first: bool = False) -> List[CompanySearchResult]:
+        """Search for companies using typeahead API
+
+        ``local_first`` answers from the local ``index`` when it has any
+        match, without a rate-limited round trip; misses go to the network.
+        """
+        if local_first and self.index is not None:
+            local = self.index.search(query, filter_type, max_results)
+            self.metrics.inc('index_requests_total', result='hit' if local else 'miss')
+            if local:
+                return local
+
+        if self.cache is not None:
+            cached = await self._cached('get_search', query, filter_type)
+            self.metrics.inc('cache_requests_total', kind='search',
+                             result='miss' if cached is None else 'hit')
+            if cached is not None:
+                if self.index is not None:
+                    self.index.add(cached, filter_type)
+                return cached[:max_results or None]
+
+        # Concurrent identical searches share one request and parse
+        results = await self._inflight.do(
+            ResponseCache.search_key(query, filter_type),
+            self._search_uncached, query, filter_type)
+        if self.index is not None:
+            self.index.add(results, filter_type)
+        return results[:max_results or None]
+
+    async def _search_uncached(self, query: str, filter_type: SearchFilter) -> List[CompanySearchResult]:
+        """Fetch a search, or with ``shared_flight`` take another worker's fresh result"""
+        if self.shared_flight is None or self.cache is None:
+            return await self._fetch_search(query, filter_type)
+        key = ResponseCache.search_key(query, filter_type)
+        async with self.shared_flight.hold_async(key) as leader:
+            if not leader:
+                cached = await self._cached('get_search', query, filter_type)
+                if cached is not None:
+                    return cached
+            return await self._fetch_search(query, filter_type)
+
+    async def _fetch_search(self, query: str, filter_type: SearchFilter) -> List[CompanySearchResult]:
+        """Fetch and parse the full typeahead result list, revalidating any stale entry"""
+        try:
+            stale = await self._cached(
+                'get_stale_search', query, filter_type) if self.cache is not None else None
+
+            try:
+                page = await self._post_typeahead(
+                    query, filter_type, stale.value if stale else None)
+            except (httpx.HTTPError, CircuitOpenError) as e:
+                if stale is not None:
+                    # Upstream unavailable: stale results beat no results
+                    self.metrics.inc('cache_requests_total', kind='search', result='stale')
+                    return self.cache.stale_search(stale)
+                if isinstance(e, CircuitOpenError):
+                    raise
+                raise NetworkError(f"Async search request failed: {str(e)}")
+
+            if stale is not None and self.retry_policy.unavailable(page.status):
+                self.metrics.inc('cache_requests_total', kind='search', result='stale')
+                return self.cache.stale_search(stale)
+            if stale is not None and page.not_modified:
+                self.metrics.inc('cache_requests_total', kind='search', result='revalidated')
+                return await self._cached('revalidate_search', query, filter_type, stale, page)
+            if not page.content:
+                raise NetworkError("Async search request returned no content")
+
+            digest = None
+            if self.cache is not None:
+                digest = content_hash(page.content)
+                if stale is not None and stale.value.get('content_hash') == digest:
+                    self.metrics.inc('cache_requests_total', kind='search', result='revalidated')
+                    return await self._cached('revalidate_search', query, filter_type, stale, page)
+
+            results = await self._run_parser(parse_search_page, page.content)
+            if self.cache is not None:
+                await self._cached('set_search', query, filter_type, results, page, digest, stale)
+            return results
+
+        except NetworkError:
+            raise
+        except Exception as e:
+            self.metrics.record_error('parse', e)
+            raise SearchError(f"Search parsing failed: {str(e)}")
+
+    async def _fetch_page(self,
+                          company_id: str,
+                          validators: Optional[Dict] = None,
+                          selection: Optional[Selection] = None) -> PageFetch:
+        """Fetch stage: raw HTML bytes for a company
+
+        ``validators`` from a cached entry turn this into a conditional GET.
+        With ``stream_parse`` the page is parsed for ``selection`` as it
+        downloads and comes back as ``rc_sections`` instead of ``content``.
+        Raises ``CircuitOpenError`` while the circuit breaker is open.
+        """
+        try:
+            response = await self._request(
+                RateLimiter.COMPANY_PAGE, 'GET', f"{self.base_url}/{company_id}",
+                stream=self.stream_parse, headers=conditional_headers(validators))
+        except httpx.HTTPError:
+            return PageFetch(status=0)
+        page = PageFetch(
+            status=response.status_code,
+            etag=response.headers.get('ETag'),
+            last_modified=response.headers.get('Last-Modified')
+        )
+        if response.status_code != 200:
+            await response.aclose()
+            return page
+        if not self.stream_parse:
+            page.content = response.content
+            return page
+
+        loop = asyncio.get_running_loop()
+        executor = None if isinstance(self.parse_executor, ProcessPoolExecutor) else self.parse_executor
+        try:
+            parser = StreamingPageParser(response.headers.get('Content-Encoding'), selection)
+            with self.metrics.timer('stage_seconds', stage='download', kind=RateLimiter.COMPANY_PAGE):
+                async for chunk in response.aiter_raw(STREAM_READ_SIZE):
+                    # The next chunk keeps arriving while this one is parsed
+                    await loop.run_in_executor(executor, parser.feed, chunk)
+        except httpx.HTTPError as e:
+            self.metrics.record_error('fetch', e)
+            return PageFetch(status=0)
+        finally:
+            await response.aclose()
+        if parser.size:
+            page.rc_sections = await loop.run_in_executor(executor, parser.close)
+            page.digest = parser.digest
+            self.metrics.observe_stages(parser.timings, kind='company_page')
+        return page
+
+    async def _parse_page(self, content: bytes, selection: Optional[Selection] = None) -> Dict:
+        """Parse stage: rc_sections from raw HTML bytes"""
+        if not self.metrics.enabled:
+            return await self._run_parser(
+                parse_company_page, content, self.parser_engine, selection)
+
+        rc_sections, timings = await self._run_parser(
+            parse_company_page_timed, content, self.parser_engine, time.time(), selection)
+        self.metrics.observe_stages(timings, kind='company_page')
+        return rc_sections
+
+    async def get_company_data(self,
+                               company_id: str,
+                               refresh: bool = False,
+                               sections: Union[str, Iterable[str], None] = None,
+                               fields: Union[str, Iterable[str], None] = None,
+                               max_age: Optional[float] = None,
+                               max_stale: Optional[float] = None) -> CompanyData:
+        """Get complete company data by company ID
+
+        ``refresh`` skips the fresh-cache lookup and revalidates the cached
+        page with the upstream, reparsing only if it changed.
+
+        ``sections`` and ``fields`` (comma-separated or lists, see
+        ``Selection``) narrow the result at parse time. A cached full page
+        is narrowed instead of refetched; narrowed parses are not cached.
+
+        ``max_age`` caps the age of a cached page (default: the cache TTL).
+        An older page within ``max_stale`` more seconds (default: the
+        client's ``max_stale``) is returned at once, flagged ``stale``, and
+        refreshed in the background.
+        """
+        selection = Selection.coerce(sections, fields)
+        if self.cache is not None and not refresh:
+            cached = await self._cached(
+                'get_company', company_id, max_age, self.max_stale if max_stale is None else max_stale)
+            self.metrics.inc('cache_requests_total', kind='company',
+                             result='miss' if cached is None else 'stale' if cached.stale else 'hit')
+            if cached is not None:
+                if cached.stale:
+                    self._refresh_in_background(company_id)
+                return self._narrow(cached, selection)
+
+        key = ResponseCache.company_key(company_id)
+        if selection is not None:
+            key = f"{key}#{selection.key}"
+        # Concurrent lookups of the same company share one fetch and parse
+        return await self._inflight.do(
+            key, self._get_company_data_uncached, company_id, selection)
+
+    async def cached_company(self, company_id: str) -> Optional[CompanyData]:
+        """Fresh cached company data, or None on a miss; never fetches"""
+        if self.cache is None:
+            return None
+        return await self._cached('get_company', company_id)
+
+    def _refresh_in_background(self, company_id: str):
+        """Refetch a company in a background task, at most once at a time per company"""
+        key = ResponseCache.company_key(company_id)
+        if key in self._background:
+            return
+        # Shares the fetch with any foreground refresh of the same page
+        task = asyncio.ensure_future(
+            self._inflight.do(key, self._get_company_data_uncached, company_id, None))
+        self._background[key] = task
+        task.add_done_callback(lambda _: self._background.pop(key, None))
+        self.metrics.inc('background_refreshes_total')
+
+    @staticmethod
+    def _narrow(company_data: CompanyData, selection: Optional[Selection]) -> CompanyData:
+        """Copy of fully parsed company data cut down to ``selection``"""
+        if selection is None:
+            return company_data
+        return replace(company_data, rc_sections=selection.apply(company_data.rc_sections))
+
+    async def _get_company_data_uncached(self,
+                                         company_id: str,
+                                         selection: Optional[Selection] = None) -> CompanyData:
+        """Fetch a company, or with ``shared_flight`` take another worker's fresh result"""
+        if self.shared_flight is None or self.cache is None:
+            return await self._fetch_company_data(company_id, selection)
+        async with self.shared_flight.hold_async(ResponseCache.company_key(company_id)) as leader:
+            if not leader:
+                cached = await self._cached('get_company', company_id)
+                if cached is not None:
+                    return self._narrow(cached, selection)
+            return await self._fetch_company_data(company_id, selection)
+
+    async def _fetch_company_data(self,
+                                  company_id: str,
+                                  selection: Optional[Selection] = None) -> CompanyData:
+        """Fetch and parse a company page, revalidating any stale cache entry"""
+        try:
+            stale = await self._cached(
+                'get_stale_company', company_id) if self.cache is not None else None
+
+            try:
+                page = await self._fetch_page(company_id, stale.value if stale else None, selection)
+            except CircuitOpenError:
+                if stale is None:
+                    raise
+                page = PageFetch(status=0)
+            if stale is not None and self.retry_policy.unavailable(page.status):
+                # Upstream unavailable: serve the stale page rather than an error
+                self.metrics.inc('cache_requests_total', kind='company', result='stale')
+                return self._narrow(self.cache.stale_company(company_id, stale), selection)
+            if stale is not None and page.not_modified:
+                self.metrics.inc('cache_requests_total', kind='company', result='revalidated')
+                return self._narrow(
+                    await self._cached('revalidate_company', company_id, stale, page), selection)
+            if not page.content and page.rc_sections is None:
+                return CompanyData(
+                    company_id=company_id,
+                    rc_sections={},
+                    extraction_timestamp=time.strftime('%Y-%m-%d %H:%M:%S'),
+                    success=False,
+                    error_message="Failed to fetch HTML content" + (
+                        f" (status {page.status})" if page.status else "")
+                )
+
+            digest = None
+            if self.cache is not None:
+                digest = content_hash(page.content) if page.content else page.digest
+                if stale is not None and digest is not None and stale.value.get('content_hash') == digest:
+                    self.metrics.inc('cache_requests_total', kind='company', result='revalidated')
+                    return self._narrow(
+                    await self._cached('revalidate_company', company_id, stale, page), selection)
+
+            rc_sections = page.rc_sections
+            if rc_sections is None:
+                rc_sections = await self._parse_page(page.content, selection)
+
+            company_data = CompanyData(
+                company_id=company_id,
+                rc_sections=rc_sections,
+                extraction_timestamp=time.strftime('%Y-%m-%d %H:%M:%S'),
+                success=True
+            )
+            if self.cache is not None and selection is None:
+                await self._cached('set_company', company_data, page, digest, stale)
+            return company_data
+
+        except Exception as e:
+            self.metrics.record_error('company', e)
+            return CompanyData(
+                company_id=company_id,
+                rc_sections={},
+                extraction_timestamp=time.strftime('%Y-%m-%d %H:%M:%S'),
+                success=False,
+                error_message=str(e)
+            )
+
+    async def get_companies_data(self,
+                                 company_ids: List[str],
+                                 concurrency: int = 10) -> List[CompanyData]:
+        """Get data for many companies, in order, with bounded concurrency
+
+        Fetches share the client's rate limiter, and a failed company is
+        recorded in its own ``success``/``error_message`` instead of
+        aborting the batch.
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def fetch(company_id: str) -> CompanyData:
+            async with semaphore:
+                return await self._get_company_data_safe(company_id)
+
+        return list(await asyncio.gather(*(fetch(company_id) for company_id in company_ids)))
+
+    async def iter_companies_data(self,
+                                  company_ids: Iterable[str],
+                                  concurrency: int = 10) -> AsyncIterator[CompanyData]:
+        """Yield company data as soon as each page is parsed
+
+        Results come in completion order. At most ``concurrency`` lookups
+        are in flight and ``company_ids`` is consumed lazily, so memory
+        stays flat regardless of batch size.
+        """
+        ids = iter(company_ids)
+        pending = set()
+        try:
+            while True:
+                while len(pending) < max(1, concurrency):
+                    company_id = next(ids, None)
+                    if company_id is None:
+                        break
+                    pending.add(asyncio.ensure_future(
+                        self._get_company_data_safe(company_id)))
+
+                if not pending:
+                    return
+
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _get_company_data_safe(self, company_id: str) -> CompanyData:
+        """get_company_data that records any failure on the result"""
+        try:
+            return await self.get_company_data(company_id)
+        except Exception as e:
+            return CompanyData(
+                company_id=company_id,
+                rc_sections={},
+                extraction_timestamp=time.strftime('%Y-%m-%d %H:%M:%S'),
+                success=False,
+                error_message=str(e)
+            )
+
+    async def search_and_get_data(self,
+                                  query: str,
+                                  exact_match: bool = False,
+                                  max_search_results: int = 5) -> List[CompanyData]:
+        """Search for companies and get their data in one call"""
+        try:
+            search_results = await self.search_companies(
+                query, max_results=max_search_results)
+
+            if exact_match:
+                search_results = [
+                    result for result in search_results
+                    if query.lower() in result.name.lower()
+                ]
+
+            return await self.get_companies_data(
+                [result.id for result in search_results])
+
+        except Exception as e:
+            raise ZaubaCorpError(
+                f"Search and data extraction failed: {str(e)}")
+
+    async def refresh_watchlist(self,
+                                watchlist: Watchlist,
+                                concurrency: int = 10,
+                                refresh: bool = True) -> List[CompanyChanges]:
+        """Refetch every watched company and return only those that changed
+
+        ``refresh`` revalidates cached pages, so an unchanged page costs a
+        304 and a digest comparison. Failed lookups are skipped and keep
+        their previous snapshot.
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def check(company_id: str) -> Optional[CompanyChanges]:
+            async with semaphore:
+                try:
+                    company_data = await self.get_company_data(company_id, refresh=refresh)
+                except Exception as e:
+                    self.metrics.record_error('watchlist', e)
+                    return None
+            changes = watchlist.record(company_data)
+            self.metrics.inc('watchlist_checks_total',
+                             result='failed' if not company_data.success
+                             else 'unchanged' if changes is None else 'changed')
+            return changes
+
+        results = await asyncio.gather(*(check(company_id) for company_id in watchlist.company_ids()))
+        return [changes for changes in results if changes is not None]
+
+    async def aclose(self):
+        """Cancel background refreshes and close the shared HTTP connection pool"""
+        for task in list(self._background.values()):
+            task.cancel()
+        await self.http.aclose()
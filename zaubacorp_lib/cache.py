@@ -0,0 +1,437 @@
+# ============================================================================
+# zaubacorp_lib/cache.py
+# ============================================================================
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List, Optional
+
+from .models import SearchFilter, CompanySearchResult, CompanyData, PageFetch
+from .sections import RcSections
+
+
+def content_hash(content: bytes) -> str:
+    """Cheap fingerprint used to detect unchanged pages without parsing them"""
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+def content_hasher():
+    """Incremental ``content_hash``: ``update`` it chunk by chunk, then read ``hexdigest()``"""
+    return hashlib.blake2b(digest_size=16)
+
+
+def conditional_headers(value: Optional[Dict]) -> Dict[str, str]:
+    """If-None-Match/If-Modified-Since headers from a cached value's validators"""
+    headers = {}
+    if value:
+        if value.get('etag'):
+            headers['If-None-Match'] = value['etag']
+        if value.get('last_modified'):
+            headers['If-Modified-Since'] = value['last_modified']
+    return headers
+
+
+def _json_size(value: Any) -> int:
+    """Approximate bytes held by a cached value: the length of its JSON form"""
+    compact = 0
+
+    def encode(obj: Any) -> Any:
+        nonlocal compact
+        if isinstance(obj, RcSections):
+            # Section by section, as RcSections.to_json() would memoize the text on the entry
+            compact += sum(len(title) + len(section.to_json()) + 4 for title, section in obj.compact_items())
+            return None
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+    return len(json.dumps(value, default=encode)) + compact
+
+
+@dataclass
+class CacheEntry:
+    """A cached value, the time it was stored and how long it stays fresh (None: forever)"""
+    value: Any
+    stored_at: float
+    tier: str = "memory"
+    ttl: Optional[float] = None
+
+    @property
+    def expired(self) -> bool:
+        return self.ttl is not None and self.age > self.ttl
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.stored_at
+
+
+class LRUCache:
+    """In-process LRU cache with TTL, entry-count and byte-size eviction
+
+    ``max_bytes`` bounds the summed JSON length of the cached values, an
+    approximation of the memory they hold; None bounds the entry count only.
+    """
+
+    def __init__(self,
+                 max_entries: int = 1024,
+                 ttl: Optional[float] = 3600.0,
+                 max_bytes: Optional[int] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str, allow_stale: bool = False) -> Optional[CacheEntry]:
+        """Return the entry for ``key``, or None if missing or expired
+
+        Expired entries stay until evicted so they can be revalidated;
+        ``allow_stale`` returns them too.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if not allow_stale and entry.expired:
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, value: Any, stored_at: Optional[float] = None, ttl: Optional[float] = None):
+        """Store ``value`` under ``key``, evicting least recently used entries
+
+        ``ttl`` replaces the cache TTL for this entry. A value larger than
+        ``max_bytes`` on its own is not kept.
+        """
+        entry = CacheEntry(value=value, stored_at=stored_at or time.time(),
+                           ttl=self.ttl if ttl is None else ttl)
+        size = _json_size(value) if self.max_bytes is not None else 0
+        with self._lock:
+            if self.max_bytes is not None and size > self.max_bytes:
+                # Would flush everything else and still not fit
+                self._entries.pop(key, None)
+                self.size_bytes -= self._sizes.pop(key, 0)
+                return
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self.size_bytes += size - self._sizes.get(key, 0)
+            self._sizes[key] = size
+            while (len(self._entries) > self.max_entries
+                   or (self.max_bytes is not None and self.size_bytes > self.max_bytes)):
+                evicted, _ = self._entries.popitem(last=False)
+                self.size_bytes -= self._sizes.pop(evicted)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+            self.size_bytes -= self._sizes.pop(key, 0)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self.size_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache:
+    """On-disk cache of zlib-compressed JSON values that survives restarts"""
+
+    def __init__(self, path: str, ttl: Optional[float] = 86400.0):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache "
+                "(key TEXT PRIMARY KEY, stored_at REAL NOT NULL, value BLOB NOT NULL)"
+            )
+
+    def get(self, key: str, allow_stale: bool = False) -> Optional[CacheEntry]:
+        """Return the entry for ``key``, or None if missing or expired
+
+        Expired rows are kept until ``purge_expired`` so they can be
+        revalidated; ``allow_stale`` returns them too.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT stored_at, value FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        stored_at, blob = row
+        if not allow_stale and self.ttl is not None and time.time() - stored_at > self.ttl:
+            return None
+        value = json.loads(zlib.decompress(blob).decode('utf-8'))
+        return CacheEntry(value=value, stored_at=stored_at, tier="disk", ttl=self.ttl)
+
+    @staticmethod
+    def _encode(obj: Any) -> Any:
+        if isinstance(obj, RcSections):
+            return obj.to_dict()
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+    def set(self, key: str, value: Any, stored_at: Optional[float] = None):
+        """Store a JSON-serializable ``value`` under ``key``"""
+        blob = zlib.compress(json.dumps(value, default=self._encode).encode('utf-8'))
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, stored_at, value) VALUES (?, ?, ?)",
+                (key, stored_at or time.time(), blob)
+            )
+
+    def delete(self, key: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def purge_expired(self) -> int:
+        """Delete expired rows and return how many were removed"""
+        if self.ttl is None:
+            return 0
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM cache WHERE stored_at < ?", (time.time() - self.ttl,))
+            return cursor.rowcount
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class RevalidationStats:
+    """Counters for conditional refreshes of expired or force-refreshed entries"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.not_modified = 0
+        self.unchanged = 0
+        self.changed = 0
+
+    def record(self, outcome: str):
+        """Count a refresh outcome: ``not_modified``, ``unchanged`` or ``changed``"""
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    @property
+    def saved(self) -> int:
+        """Refreshes that skipped parsing because the page had not changed"""
+        return self.not_modified + self.unchanged
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            'revalidations': self.not_modified + self.unchanged + self.changed,
+            'not_modified': self.not_modified,
+            'unchanged': self.unchanged,
+            'changed': self.changed,
+            'saved': self.saved,
+        }
+
+
+class ResponseCache:
+    """Two-tier cache for company pages and typeahead results
+
+    Lookups hit the in-process LRU first, then the optional disk store;
+    disk hits are promoted back into memory, where they stay fresh as long
+    as the disk tier would serve them but at most the memory TTL. Only successful company
+    extractions are cached. Cached values are shared, so callers must not
+    mutate the ``rc_sections`` they get back.
+
+    Each value also keeps the page's ETag, Last-Modified and content hash
+    so expired entries can be refreshed with a conditional request; a 304
+    or an identical hash reuses the cached result without reparsing.
+    """
+
+    def __init__(self,
+                 memory: Optional[LRUCache] = None,
+                 disk: Optional[SQLiteCache] = None):
+        self.memory = memory if memory is not None else LRUCache()
+        self.disk = disk
+        self.stats = RevalidationStats()
+
+    @staticmethod
+    def company_key(company_id: str) -> str:
+        return f"company:{company_id}"
+
+    @staticmethod
+    def search_key(query: str, filter_type: SearchFilter) -> str:
+        return f"search:{filter_type.value}:{query.strip().lower()}"
+
+    def _get(self, key: str, allow_stale: bool = False) -> Optional[CacheEntry]:
+        entry = self.memory.get(key, allow_stale)
+        if entry is not None:
+            return entry
+        if self.disk is not None:
+            entry = self.disk.get(key, allow_stale)
+            if entry is not None:
+                ttl = entry.ttl
+                if self.memory.ttl is not None:
+                    # Keep the true age, so max_age and cache_age still hold
+                    horizon = entry.age + self.memory.ttl
+                    ttl = horizon if ttl is None else min(ttl, horizon)
+                self.memory.set(key, entry.value, stored_at=entry.stored_at, ttl=ttl)
+            return entry
+        return None
+
+    def _set(self, key: str, value: Any):
+        stored_at = time.time()
+        self.memory.set(key, value, stored_at=stored_at)
+        if self.disk is not None:
+            self.disk.set(key, value, stored_at=stored_at)
+
+    @staticmethod
+    def _with_validators(value: Dict, page: Optional[PageFetch], digest: Optional[str]) -> Dict:
+        if page is not None:
+            value['etag'] = page.etag
+            value['last_modified'] = page.last_modified
+        value['content_hash'] = digest
+        return value
+
+    @staticmethod
+    def _company_from_entry(company_id: str, entry: CacheEntry, tier: str) -> CompanyData:
+        rc_sections = entry.value['rc_sections']
+        if not isinstance(rc_sections, RcSections):
+            # Loaded from disk as plain dicts; compact them once, in place, so
+            # the copy promoted into memory is compact from now on
+            rc_sections = entry.value['rc_sections'] = RcSections.from_dict(rc_sections)
+        return CompanyData(
+            company_id=company_id,
+            rc_sections=rc_sections,
+            extraction_timestamp=entry.value['extraction_timestamp'],
+            success=True,
+            cache_hit=True,
+            cache_tier=tier,
+            cache_age=entry.age
+        )
+
+    def _revalidate(self, key: str, entry: CacheEntry, page: PageFetch):
+        """Re-store an unchanged entry with a fresh timestamp and updated validators"""
+        self.stats.record('not_modified' if page.not_modified else 'unchanged')
+        value = dict(entry.value)
+        # A 304 carries no body, so keep the stored hash
+        if page.etag:
+            value['etag'] = page.etag
+        if page.last_modified:
+            value['last_modified'] = page.last_modified
+        self._set(key, value)
+        entry.value = value
+        entry.stored_at = time.time()
+
+    def get_company(self,
+                    company_id: str,
+                    max_age: Optional[float] = None,
+                    max_stale: float = 0.0) -> Optional[CompanyData]:
+        """Return cached company data marked with its cache tier and age
+
+        Entries older than ``max_age`` (default: the cache TTL) are only
+        returned within ``max_stale`` further seconds, flagged ``stale``.
+        """
+        key = self.company_key(company_id)
+        if max_age is None:
+            entry = self._get(key)
+            if entry is not None:
+                return self._company_from_entry(company_id, entry, entry.tier)
+            if not max_stale:
+                return None
+        entry = self._get(key, allow_stale=True)
+        if entry is None:
+            return None
+        limit = max_age
+        if limit is None:
+            # Expired in the tier it came from
+            limit = entry.ttl
+        age = entry.age
+        if limit is not None and age > limit:
+            if age > limit + max_stale:
+                return None
+            return replace(self._company_from_entry(company_id, entry, entry.tier), stale=True)
+        return self._company_from_entry(company_id, entry, entry.tier)
+
+    def get_stale_company(self, company_id: str) -> Optional[CacheEntry]:
+        """Return the cached company entry regardless of age, for revalidation"""
+        return self._get(self.company_key(company_id), allow_stale=True)
+
+    def set_company(self,
+                    company_data: CompanyData,
+                    page: Optional[PageFetch] = None,
+                    digest: Optional[str] = None,
+                    stale: Optional[CacheEntry] = None):
+        """Store freshly parsed company data; ``stale`` is the entry it replaces"""
+        if not company_data.success:
+            return
+        if stale is not None:
+            self.stats.record('changed')
+        self._set(self.company_key(company_data.company_id), self._with_validators({
+            'rc_sections': company_data.rc_sections,
+            'extraction_timestamp': company_data.extraction_timestamp
+        }, page, digest))
+
+    def revalidate_company(self, company_id: str, stale: CacheEntry, page: PageFetch) -> CompanyData:
+        """Serve a stale entry the upstream confirmed unchanged"""
+        self._revalidate(self.company_key(company_id), stale, page)
+        return self._company_from_entry(company_id, stale, "revalidated")
+
+    def stale_company(self, company_id: str, stale: CacheEntry) -> CompanyData:
+        """Serve a stale entry as is while the upstream cannot be reached"""
+        return self._company_from_entry(company_id, stale, "stale")
+
+    @staticmethod
+    def _results_from_entry(entry: CacheEntry) -> List[CompanySearchResult]:
+        return [CompanySearchResult(id=item[0], name=item[1]) for item in entry.value['results']]
+
+    def get_search(self, query: str, filter_type: SearchFilter) -> Optional[List[CompanySearchResult]]:
+        entry = self._get(self.search_key(query, filter_type))
+        if entry is None:
+            return None
+        return self._results_from_entry(entry)
+
+    def get_stale_search(self, query: str, filter_type: SearchFilter) -> Optional[CacheEntry]:
+        return self._get(self.search_key(query, filter_type), allow_stale=True)
+
+    def set_search(self,
+                   query: str,
+                   filter_type: SearchFilter,
+                   results: List[CompanySearchResult],
+                   page: Optional[PageFetch] = None,
+                   digest: Optional[str] = None,
+                   stale: Optional[CacheEntry] = None):
+        if stale is not None:
+            self.stats.record('changed')
+        self._set(self.search_key(query, filter_type), self._with_validators({
+            'results': [[result.id, result.name] for result in results]
+        }, page, digest))
+
+    def revalidate_search(self,
+                          query: str,
+                          filter_type: SearchFilter,
+                          stale: CacheEntry,
+                          page: PageFetch) -> List[CompanySearchResult]:
+        self._revalidate(self.search_key(query, filter_type), stale, page)
+        return self._results_from_entry(stale)
+
+    def stale_search(self, stale: CacheEntry) -> List[CompanySearchResult]:
+        """Serve stale typeahead results as is while the upstream cannot be reached"""
+        return self._results_from_entry(stale)
+
+    def invalidate_company(self, company_id: str):
+        key = self.company_key(company_id)
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def close(self):
+        if self.disk is not None:
+            self.disk.close()
@@ -0,0 +1,409 @@
+# ============================================================================
+# zaubacorp_lib/crawler.py
+# ============================================================================
+
+"""
+Company/director relationship crawler.
+
+Starting from seed companies or director names, ``Crawler`` fetches each
+page through an ``AsyncZaubaCorpClient`` (sharing its rate limiter, cache
+and single-flight) and follows the director and company links found in
+its rc_sections tables: a company's director table leads to director
+pages, whose company tables lead to further companies. Nodes are
+deduplicated by DIN/CIN, so each person or company is fetched once however
+many pages link to it.
+
+``crawl`` is an async iterator of ``CrawlNode`` and ``CrawlEdge`` events.
+With a ``checkpoint`` path the frontier, finished nodes and emitted edges
+are kept in SQLite, and a crawl interrupted at any point resumes where it
+stopped when run again.
+"""
+
+import asyncio
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from .async_client import AsyncZaubaCorpClient
+from .models import CompanyData, SearchFilter
+from .sections import RcSections
+
+COMPANY = "company"
+DIRECTOR = "director"
+
+# Identifier columns and the kind of node they point to
+_ID_HEADERS = {
+    'din': DIRECTOR,
+    'cin': COMPANY,
+    'llpin': COMPANY,
+    'fcrn': COMPANY,
+}
+_ID_PATTERNS = {
+    DIRECTOR: re.compile(r'^\d{8}$'),
+    COMPANY: re.compile(r'^(?:[LU]\d{5}[A-Z]{2}\d{4}[A-Z]{3}\d{6}|[A-Z]{3}-\d{4}|F\d{5})$'),
+}
+_NAME_HEADER = re.compile(r'\bname\b', re.IGNORECASE)
+
+# Sections listing companies that are not related to the page
+IGNORED_SECTIONS = ("similar companies",)
+
+
+@dataclass
+class CrawlNode:
+    """A company or director page the crawl reached
+
+    ``success`` is False when the page could not be fetched; such a node
+    is not expanded and is retried when a checkpointed crawl resumes.
+    """
+    id: str
+    kind: str  # company or director
+    name: str
+    depth: int
+    success: bool = True
+    error_message: Optional[str] = None
+
+    def to_dict(self) -> Dict:
+        return {
+            'type': 'node',
+            'id': self.id,
+            'kind': self.kind,
+            'name': self.name,
+            'depth': self.depth,
+            'success': self.success,
+            'error_message': self.error_message
+        }
+
+
+@dataclass
+class CrawlEdge:
+    """A link between two nodes; director links always point director -> company"""
+    source: str
+    target: str
+    relation: str  # director or associated
+    attributes: Dict[str, str] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict:
+        return {
+            'type': 'edge',
+            'source': self.source,
+            'target': self.target,
+            'relation': self.relation,
+            'attributes': self.attributes
+        }
+
+
+@dataclass
+class Link:
+    """A director or company named in one of a page's tables"""
+    kind: str
+    identifier: str
+    name: str
+    section: str
+    attributes: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def node_id(self) -> str:
+        return node_id(self.kind, self.name, self.identifier)
+
+
+def node_id(kind: str, name: str, identifier: str) -> str:
+    """Page path of a company or director, e.g. ``director/ANJALI-IYER/06724039``"""
+    slug = re.sub(r'[^A-Za-z0-9]+', '-', name.upper()).strip('-') or identifier
+    return f"{kind}/{slug}/{identifier}"
+
+
+def _node_key(kind: str, page_id: str) -> str:
+    """Deduplication key: the DIN/CIN that ends every page path"""
+    return f"{kind}:{page_id.rstrip('/').rsplit('/', 1)[-1].upper()}"
+
+
+def _node_kind(page_id: str) -> str:
+    return DIRECTOR if page_id.startswith('director/') else COMPANY
+
+
+def _name_from_id(page_id: str) -> str:
+    parts = page_id.strip('/').split('/')
+    return parts[1].replace('-', ' ') if len(parts) >= 3 else page_id
+
+
+def _table_links(title: str, rows: List[Dict[str, str]]) -> List[Link]:
+    """Links in one table whose header row names a DIN/CIN column"""
+    if len(rows) < 2:
+        return []
+    header = rows[0]
+    if all(key.startswith('column_') for key in header):
+        # Wide table: the header row maps column keys to titles
+        titles = {key: value for key, value in header.items()}
+    elif len(header) == 1:
+        # Two-column table: {identifier title: name title}
+        (id_title, name_title), = header.items()
+        kind = _ID_HEADERS.get(id_title.strip().lower())
+        if kind is None or not _NAME_HEADER.search(name_title):
+            return []
+        links = []
+        for row in rows[1:]:
+            for identifier, name in row.items():
+                identifier = identifier.strip().upper()
+                if _ID_PATTERNS[kind].match(identifier):
+                    links.append(Link(kind, identifier, name, title))
+        return links
+    else:
+        return []
+
+    id_column = kind = None
+    name_column = None
+    for key, column_title in titles.items():
+        column_kind = _ID_HEADERS.get(column_title.strip().lower())
+        if column_kind is not None and id_column is None:
+            id_column, kind = key, column_kind
+        elif name_column is None and _NAME_HEADER.search(column_title):
+            name_column = key
+    if id_column is None or name_column is None:
+        return []
+
+    links = []
+    for row in rows[1:]:
+        identifier = row.get(id_column, '').strip().upper()
+        name = row.get(name_column, '')
+        if not name or not _ID_PATTERNS[kind].match(identifier):
+            continue
+        attributes = {titles[key]: value for key, value in row.items()
+                      if key in titles and key not in (id_column, name_column)}
+        links.append(Link(kind, identifier, name, title, attributes))
+    return links
+
+
+def extract_links(rc_sections, ignored_sections: Iterable[str] = IGNORED_SECTIONS) -> List[Link]:
+    """Directors and companies listed in a page's rc_sections tables
+
+    Tables are recognised by a header row with a DIN, CIN, LLPIN or FCRN
+    column next to a name column; the other columns of each row (such as
+    designation and appointment date) become the link's attributes.
+    Sections whose title is in ``ignored_sections`` are skipped.
+    """
+    ignored = {title.lower() for title in ignored_sections}
+    links = []
+    for title, section in RcSections.from_dict(rc_sections).compact_items():
+        if title.lower() in ignored or not section.tables:
+            continue
+        for table in section.tables:
+            links.extend(_table_links(title, [row.to_dict() for row in table.rows]))
+    return links
+
+
+class CrawlCheckpoint:
+    """Frontier, visited nodes and emitted edges of a crawl, in SQLite or memory"""
+
+    QUEUED = "queued"
+    DONE = "done"
+    FAILED = "failed"
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        with self._lock, self._conn:
+            if path is not None:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS nodes "
+                "(key TEXT PRIMARY KEY, id TEXT NOT NULL, kind TEXT NOT NULL, name TEXT NOT NULL, "
+                "depth INTEGER NOT NULL, state TEXT NOT NULL, sequence INTEGER NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS edges "
+                "(source TEXT NOT NULL, target TEXT NOT NULL, relation TEXT NOT NULL, "
+                "PRIMARY KEY (source, target, relation))"
+            )
+
+    def load(self) -> Dict[str, Tuple[str, str, str, int, str]]:
+        """Every node as key -> (id, kind, name, depth, state), in admission order"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, id, kind, name, depth, state FROM nodes ORDER BY sequence").fetchall()
+        return {row[0]: tuple(row[1:]) for row in rows}
+
+    def admit(self, key: str, page_id: str, kind: str, name: str, depth: int, sequence: int):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO nodes (key, id, kind, name, depth, state, sequence) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, page_id, kind, name, depth, self.QUEUED, sequence))
+
+    def load_edges(self) -> Set[Tuple[str, str, str]]:
+        """Every emitted edge as (source, target, relation)"""
+        with self._lock:
+            return set(self._conn.execute("SELECT source, target, relation FROM edges").fetchall())
+
+    def finish(self, key: str, success: bool, edges: Iterable[Tuple[str, str, str]] = ()):
+        """Mark a node done or failed and record the edges emitted with it, in one transaction"""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO edges (source, target, relation) VALUES (?, ?, ?)", edges)
+            self._conn.execute("UPDATE nodes SET state = ? WHERE key = ?",
+                               (self.DONE if success else self.FAILED, key))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class Crawler:
+    """Breadth-first crawl of the company/director network around some seeds
+
+    Pages at most ``max_depth`` links away from a seed are fetched, and no
+    more than ``max_nodes`` nodes are admitted; links from the last layer
+    still produce edges between nodes already admitted. ``concurrency``
+    pages are fetched at a time, all through the client's rate limiter.
+    ``follow`` picks the kinds of node to expand into.
+
+    Events are emitted at least once: a node counts as finished only after
+    the consumer has taken its events, so a crawl resumed from
+    ``checkpoint`` may repeat those of the node it was interrupted on.
+    """
+
+    def __init__(self,
+                 client: AsyncZaubaCorpClient,
+                 max_depth: int = 2,
+                 max_nodes: int = 500,
+                 concurrency: int = 5,
+                 checkpoint: Optional[str] = None,
+                 follow: Iterable[str] = (COMPANY, DIRECTOR),
+                 ignored_sections: Iterable[str] = IGNORED_SECTIONS):
+        self.client = client
+        self.max_depth = max_depth
+        self.max_nodes = max_nodes
+        self.concurrency = max(1, concurrency)
+        self.follow = frozenset(follow)
+        self.ignored_sections = tuple(ignored_sections)
+        self.checkpoint = CrawlCheckpoint(checkpoint)
+        self.stats: Dict[str, int] = {'fetched': 0, 'failed': 0, 'edges': 0, 'skipped': 0}
+        # key -> (page id, kind, name, depth, state)
+        self._nodes: Dict[str, Tuple[str, str, str, int, str]] = self.checkpoint.load()
+        # Edges of finished nodes; a node's edges join it when the node does
+        self._edges: Set[Tuple[str, str, str]] = self.checkpoint.load_edges()
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def _admit(self, page_id: str, kind: str, name: str, depth: int) -> Optional[str]:
+        """Add a node to the frontier; returns its key, or None when over ``max_nodes``"""
+        key = _node_key(kind, page_id)
+        if key in self._nodes:
+            return key
+        if len(self._nodes) >= self.max_nodes:
+            self.stats['skipped'] += 1
+            return None
+        self._nodes[key] = (page_id, kind, name, depth, CrawlCheckpoint.QUEUED)
+        self.checkpoint.admit(key, page_id, kind, name, depth, len(self._nodes))
+        return key
+
+    async def _resolve_director(self, name: str) -> List[Tuple[str, str]]:
+        """Director pages for a name via the typeahead: exact name matches, else the top hit"""
+        results = [result for result in await self.client.search_companies(name, SearchFilter.DIRECTOR)
+                   if result.id.startswith('director/')]
+        exact = [result for result in results if result.name.strip().upper() == name.strip().upper()]
+        return [(result.id, result.name) for result in (exact or results[:1])]
+
+    async def _seed(self, company_ids: Iterable[str], director_names: Iterable[str]):
+        for company_id in company_ids:
+            self._admit(company_id, _node_kind(company_id), _name_from_id(company_id), 0)
+        for name in director_names:
+            for page_id, director_name in await self._resolve_director(name):
+                self._admit(page_id, DIRECTOR, director_name, 0)
+
+    async def _worker(self, work: asyncio.Queue, results: asyncio.Queue):
+        while True:
+            key = await work.get()
+            page_id = self._nodes[key][0]
+            try:
+                company_data = await self.client.get_company_data(page_id)
+            except Exception as e:
+                self.client.metrics.record_error('crawl', e)
+                company_data = CompanyData(company_id=page_id, rc_sections={}, extraction_timestamp='',
+                                           success=False, error_message=str(e))
+            await results.put((key, company_data))
+
+    def _edge(self, key: str, link: Link, target: str) -> CrawlEdge:
+        page_id, kind = self._nodes[key][:2]
+        target_id = self._nodes[target][0]
+        if DIRECTOR in (kind, link.kind) and kind != link.kind:
+            source, target_id = (page_id, target_id) if kind == DIRECTOR else (target_id, page_id)
+            relation = 'director'
+        else:
+            source, relation = page_id, 'associated'
+        return CrawlEdge(source, target_id, relation, {'section': link.section, **link.attributes})
+
+    def _expand(self, key: str, company_data: CompanyData, work: asyncio.Queue) -> Tuple[List[CrawlEdge], int]:
+        """Edges from a fetched page and the number of new nodes it queued within the limits"""
+        depth = self._nodes[key][3]
+        edges = []
+        seen = set()
+        queued = 0
+        for link in extract_links(company_data.rc_sections, self.ignored_sections):
+            target = _node_key(link.kind, link.identifier)
+            if target == key:
+                continue
+            if target not in self._nodes:
+                if depth >= self.max_depth or link.kind not in self.follow:
+                    continue
+                target = self._admit(link.node_id, link.kind, link.name, depth + 1)
+                if target is None:
+                    continue
+                work.put_nowait(target)
+                queued += 1
+            edge = self._edge(key, link, target)
+            edge_key = (edge.source, edge.target, edge.relation)
+            if edge_key not in self._edges and edge_key not in seen:
+                seen.add(edge_key)
+                edges.append(edge)
+        return edges, queued
+
+    async def crawl(self,
+                    company_ids: Iterable[str] = (),
+                    director_names: Iterable[str] = ()) -> AsyncIterator[Union[CrawlNode, CrawlEdge]]:
+        """Crawl from the seeds plus anything left queued or failed in the checkpoint
+
+        Yields each node once its page has been fetched, followed by the
+        edges found on it, each edge once.
+        """
+        await self._seed(company_ids, director_names)
+        work: asyncio.Queue = asyncio.Queue()
+        results: asyncio.Queue = asyncio.Queue()
+        for key, (_, _, _, _, state) in self._nodes.items():
+            if state != CrawlCheckpoint.DONE:
+                work.put_nowait(key)
+        outstanding = work.qsize()
+        workers = [asyncio.ensure_future(self._worker(work, results))
+                   for _ in range(self.concurrency)]
+        try:
+            while outstanding:
+                key, company_data = await results.get()
+                page_id, kind, name, depth, _ = self._nodes[key]
+                self.stats['fetched' if company_data.success else 'failed'] += 1
+                yield CrawlNode(page_id, kind, name, depth, company_data.success,
+                                company_data.error_message)
+                if company_data.success:
+                    edges, queued = self._expand(key, company_data, work)
+                    outstanding += queued
+                    for edge in edges:
+                        yield edge
+                else:
+                    edges = []
+                # Only now has the consumer taken every event of this node
+                edge_keys = [(edge.source, edge.target, edge.relation) for edge in edges]
+                state = CrawlCheckpoint.DONE if company_data.success else CrawlCheckpoint.FAILED
+                self._nodes[key] = (page_id, kind, name, depth, state)
+                self.checkpoint.finish(key, company_data.success, edge_keys)
+                self._edges.update(edge_keys)
+                self.stats['edges'] += len(edge_keys)
+                outstanding -= 1
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    def close(self):
+        self.checkpoint.close()
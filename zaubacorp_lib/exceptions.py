@@ -20,3 +20,13 @@ class ExtractionError(ZaubaCorpError):
 class NetworkError(ZaubaCorpError):
     """Exception for network-related errors"""
     pass
+
+
+class CircuitOpenError(NetworkError):
+    """Raised without contacting the upstream while the circuit breaker is open"""
+    pass
+
+
+class SharedBackendError(ZaubaCorpError):
+    """Error reply from a shared state backend such as Redis"""
+    pass
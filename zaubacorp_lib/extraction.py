@@ -0,0 +1,180 @@
+# ============================================================================
+# zaubacorp_lib/extraction.py
+# ============================================================================
+
+from bs4 import BeautifulSoup
+import time
+from typing import List, Dict, Optional, Tuple, Union
+
+from .models import CompanySearchResult
+from .parsers import RAW_EXTRACTORS, build_rc_sections
+from .sections import RcRow, RcSection, RcSections, RcTable, clean_text
+from .selection import SECTION_FIELDS, Selection
+
+
+class HtmlExtractionMixin:
+    """HTML parsing helpers shared by the sync and async clients"""
+
+    # Resolved engine name from parsers.PARSER_ENGINES; clients set this per instance
+    parser_engine = "bs4"
+
+    def _clean_text(self, text: str) -> str:
+        """Clean and normalize text content"""
+        return clean_text(text)
+
+    def _extract_table_data(self, table) -> List[RcRow]:
+        """Extract data from a table element"""
+        if not table:
+            return []
+
+        data = []
+        rows = table.find_all('tr')
+
+        for row in rows:
+            cells = row.find_all(['td', 'th'])
+            row_data = RcRow.from_cells([cell.get_text() for cell in cells], self._clean_text)
+            if row_data is not None:
+                data.append(row_data)
+
+        return data
+
+    def _extract_rc_sections(self, soup, selection: Optional[Selection] = None) -> RcSections:
+        """Extract all sections with class 'rc', or only what ``selection`` asks for"""
+        rc_sections = {}
+        rc_divs = soup.find_all('div', class_='rc')
+        matcher = selection.matcher() if selection is not None else None
+        fields = selection.fields if selection is not None else SECTION_FIELDS
+
+        for div in rc_divs:
+            title_elem = div.find('h3', class_='rh')
+            if title_elem:
+                section_title = self._clean_text(title_elem.get_text())
+            else:
+                section_title = f"section_{len(rc_sections)}"
+            if matcher is not None and not matcher.candidate(section_title if title_elem else None):
+                continue
+
+            # Unrequested fields are only noted as present, for apply to drop
+            descriptions = None
+            paragraphs = div.find_all('p', class_='rp')
+            if paragraphs and 'descriptions' not in fields:
+                descriptions = ()
+            elif paragraphs:
+                descriptions = [self._clean_text(
+                    p.get_text()) for p in paragraphs]
+                descriptions = tuple(desc for desc in descriptions if desc)
+
+            section_tables = None
+            tables = div.find_all('table')
+            if tables and 'tables' not in fields:
+                section_tables = ()
+            elif tables:
+                section_tables = []
+                for i, table in enumerate(tables):
+                    table_data = self._extract_table_data(table)
+                    if table_data:
+                        caption = table.find('caption')
+                        caption_text = self._clean_text(
+                            caption.get_text()) if caption else f"table_{i}"
+                        section_tables.append(RcTable(caption_text, tuple(table_data)))
+                section_tables = tuple(section_tables)
+
+            if descriptions is not None or section_tables is not None:
+                rc_sections[section_title] = RcSection(descriptions, section_tables)
+                if matcher is not None:
+                    matcher.add(section_title)
+
+        if selection is not None:
+            return selection.apply(RcSections(rc_sections))
+        return RcSections(rc_sections)
+
+    def _parse_company_html(self, html_content: str, selection: Optional[Selection] = None) -> RcSections:
+        """Parse a company page into its rc_sections with the configured engine"""
+        if self.parser_engine == "bs4":
+            soup = BeautifulSoup(html_content, 'html.parser')
+            return self._extract_rc_sections(soup, selection)
+        raw_sections = RAW_EXTRACTORS[self.parser_engine](html_content, selection)
+        return build_rc_sections(raw_sections, self._clean_text, selection)
+
+    def _parse_search_results(self,
+                              response_text: str,
+                              max_results: Optional[int] = None) -> List[CompanySearchResult]:
+        """Parse a typeahead response into search results"""
+        soup = BeautifulSoup(response_text, 'html.parser')
+        divs = soup.find_all('div', class_='show')
+
+        results = []
+        for div in divs:
+            try:
+                result = CompanySearchResult.from_html_div(div)
+                results.append(result)
+
+                if max_results and len(results) >= max_results:
+                    break
+
+            except Exception:
+                continue
+
+        return results
+
+
+class _PageParser(HtmlExtractionMixin):
+    """Standalone extractor used by the module-level parse stage"""
+
+    def __init__(self, parser_engine: str):
+        self.parser_engine = parser_engine
+
+
+def _decode(content: Union[bytes, str]) -> str:
+    return content.decode('utf-8') if isinstance(content, bytes) else content
+
+
+def parse_company_page(content: Union[bytes, str],
+                       parser_engine: str = "bs4",
+                       selection: Optional[Selection] = None) -> RcSections:
+    """Parse stage: raw company page in, compact rc_sections out
+
+    A plain module-level function so it can be submitted to a
+    ProcessPoolExecutor; only the page bytes, the selection and the result
+    are pickled.
+    """
+    return _PageParser(parser_engine)._parse_company_html(_decode(content), selection)
+
+
+def parse_company_page_timed(content: Union[bytes, str],
+                             parser_engine: str = "bs4",
+                             enqueued_at: Optional[float] = None,
+                             selection: Optional[Selection] = None) -> Tuple[RcSections, Dict[str, float]]:
+    """``parse_company_page`` that also returns per-stage durations in seconds
+
+    Stages are ``decode`` (bytes to text), ``parse`` (tokenizing/tree
+    building) and ``extract`` (shaping rc_sections), plus ``queue_wait``
+    when ``enqueued_at`` (a ``time.time()`` taken at submission) is given.
+    """
+    timings = {}
+    if enqueued_at is not None:
+        timings['queue_wait'] = max(0.0, time.time() - enqueued_at)
+
+    parser = _PageParser(parser_engine)
+    started = time.perf_counter()
+    html_content = _decode(content)
+    decoded = time.perf_counter()
+    if parser_engine == "bs4":
+        parsed = BeautifulSoup(html_content, 'html.parser')
+        parse_done = time.perf_counter()
+        rc_sections = parser._extract_rc_sections(parsed, selection)
+    else:
+        parsed = RAW_EXTRACTORS[parser_engine](html_content, selection)
+        parse_done = time.perf_counter()
+        rc_sections = build_rc_sections(parsed, parser._clean_text, selection)
+    finished = time.perf_counter()
+
+    timings['decode'] = decoded - started
+    timings['parse'] = parse_done - decoded
+    timings['extract'] = finished - parse_done
+    return rc_sections, timings
+
+
+def parse_search_page(content: Union[bytes, str]) -> List[CompanySearchResult]:
+    """Parse stage for typeahead responses, picklable like ``parse_company_page``"""
+    return _PageParser("bs4")._parse_search_results(_decode(content))
@@ -0,0 +1,249 @@
+# ============================================================================
+# zaubacorp_lib/index.py
+# ============================================================================
+
+import bisect
+import csv
+import heapq
+import json
+import re
+import sqlite3
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .models import SearchFilter, CompanySearchResult
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+# Sorts after every token character, closing a prefix range
+_PREFIX_END = '\uffff'
+
+# (normalized name, filter value, id): the order results are ranked in
+SortKey = Tuple[str, str, str]
+
+
+def _tokens(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+class _Entry:
+    __slots__ = ('id', 'name', 'filter', 'tokens', 'key')
+
+    def __init__(self, company_id: str, name: str, filter_value: str):
+        self.id = company_id
+        self.name = name
+        self.filter = filter_value
+        self.tokens = tuple(_tokens(name))
+        self.key: SortKey = (' '.join(self.tokens), filter_value, company_id)
+
+
+def _remove(sorted_list: List[SortKey], key: SortKey):
+    position = bisect.bisect_left(sorted_list, key)
+    if position < len(sorted_list) and sorted_list[position] == key:
+        del sorted_list[position]
+
+
+class CompanyIndex:
+    """In-memory prefix/token index of every (id, name, filter type) seen
+
+    Every query token must be a prefix of some word of a name ("acme inf"
+    finds "ACME INFRA PROJECTS PRIVATE LIMITED"). Results rank names that
+    start with the whole query first, then names whose first word starts
+    with the first query token, then the remaining token matches; each tier
+    is in alphabetical order, so shorter names sharing a prefix come first.
+
+    Names and per-word postings are kept sorted in that order, so a lookup
+    walks them lazily and stops after ``limit`` matches instead of scoring
+    every candidate. With ``path`` the index is persisted to SQLite and
+    reloaded on start.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._entries: Dict[Tuple[str, str], _Entry] = {}
+        self._by_key: Dict[SortKey, _Entry] = {}
+        self._names: List[SortKey] = []
+        self._postings: Dict[str, List[SortKey]] = {}
+        self._vocabulary: List[str] = []
+        self._lock = threading.Lock()
+        # Separate so disk writes never block lookups
+        self._db_lock = threading.Lock()
+        self._conn = None
+        if path is not None:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            with self._conn:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS companies "
+                    "(filter TEXT NOT NULL, id TEXT NOT NULL, name TEXT NOT NULL, "
+                    "PRIMARY KEY (filter, id))"
+                )
+            rows = self._conn.execute("SELECT id, name, filter FROM companies").fetchall()
+            with self._lock:
+                self._insert_many([_Entry(*row) for row in rows])
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _unlink(self, entry: _Entry):
+        _remove(self._names, entry.key)
+        for token in set(entry.tokens):
+            _remove(self._postings[token], entry.key)
+        del self._by_key[entry.key]
+
+    def _insert_many(self, entries: List[_Entry]) -> List[_Entry]:
+        """Add or rename entries; returns those that were not already indexed as is
+
+        Large batches append and sort each touched list once at the end.
+        """
+        bulk = len(entries) > 64
+        touched: Set[str] = set()
+        changed = []
+        for entry in entries:
+            old = self._entries.get((entry.filter, entry.id))
+            if old is not None:
+                if old.name == entry.name:
+                    continue
+                self._unlink(old)
+            self._entries[(entry.filter, entry.id)] = entry
+            self._by_key[entry.key] = entry
+            changed.append(entry)
+
+            if bulk:
+                self._names.append(entry.key)
+            else:
+                bisect.insort(self._names, entry.key)
+            for token in set(entry.tokens):
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = []
+                    if bulk:
+                        self._vocabulary.append(token)
+                    else:
+                        bisect.insort(self._vocabulary, token)
+                if bulk:
+                    postings.append(entry.key)
+                    touched.add(token)
+                else:
+                    bisect.insort(postings, entry.key)
+
+        if bulk:
+            self._names.sort()
+            self._vocabulary.sort()
+            for token in touched:
+                self._postings[token].sort()
+        return changed
+
+    def add(self, results: Iterable[CompanySearchResult],
+            filter_type: SearchFilter = SearchFilter.COMPANY) -> int:
+        """Index search results; returns how many were new or renamed"""
+        entries = [_Entry(result.id, result.name, filter_type.value)
+                   for result in results if result.id and result.name]
+        return self._add_entries(entries)
+
+    def _add_entries(self, entries: List[_Entry]) -> int:
+        if not entries:
+            return 0
+        with self._lock:
+            changed = self._insert_many(entries)
+        if changed and self._conn is not None:
+            with self._db_lock, self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO companies (filter, id, name) VALUES (?, ?, ?)",
+                    [(entry.filter, entry.id, entry.name) for entry in changed]
+                )
+        return len(changed)
+
+    def load_file(self, path: str, filter_type: SearchFilter = SearchFilter.COMPANY) -> int:
+        """Bulk-load ``id``/``name`` (and optional ``filter``) records
+
+        ``.csv`` files need a header row; anything else is read as JSON
+        lines. Returns how many entries were new or renamed.
+        """
+        entries = []
+        with open(path, newline='', encoding='utf-8') as handle:
+            if path.endswith('.csv'):
+                records = csv.DictReader(handle)
+            else:
+                records = (json.loads(line) for line in handle if line.strip())
+            for record in records:
+                company_id = record.get('id')
+                name = record.get('name')
+                if company_id and name:
+                    filter_value = SearchFilter(record.get('filter') or filter_type.value).value
+                    entries.append(_Entry(company_id, name, filter_value))
+        return self._add_entries(entries)
+
+    @staticmethod
+    def _prefix_range(sorted_list: List, prefix, prefix_end) -> Tuple[int, int]:
+        start = bisect.bisect_left(sorted_list, prefix)
+        return start, bisect.bisect_left(sorted_list, prefix_end, start)
+
+    def _name_range(self, prefix: str) -> Tuple[int, int]:
+        return self._prefix_range(self._names, (prefix,), (prefix + _PREFIX_END,))
+
+    def _words_match(self, key: SortKey, query_tokens: List[str]) -> bool:
+        tokens = self._by_key[key].tokens
+        return all(any(token.startswith(query_token) for token in tokens)
+                   for query_token in query_tokens)
+
+    def _candidates(self, query_tokens: List[str]) -> Iterator[SortKey]:
+        """Matching keys, best first: whole-query prefix, first-word prefix, other token matches"""
+        query = ' '.join(query_tokens)
+        first = query_tokens[0]
+        others = query_tokens[1:]
+
+        # Names starting with the whole query (an exact name sorts first)
+        query_start, query_end = self._name_range(query)
+        yield from self._names[query_start:query_end]
+
+        # Other names whose first word starts with the first token
+        first_start, first_end = self._name_range(first)
+        for position in range(first_start, first_end):
+            if query_start <= position < query_end:
+                continue
+            key = self._names[position]
+            if self._words_match(key, others):
+                yield key
+
+        # Names matching every token elsewhere: merge the sorted postings of
+        # the query token with the fewest of them
+        seed, postings = None, None
+        for token in query_tokens:
+            start, end = self._prefix_range(self._vocabulary, token, token + _PREFIX_END)
+            candidate = [self._postings[word] for word in self._vocabulary[start:end]]
+            if postings is None or sum(map(len, candidate)) < sum(map(len, postings)):
+                seed, postings = token, candidate
+        rest = [token for token in query_tokens if token != seed]
+        previous = None
+        for key in heapq.merge(*postings):
+            if key == previous or key[0].startswith(first):
+                continue
+            previous = key
+            if self._words_match(key, rest):
+                yield key
+
+    def search(self,
+               query: str,
+               filter_type: Optional[SearchFilter] = SearchFilter.COMPANY,
+               limit: Optional[int] = 10) -> List[CompanySearchResult]:
+        """Ranked local matches for ``query``; ``filter_type=None`` searches every type"""
+        query_tokens = _tokens(query)
+        if not query_tokens:
+            return []
+        filter_value = filter_type.value if filter_type is not None else None
+
+        found = []
+        with self._lock:
+            for key in self._candidates(query_tokens):
+                if filter_value is not None and key[1] != filter_value:
+                    continue
+                entry = self._by_key[key]
+                found.append(CompanySearchResult(id=entry.id, name=entry.name))
+                if limit and len(found) >= limit:
+                    break
+        return found
+
+    def close(self):
+        if self._conn is not None:
+            with self._db_lock:
+                self._conn.close()
@@ -0,0 +1,192 @@
+# ============================================================================
+# zaubacorp_lib/metrics.py
+# ============================================================================
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, FrozenSet, Optional, Sequence, Tuple
+
+# Seconds; covers sub-millisecond cache work up to slow upstream fetches
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelSet = FrozenSet[Tuple[str, str]]
+
+# HELP lines for the families the clients and main.py record
+DEFAULT_HELP = {
+    "stage_seconds": "Seconds spent per pipeline stage (rate_limit_wait, fetch, queue_wait, decode, parse, extract)",
+    "http_request_seconds": "End-to-end API request latency in seconds",
+    "upstream_responses_total": "Responses received from zaubacorp.com by status code",
+    "cache_requests_total": "Cache lookups by result (hit, miss, revalidated, stale)",
+    "background_refreshes_total": "Stale company pages served while refreshed in the background",
+    "retries_total": "Upstream requests retried, by kind and status or error class",
+    "circuit_rejections_total": "Upstream requests refused while the circuit breaker was open",
+    "session_requests_total": "Upstream requests per session, by kind and result (ok, error)",
+    "session_quarantines_total": "Times each upstream session was quarantined",
+    "prefetch_jobs_total": "Background cache warm-ups by reason (search, watchlist, refresh) and result",
+    "index_requests_total": "Local-first searches answered (hit) or missed by the company index",
+    "watchlist_checks_total": "Watchlist refreshes by result (changed, unchanged, failed)",
+    "errors_total": "Exceptions by pipeline stage and class",
+}
+
+
+class _Histogram:
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.sum = 0.0
+        self.count = 0
+
+
+class _NullTimer:
+    """Shared no-op context manager handed out when metrics are disabled"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ('metrics', 'name', 'labels', 'started')
+
+    def __init__(self, metrics: "Metrics", name: str, labels: Dict[str, str]):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.observe(self.name, time.perf_counter() - self.started, **self.labels)
+        return False
+
+
+class Metrics:
+    """Minimal thread-safe registry of counters and histograms in Prometheus text format
+
+    A disabled registry returns immediately from every call, so clients can
+    be instrumented unconditionally at close to zero cost.
+    """
+
+    def __init__(self,
+                 enabled: bool = True,
+                 namespace: str = "zauba",
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.namespace = namespace
+        self.buckets = tuple(buckets)
+        self._counters: Dict[str, Dict[LabelSet, float]] = {}
+        self._histograms: Dict[str, Dict[LabelSet, _Histogram]] = {}
+        self._help: Dict[str, str] = dict(DEFAULT_HELP)
+        self._lock = threading.Lock()
+
+    def describe(self, name: str, help_text: str):
+        """Set the HELP line for a metric family"""
+        self._help[name] = help_text
+
+    def inc(self, name: str, amount: float = 1.0, **labels: str):
+        """Add ``amount`` to a counter"""
+        if not self.enabled:
+            return
+        key = frozenset(labels.items())
+        with self._lock:
+            family = self._counters.setdefault(name, {})
+            family[key] = family.get(key, 0.0) + amount
+
+    def observe(self, name: str, value: float, **labels: str):
+        """Record one observation in a histogram"""
+        if not self.enabled:
+            return
+        key = frozenset(labels.items())
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            family = self._histograms.setdefault(name, {})
+            histogram = family.get(key)
+            if histogram is None:
+                histogram = family[key] = _Histogram(len(self.buckets) + 1)
+            histogram.counts[index] += 1
+            histogram.sum += value
+            histogram.count += 1
+
+    def timer(self, name: str, **labels: str):
+        """Context manager observing the elapsed seconds of its block"""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name, labels)
+
+    def observe_stages(self, timings: Dict[str, float], **labels: str):
+        """Record a dict of per-stage durations in the ``stage_seconds`` histogram"""
+        if not self.enabled:
+            return
+        for stage, seconds in timings.items():
+            self.observe("stage_seconds", seconds, stage=stage, **labels)
+
+    def record_error(self, stage: str, error: BaseException):
+        """Count an exception by stage and class name"""
+        self.inc("errors_total", stage=stage, error=type(error).__name__)
+
+    @staticmethod
+    def _format_labels(labels: LabelSet, extra: Optional[Tuple[str, str]] = None) -> str:
+        items = sorted(labels)
+        if extra is not None:
+            items.append(extra)
+        if not items:
+            return ""
+        body = ",".join(
+            '{}="{}"'.format(key, str(value).replace('\\', '\\\\').replace('"', '\\"'))
+            for key, value in items)
+        return "{" + body + "}"
+
+    @staticmethod
+    def _format_value(value: float) -> str:
+        """A sample value without loss: whole numbers as integers, others as repr(float)"""
+        value = float(value)
+        if value != value:
+            return "NaN"
+        if value in (float('inf'), float('-inf')):
+            return "+Inf" if value > 0 else "-Inf"
+        if value.is_integer():
+            return str(int(value))
+        return repr(value)
+
+    def render(self) -> str:
+        """Export every metric in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name in sorted(self._counters):
+                full_name = f"{self.namespace}_{name}"
+                if name in self._help:
+                    lines.append(f"# HELP {full_name} {self._help[name]}")
+                lines.append(f"# TYPE {full_name} counter")
+                for labels, value in self._counters[name].items():
+                    lines.append(f"{full_name}{self._format_labels(labels)} {self._format_value(value)}")
+
+            for name in sorted(self._histograms):
+                full_name = f"{self.namespace}_{name}"
+                if name in self._help:
+                    lines.append(f"# HELP {full_name} {self._help[name]}")
+                lines.append(f"# TYPE {full_name} histogram")
+                for labels, histogram in self._histograms[name].items():
+                    cumulative = 0
+                    for bound, count in zip(self.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f"{full_name}_bucket"
+                                     f"{self._format_labels(labels, ('le', f'{bound:g}'))} {cumulative}")
+                    lines.append(f"{full_name}_bucket"
+                                 f"{self._format_labels(labels, ('le', '+Inf'))} {histogram.count}")
+                    lines.append(f"{full_name}_sum{self._format_labels(labels)} {self._format_value(histogram.sum)}")
+                    lines.append(f"{full_name}_count{self._format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+# Shared registry for clients built without one; records nothing
+DISABLED_METRICS = Metrics(enabled=False)
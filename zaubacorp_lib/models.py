@@ -4,7 +4,7 @@
 
 from dataclasses import dataclass
 from enum import Enum
-from typing import List, Dict, Optional
+from typing import List, Mapping, Optional
 import time
 
 
@@ -32,13 +32,41 @@ class CompanySearchResult:
 
 @dataclass
 class CompanyData:
-    """Data class for complete company data"""
+    """Data class for complete company data
+
+    ``rc_sections`` is an ``RcSections`` mapping for parsed pages (a plain
+    dict for failures); both read as ``{title: section dict}``. ``stale``
+    marks a cache entry served past its freshness limit.
+    """
     company_id: str
-    rc_sections: Dict
+    rc_sections: Mapping
     extraction_timestamp: str
     success: bool = True
     error_message: Optional[str] = None
+    cache_hit: bool = False
+    cache_tier: Optional[str] = None
+    cache_age: Optional[float] = None
+    stale: bool = False
 
     def __post_init__(self):
         if not self.extraction_timestamp:
             self.extraction_timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
+
+
+@dataclass
+class PageFetch:
+    """Raw response of the fetch stage, with the validators needed to revalidate it
+
+    A page parsed while it downloaded carries ``rc_sections`` and the
+    ``digest`` of its whole body instead of ``content``.
+    """
+    status: int
+    content: Optional[bytes] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    rc_sections: Optional[Mapping] = None
+    digest: Optional[str] = None
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status == 304
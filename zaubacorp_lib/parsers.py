@@ -0,0 +1,503 @@
+# ============================================================================
+# zaubacorp_lib/parsers.py
+# ============================================================================
+
+"""
+Alternative rc_sections extraction engines.
+
+Every engine reduces a company page to the same raw outline (section
+titles, paragraph texts, table captions and cell texts) and hands it to
+``build_rc_sections``, which applies exactly the cleaning and shaping rules
+of ``HtmlExtractionMixin._extract_rc_sections``. On well-formed pages all
+engines return identical ``rc_sections``:
+
+- ``bs4``: the original BeautifulSoup/html.parser path, kept for compatibility
+- ``stream``: a single-pass html.parser tokenizer that never builds a tree;
+  it follows BeautifulSoup's nesting rules, so it also matches on malformed
+  markup. ``auto`` resolves to it.
+- ``lxml``: libxml2 via lxml (optional dependency, opt-in)
+- ``selectolax``: Lexbor via selectolax (optional dependency, opt-in)
+
+lxml and selectolax repair malformed markup the way browsers do, not the
+way html.parser does, so their output differs from ``bs4`` there: an
+unclosed ``<p>`` or ``<td>`` ends at the next one instead of nesting it
+(bs4 gives ``['onetwo', 'two']``, they give ``['one', 'two']``), a
+``<div>`` or ``<table>`` inside a ``<p>`` closes the paragraph, lxml moves
+a ``<p>`` out of an ``<h3>`` title, and unknown entities such as
+``&unknown;`` keep their semicolon. Use them only where that is acceptable.
+
+Every extractor also takes an optional ``Selection``. Sections that
+cannot change its result are skipped (see ``SectionMatcher.candidate``),
+and of the others only the requested fields are extracted; an unrequested
+field that is present comes out as a placeholder (an empty paragraph or
+an empty table), which ``build_rc_sections`` shapes into an empty field
+for ``apply`` to drop.
+"""
+
+import html.entities
+from html.parser import HTMLParser
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .sections import RcRow, RcSection, RcSections, RcTable, clean_text
+from .selection import SECTION_FIELDS, Selection
+
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+
+PARSER_ENGINES = ("auto", "bs4", "stream", "lxml", "selectolax")
+
+# (caption text or None, rows of raw cell texts)
+RawTable = Tuple[Optional[str], List[List[str]]]
+# (title text or None, paragraph texts, tables)
+RawSection = Tuple[Optional[str], List[str], List[RawTable]]
+
+
+def resolve_parser_engine(engine: str = "auto") -> str:
+    """Validate ``engine`` and map ``auto`` to ``stream``, the fastest engine matching bs4 on any markup"""
+    if engine not in PARSER_ENGINES:
+        raise ValueError(
+            f"Unknown parser engine {engine!r}. Must be one of: {list(PARSER_ENGINES)}")
+    if engine == "auto":
+        return "stream"
+    if engine == "lxml" and not LXML_AVAILABLE:
+        raise ValueError("Parser engine 'lxml' requires the lxml package")
+    if engine == "selectolax" and not SELECTOLAX_AVAILABLE:
+        raise ValueError("Parser engine 'selectolax' requires the selectolax package")
+    return engine
+
+
+def build_table_data(rows: List[List[str]], clean_text: Callable[[str], str]) -> List[RcRow]:
+    """Shape raw table rows like ``_extract_table_data``"""
+    data = []
+    for cells in rows:
+        row = RcRow.from_cells(cells, clean_text)
+        if row is not None:
+            data.append(row)
+    return data
+
+
+def add_rc_section(rc_sections: Dict[str, RcSection],
+                   raw_section: RawSection,
+                   clean_text: Callable[[str], str]) -> Optional[str]:
+    """Shape one raw section into ``rc_sections``; returns its title, or None if it was empty"""
+    title, paragraphs, tables = raw_section
+    if title is not None:
+        section_title = clean_text(title)
+    else:
+        section_title = f"section_{len(rc_sections)}"
+
+    descriptions = None
+    if paragraphs:
+        descriptions = tuple(desc for desc in map(clean_text, paragraphs) if desc)
+
+    section_tables = None
+    if tables:
+        section_tables = []
+        for i, (caption, rows) in enumerate(tables):
+            table_data = build_table_data(rows, clean_text)
+            if table_data:
+                caption_text = clean_text(caption) if caption is not None else f"table_{i}"
+                section_tables.append(RcTable(caption_text, tuple(table_data)))
+        section_tables = tuple(section_tables)
+
+    if descriptions is None and section_tables is None:
+        return None
+    rc_sections[section_title] = RcSection(descriptions, section_tables)
+    return section_title
+
+
+def build_rc_sections(raw_sections: List[RawSection],
+                      clean_text: Callable[[str], str],
+                      selection: Optional[Selection] = None) -> RcSections:
+    """Shape raw sections like ``_extract_rc_sections``, applying ``selection`` last"""
+    rc_sections = {}
+    for raw_section in raw_sections:
+        add_rc_section(rc_sections, raw_section, clean_text)
+    if selection is not None:
+        return selection.apply(RcSections(rc_sections))
+    return RcSections(rc_sections)
+
+
+# ----------------------------------------------------------------------------
+# Single-pass streaming extractor
+# ----------------------------------------------------------------------------
+
+# Elements html.parser/BeautifulSoup treat as empty
+VOID_ELEMENTS = frozenset((
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen',
+    'link', 'menuitem', 'meta', 'param', 'source', 'track', 'wbr', 'basefont',
+    'bgsound', 'command', 'frame', 'image', 'isindex', 'nextid', 'spacer'
+))
+# Elements whose text BeautifulSoup's get_text() leaves out
+SKIPPED_TEXT_ELEMENTS = frozenset(('script', 'style', 'template'))
+
+
+class _Text:
+    """Text collected from every descendant while an element is open"""
+    __slots__ = ('parts',)
+
+    def __init__(self):
+        self.parts = []
+
+    @property
+    def text(self) -> str:
+        return ''.join(self.parts)
+
+
+class _Row:
+    """Cells of a tr; compared by identity, unlike a bare list"""
+    __slots__ = ('cells',)
+
+    def __init__(self):
+        self.cells: List[_Text] = []
+
+
+class _Table:
+    __slots__ = ('caption', 'rows')
+
+    def __init__(self):
+        self.caption: Optional[_Text] = None
+        self.rows: List[_Row] = []
+
+    def raw(self) -> RawTable:
+        caption = self.caption.text if self.caption is not None else None
+        return caption, [[cell.text for cell in row.cells] for row in self.rows]
+
+
+# Stand-ins noting an unrequested paragraph or table; they never collect anything
+_NO_TEXT = _Text()
+_NO_TABLE = _Table()
+
+
+class _Section:
+    __slots__ = ('title', 'paragraphs', 'tables', 'selected')
+
+    def __init__(self, selected: Optional[bool] = True):
+        self.title: Optional[_Text] = None
+        self.paragraphs: List[_Text] = []
+        self.tables: List[_Table] = []
+        # None until the title has been seen, when a selection is matching titles
+        self.selected = selected
+
+    def raw(self) -> RawSection:
+        title = self.title.text if self.title is not None else None
+        return (title,
+                [p.text for p in self.paragraphs],
+                [table.raw() for table in self.tables])
+
+
+def _has_class(attrs, name: str) -> bool:
+    for key, value in attrs:
+        if key == 'class' and value:
+            return name in value.split()
+    return False
+
+
+class RcSectionStreamParser(HTMLParser):
+    """Collect div.rc sections in one pass over the token stream
+
+    Elements are matched with the same descendant semantics as the
+    ``find``/``find_all`` calls in ``_extract_rc_sections`` (nested tables,
+    rows and cells count towards every open ancestor), and end tags close
+    elements the way BeautifulSoup's html.parser tree builder does.
+
+    With a ``selection``, nothing is collected inside sections that
+    cannot change its result, and unrequested fields are only noted. The
+    matcher learns each section once no div.rc is open any more, so
+    nested sections are decided conservatively.
+    """
+
+    def __init__(self, selection: Optional[Selection] = None):
+        super().__init__(convert_charrefs=False)
+        self._matcher = selection.matcher() if selection is not None else None
+        fields = selection.fields if selection is not None else SECTION_FIELDS
+        self._descriptions = 'descriptions' in fields
+        self._tables = 'tables' in fields
+        self.sections: List[_Section] = []
+        # sections[:_settled] have been added to the matcher
+        self._settled = 0
+        self._stack: List[Tuple[str, object]] = []
+        self._open_sections: List[_Section] = []
+        self._open_tables: List[_Table] = []
+        self._open_rows: List[_Row] = []
+        self._open_text: List[_Text] = []
+        self._skip_text = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_ELEMENTS:
+            return
+
+        node = None
+        if tag == 'div' and _has_class(attrs, 'rc'):
+            node = _Section(None if self._matcher is not None else True)
+            self.sections.append(node)
+            self._open_sections.append(node)
+        elif self._collecting():
+            if tag == 'table':
+                if self._tables:
+                    node = _Table()
+                    for section in self._open_sections:
+                        section.tables.append(node)
+                    self._open_tables.append(node)
+                else:
+                    for section in self._open_sections:
+                        section.tables.append(_NO_TABLE)
+            elif tag == 'tr':
+                if self._open_tables:
+                    node = _Row()
+                    for table in self._open_tables:
+                        table.rows.append(node)
+                    self._open_rows.append(node)
+            elif tag == 'td' or tag == 'th':
+                if self._open_rows:
+                    node = _Text()
+                    for row in self._open_rows:
+                        row.cells.append(node)
+            elif tag == 'caption':
+                if self._open_tables:
+                    node = _Text()
+                    for table in self._open_tables:
+                        if table.caption is None:
+                            table.caption = node
+            elif tag == 'h3':
+                if _has_class(attrs, 'rh'):
+                    node = _Text()
+                    for section in self._open_sections:
+                        if section.title is None:
+                            section.title = node
+            elif tag == 'p':
+                if _has_class(attrs, 'rp'):
+                    if self._descriptions:
+                        node = _Text()
+                    for section in self._open_sections:
+                        section.paragraphs.append(node or _NO_TEXT)
+
+        if isinstance(node, _Text):
+            self._open_text.append(node)
+        if tag in SKIPPED_TEXT_ELEMENTS:
+            self._skip_text += 1
+        self._stack.append((tag, node))
+
+    def _collecting(self) -> bool:
+        for section in self._open_sections:
+            if section.selected is not False:
+                return True
+        return False
+
+    def handle_endtag(self, tag):
+        if tag in VOID_ELEMENTS:
+            return
+        # Pop up to the most recent open element with this name; stray end tags are ignored
+        for index in range(len(self._stack) - 1, -1, -1):
+            if self._stack[index][0] == tag:
+                break
+        else:
+            return
+        while len(self._stack) > index:
+            self._close(*self._stack.pop())
+
+    def _close(self, tag, node):
+        if tag in SKIPPED_TEXT_ELEMENTS:
+            self._skip_text -= 1
+        if node is None:
+            return
+        if isinstance(node, _Text):
+            self._open_text.remove(node)
+            if self._matcher is not None:
+                for section in self._open_sections:
+                    if section.title is node and section.selected is None:
+                        section.selected = self._matcher.candidate(node.text)
+        elif isinstance(node, _Section):
+            self._open_sections.remove(node)
+            if node.selected is None:
+                node.selected = False
+            if self._matcher is not None and not self._open_sections:
+                self._settle()
+        elif isinstance(node, _Table):
+            self._open_tables.remove(node)
+        else:
+            self._open_rows.remove(node)
+
+    def _settle(self):
+        """Add the sections closed since the last call to the matcher, in document order"""
+        for section in self.sections[self._settled:]:
+            if section.selected and section.title is not None and (section.paragraphs or section.tables):
+                self._matcher.add(clean_text(section.title.text))
+        self._settled = len(self.sections)
+
+    def handle_data(self, data):
+        if self._open_text and not self._skip_text:
+            for node in self._open_text:
+                node.parts.append(data)
+
+    def handle_entityref(self, name):
+        character = html.entities.html5.get(name + ';')
+        self.handle_data(character if character is not None else f"&{name}")
+
+    def handle_charref(self, name):
+        try:
+            if name[:1] in ('x', 'X'):
+                code = int(name[1:], 16)
+            else:
+                code = int(name)
+        except ValueError:
+            return
+        data = None
+        if code < 256:
+            try:
+                data = bytes([code]).decode('windows-1252')
+            except UnicodeDecodeError:
+                pass
+        if data is None:
+            try:
+                data = chr(code)
+            except (ValueError, OverflowError):
+                data = '\N{REPLACEMENT CHARACTER}'
+        self.handle_data(data)
+
+    def unknown_decl(self, data):
+        if data.startswith('CDATA['):
+            self.handle_data(data[len('CDATA['):])
+
+    def raw_sections(self) -> List[RawSection]:
+        return [section.raw() for section in self.sections if section.selected]
+
+    def completed_sections(self, final: bool = False) -> List[RawSection]:
+        """Selected sections finished since the last call, in document order
+
+        Sections are released only while no div.rc is open, so nested ones
+        come out in the same order as ``raw_sections``; ``final`` releases
+        the rest after ``close``. Released sections are dropped from
+        ``sections``, so a long page is never held whole.
+        """
+        if self._open_sections and not final:
+            return []
+        completed, self.sections = self.sections, []
+        self._settled = 0
+        return [section.raw() for section in completed if section.selected]
+
+
+# Characters tokenized per step when text arrives incrementally
+STREAM_CHUNK_SIZE = 16384
+
+
+def extract_raw_sections_stream(html_content: str,
+                                selection: Optional[Selection] = None) -> List[RawSection]:
+    parser = RcSectionStreamParser(selection)
+    parser.feed(html_content)
+    parser.close()
+    return parser.raw_sections()
+
+
+# ----------------------------------------------------------------------------
+# lxml and selectolax engines
+# ----------------------------------------------------------------------------
+
+def _class_xpath(tag: str, name: str) -> str:
+    return f".//{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {name} ')]"
+
+
+if LXML_AVAILABLE:
+    _LXML_RC = etree.XPath(_class_xpath('div', 'rc'))
+    _LXML_TITLE = etree.XPath(_class_xpath('h3', 'rh'))
+    _LXML_PARAGRAPHS = etree.XPath(_class_xpath('p', 'rp'))
+    _LXML_TABLES = etree.XPath('.//table')
+    _LXML_ROWS = etree.XPath('.//tr')
+    _LXML_CELLS = etree.XPath('.//*[self::td or self::th]')
+    _LXML_CAPTION = etree.XPath('.//caption')
+
+
+def extract_raw_sections_lxml(html_content: str,
+                              selection: Optional[Selection] = None) -> List[RawSection]:
+    try:
+        root = lxml_html.document_fromstring(html_content)
+    except ValueError:
+        # Strings carrying an XML encoding declaration must be parsed as bytes
+        root = lxml_html.document_fromstring(html_content.encode('utf-8'))
+    etree.strip_elements(root, *SKIPPED_TEXT_ELEMENTS, with_tail=False)
+    matcher = selection.matcher() if selection is not None else None
+    fields = selection.fields if selection is not None else SECTION_FIELDS
+
+    def text(element) -> str:
+        return etree.tostring(element, method='text', encoding=str, with_tail=False)
+
+    raw_sections = []
+    for div in _LXML_RC(root):
+        titles = _LXML_TITLE(div)
+        title = text(titles[0]) if titles else None
+        if matcher is not None and not matcher.candidate(title):
+            continue
+        paragraphs = _LXML_PARAGRAPHS(div)
+        # Unrequested fields only need to be noted as present
+        if 'descriptions' in fields:
+            paragraphs = [text(p) for p in paragraphs]
+        else:
+            paragraphs = [''] if paragraphs else []
+        tables = []
+        for table in _LXML_TABLES(div):
+            if 'tables' not in fields:
+                tables.append((None, []))
+                break
+            captions = _LXML_CAPTION(table)
+            tables.append((
+                text(captions[0]) if captions else None,
+                [[text(cell) for cell in _LXML_CELLS(row)] for row in _LXML_ROWS(table)]
+            ))
+        raw_sections.append((title, paragraphs, tables))
+        if matcher is not None and title is not None and (paragraphs or tables):
+            matcher.add(clean_text(title))
+    return raw_sections
+
+
+def extract_raw_sections_selectolax(html_content: str,
+                                    selection: Optional[Selection] = None) -> List[RawSection]:
+    tree = LexborHTMLParser(html_content)
+    tree.strip_tags(list(SKIPPED_TEXT_ELEMENTS))
+    matcher = selection.matcher() if selection is not None else None
+    fields = selection.fields if selection is not None else SECTION_FIELDS
+
+    raw_sections = []
+    for div in tree.css('div.rc'):
+        title_node = div.css_first('h3.rh')
+        title = title_node.text(deep=True) if title_node is not None else None
+        if matcher is not None and not matcher.candidate(title):
+            continue
+        paragraphs = div.css('p.rp')
+        # Unrequested fields only need to be noted as present
+        if 'descriptions' in fields:
+            paragraphs = [p.text(deep=True) for p in paragraphs]
+        else:
+            paragraphs = [''] if paragraphs else []
+        tables = []
+        for table in div.css('table'):
+            if 'tables' not in fields:
+                tables.append((None, []))
+                break
+            caption = table.css_first('caption')
+            tables.append((
+                caption.text(deep=True) if caption is not None else None,
+                [[cell.text(deep=True) for cell in row.css('td, th')]
+                 for row in table.css('tr')]
+            ))
+        raw_sections.append((title, paragraphs, tables))
+        if matcher is not None and title is not None and (paragraphs or tables):
+            matcher.add(clean_text(title))
+    return raw_sections
+
+
+RAW_EXTRACTORS = {
+    "stream": extract_raw_sections_stream,
+    "lxml": extract_raw_sections_lxml,
+    "selectolax": extract_raw_sections_selectolax,
+}
@@ -0,0 +1,224 @@
+# ============================================================================
+# zaubacorp_lib/prefetch.py
+# ============================================================================
+
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .async_client import AsyncZaubaCorpClient
+from .models import CompanySearchResult
+from .rate_limit import RateLimiter
+
+
+class PrefetchScheduler:
+    """Background async workers that keep company pages warm in the client's cache
+
+    Jobs run in priority order: companies from recent searches first (a
+    user is likely to open one next), then the watchlist, then refreshes
+    of entries about to expire. Watched companies, and companies users
+    looked up (``touch``) within ``keep_warm`` seconds, are refreshed when
+    ``refresh_ahead`` of their TTL is left, so user requests keep hitting
+    the cache.
+
+    Fetches go through the client, sharing its rate limiter, single-flight
+    and cache. Workers only start a job while the page budget has more
+    than ``headroom`` spare tokens, leaving the rest to user requests;
+    with a session pool that is both the client's budget and the sum of
+    the budgets of the sessions in rotation.
+    A failed warm-up of a company that should stay warm is retried after
+    ``retry_failed`` seconds.
+    """
+
+    SEARCH = 0
+    WATCHLIST = 1
+    REFRESH = 2
+
+    _REASONS = {SEARCH: "search", WATCHLIST: "watchlist", REFRESH: "refresh"}
+
+    def __init__(self,
+                 client: AsyncZaubaCorpClient,
+                 workers: int = 2,
+                 refresh_ahead: float = 0.1,
+                 keep_warm: float = 3600.0,
+                 headroom: float = 1.0,
+                 max_queue: int = 1000,
+                 retry_failed: float = 60.0):
+        if client.cache is None:
+            raise ValueError("PrefetchScheduler needs a client with a cache")
+        self.client = client
+        self.workers = max(1, workers)
+        self.refresh_ahead = refresh_ahead
+        self.keep_warm = keep_warm
+        self.headroom = headroom
+        self.max_queue = max_queue
+        self.retry_failed = retry_failed
+        self.stats: Dict[str, int] = {'queued': 0, 'fetched': 0, 'cached': 0,
+                                      'failed': 0, 'dropped': 0}
+        self._watched: Set[str] = set()
+        self._last_access: Dict[str, float] = {}
+        # Best priority currently queued per company, to drop duplicate jobs
+        self._queued: Dict[str, int] = {}
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        # (due time, company_id) refreshes not yet due; only the one matching
+        # _due is live, earlier reschedules are skipped when they pop
+        self._timers: List[Tuple[float, str]] = []
+        self._due: Dict[str, float] = {}
+        self._timer_wakeup: Optional[asyncio.Event] = None
+        self._sequence = itertools.count()
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def ttl(self) -> Optional[float]:
+        return self.client.cache.memory.ttl
+
+    def start(self):
+        """Start the workers and the refresh timer on the running event loop"""
+        if self._tasks:
+            return
+        self._queue = asyncio.PriorityQueue()
+        self._timer_wakeup = asyncio.Event()
+        for company_id, priority in list(self._queued.items()):
+            self._queue.put_nowait((priority, next(self._sequence), company_id))
+        self._tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.ensure_future(self._timer()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def _submit(self, company_id: str, priority: int) -> bool:
+        queued = self._queued.get(company_id)
+        if queued is not None and queued <= priority:
+            return False
+        if queued is None and len(self._queued) >= self.max_queue:
+            self.stats['dropped'] += 1
+            return False
+        self._queued[company_id] = priority
+        self.stats['queued'] += 1
+        if self._queue is not None:
+            self._queue.put_nowait((priority, next(self._sequence), company_id))
+        return True
+
+    def watch(self, company_ids: Iterable[str]) -> int:
+        """Warm these companies now and keep them warm; returns how many were queued"""
+        queued = 0
+        for company_id in company_ids:
+            self._watched.add(company_id)
+            queued += self._submit(company_id, self.WATCHLIST)
+        return queued
+
+    def unwatch(self, company_ids: Iterable[str]):
+        for company_id in company_ids:
+            self._watched.discard(company_id)
+
+    def prefetch_search_results(self, results: Iterable[CompanySearchResult], limit: int = 3) -> int:
+        """Warm the top ``limit`` companies of a search; returns how many were queued"""
+        queued = 0
+        for result in itertools.islice(results, limit):
+            if result.id.startswith('company/'):
+                queued += self._submit(result.id, self.SEARCH)
+        return queued
+
+    def touch(self, company_id: str):
+        """Note a user lookup, keeping the company refreshed for ``keep_warm`` seconds"""
+        self._last_access[company_id] = time.time()
+
+    def _wanted(self, company_id: str) -> bool:
+        if company_id in self._watched:
+            return True
+        last_access = self._last_access.get(company_id)
+        if last_access is None:
+            return False
+        if time.time() - last_access > self.keep_warm:
+            del self._last_access[company_id]
+            return False
+        return True
+
+    def _schedule(self, company_id: str, due: float):
+        self._due[company_id] = due
+        heapq.heappush(self._timers, (due, company_id))
+        if self._timer_wakeup is not None and self._timers[0][1] == company_id:
+            self._timer_wakeup.set()
+
+    async def _timer(self):
+        """Move refreshes into the queue as they come due"""
+        while True:
+            self._timer_wakeup.clear()
+            now = time.time()
+            while self._timers and self._timers[0][0] <= now:
+                due, company_id = heapq.heappop(self._timers)
+                if self._due.get(company_id) != due:
+                    continue
+                del self._due[company_id]
+                if self._wanted(company_id):
+                    self._submit(company_id, self.REFRESH)
+            timeout = self._timers[0][0] - now if self._timers else None
+            try:
+                await asyncio.wait_for(self._timer_wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _budget_wait(self) -> Optional[float]:
+        """Seconds to wait before checking again, or None when every page budget has headroom"""
+        limiter = self.client.rate_limiter
+        bucket = limiter.buckets[RateLimiter.COMPANY_PAGE]
+        budgets = [
+            (limiter.available(RateLimiter.COMPANY_PAGE), bucket.burst, bucket.rate),
+            # Sessions carry their own budgets, the client's may be unthrottled
+            self.client.sessions.budget(RateLimiter.COMPANY_PAGE),
+        ]
+        for available, burst, rate in budgets:
+            # One token for this fetch plus the headroom, within what the budget can hold
+            if available < min(self.headroom + 1, max(1, burst)):
+                return 1.0 / rate if rate else 0.1
+        return None
+
+    async def _wait_for_budget(self):
+        blocking = self.client.rate_limiter.blocking or self.client.sessions.blocking
+        loop = asyncio.get_running_loop()
+        while True:
+            wait = await loop.run_in_executor(None, self._budget_wait) if blocking else self._budget_wait()
+            if wait is None:
+                return
+            await asyncio.sleep(wait)
+
+    async def _worker(self):
+        while True:
+            priority, _, company_id = await self._queue.get()
+            if self._queued.get(company_id) != priority:
+                # Superseded by a higher-priority job for the same company
+                continue
+            del self._queued[company_id]
+            reason = self._REASONS[priority]
+
+            refresh = priority == self.REFRESH
+            try:
+                cached = await self.client.cached_company(company_id)
+                if cached is not None and not refresh:
+                    result = 'cached'
+                    company_data = cached
+                else:
+                    await self._wait_for_budget()
+                    company_data = await self.client.get_company_data(company_id, refresh=refresh)
+                    result = 'fetched' if company_data.success else 'failed'
+            except Exception as e:
+                # A worker that dies here stops prefetching for good
+                self.client.metrics.record_error('prefetch', e)
+                company_data = None
+                result = 'failed'
+
+            self.stats[result] += 1
+            self.client.metrics.inc('prefetch_jobs_total', reason=reason, result=result)
+            if not self._wanted(company_id):
+                continue
+            if result == 'failed':
+                self._schedule(company_id, time.time() + self.retry_failed)
+            elif self.ttl is not None:
+                age = company_data.cache_age or 0.0
+                self._schedule(company_id, time.time() + max(
+                    0.0, self.ttl * (1 - self.refresh_ahead) - age))
@@ -0,0 +1,99 @@
+# ============================================================================
+# zaubacorp_lib/rate_limit.py
+# ============================================================================
+
+import asyncio
+import threading
+import time
+from typing import Dict, Optional
+
+
+class TokenBucket:
+    """Thread-safe token bucket with a sustained rate and a burst size"""
+
+    def __init__(self, rate: Optional[float], burst: int = 1):
+        """Create a bucket refilling at ``rate`` tokens/second (None = unlimited)"""
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """Take ``tokens`` from the bucket and return how long to wait before using them
+
+        Tokens are reserved immediately, even if the bucket goes into debt, so
+        concurrent callers queue up behind each other instead of all waking at once.
+        """
+        if not self.rate:
+            return 0.0
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def available(self) -> float:
+        """Tokens that could be taken right now without waiting (inf when unlimited)"""
+        if not self.rate:
+            return float('inf')
+        with self._lock:
+            return min(self.burst, self._tokens + (time.monotonic() - self._last) * self.rate)
+
+
+class RateLimiter:
+    """Token-bucket rate limiter with separate budgets per request kind
+
+    Subclasses can override ``reserve`` to plug in another budget source;
+    ``acquire`` and ``acquire_async`` are the blocking and asyncio variants.
+    """
+
+    TYPEAHEAD = "typeahead"
+    COMPANY_PAGE = "company_page"
+
+    # Whether ``reserve`` and ``available`` may block on I/O
+    blocking = False
+
+    def __init__(self,
+                 typeahead_rate: Optional[float] = 1.0,
+                 typeahead_burst: int = 1,
+                 page_rate: Optional[float] = None,
+                 page_burst: int = 1):
+        """Configure requests/second and burst size for each budget"""
+        self.buckets: Dict[str, TokenBucket] = {
+            self.TYPEAHEAD: TokenBucket(typeahead_rate, typeahead_burst),
+            self.COMPANY_PAGE: TokenBucket(page_rate, page_burst),
+        }
+
+    @classmethod
+    def from_delay(cls, delay_between_requests: float) -> "RateLimiter":
+        """Build the legacy limiter: one search per ``delay`` seconds, pages unthrottled"""
+        rate = 1.0 / delay_between_requests if delay_between_requests > 0 else None
+        return cls(typeahead_rate=rate, typeahead_burst=1)
+
+    def reserve(self, kind: str) -> float:
+        """Reserve one request from the ``kind`` budget, returning the wait in seconds"""
+        return self.buckets[kind].reserve()
+
+    def available(self, kind: str) -> float:
+        """Spare ``kind`` budget right now, so background work can yield to callers"""
+        return self.buckets[kind].available()
+
+    def acquire(self, kind: str) -> float:
+        """Block until a ``kind`` request may be sent"""
+        wait = self.reserve(kind)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, kind: str) -> float:
+        """Wait on the event loop until a ``kind`` request may be sent"""
+        wait = self.reserve(kind)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
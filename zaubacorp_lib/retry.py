@@ -0,0 +1,171 @@
+# ============================================================================
+# zaubacorp_lib/retry.py
+# ============================================================================
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Mapping, Optional
+
+# Throttling and transient gateway errors, including Cloudflare's 52x
+RETRYABLE_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504, 520, 521, 522, 523, 524, 529})
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+class RetryPolicy:
+    """Which upstream responses to retry, and how long to back off between attempts
+
+    ``classify`` sorts a response into ``OK`` (the upstream answered: 2xx,
+    3xx and non-retryable 4xx), ``RETRY`` (throttling and transient 5xx) or
+    ``FAIL`` (Cloudflare challenges and other 5xx, where retrying does not
+    help). Backoff is exponential with full jitter; a Retry-After header
+    sets the minimum wait, and one longer than ``max_retry_after`` ends the
+    retries. No retry is started that would end past ``deadline`` seconds
+    after the first attempt, which bounds the worst-case latency of a fetch.
+    """
+
+    OK = "ok"
+    RETRY = "retry"
+    FAIL = "fail"
+
+    def __init__(self,
+                 max_attempts: int = 3,
+                 base_delay: float = 0.25,
+                 max_delay: float = 5.0,
+                 max_retry_after: float = 10.0,
+                 deadline: Optional[float] = 15.0,
+                 retryable_statuses=RETRYABLE_STATUSES):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self.deadline = deadline
+        self.retryable_statuses = frozenset(retryable_statuses)
+
+    @classmethod
+    def disabled(cls) -> "RetryPolicy":
+        """Single attempt, no retries"""
+        return cls(max_attempts=1)
+
+    def classify(self, status: int, headers: Optional[Mapping[str, str]] = None) -> str:
+        if headers is not None and headers.get('cf-mitigated') == 'challenge':
+            return self.FAIL
+        if status in self.retryable_statuses:
+            return self.RETRY
+        if status >= 500:
+            return self.FAIL
+        return self.OK
+
+    def challenged(self, status: int, headers: Optional[Mapping[str, str]] = None) -> bool:
+        """Whether the upstream refused the requesting identity rather than the request"""
+        return status == 403 or (headers is not None and headers.get('cf-mitigated') == 'challenge')
+
+    def unavailable(self, status: int) -> bool:
+        """Whether a fetch status means the upstream could not serve the page
+
+        0 stands for no response at all; 403 is how Cloudflare challenges
+        and blocks look once the headers are gone. Callers serve stale
+        cache entries instead of these.
+        """
+        return status in (0, 403) or self.classify(status) != self.OK
+
+    def next_delay(self,
+                   attempts: int,
+                   elapsed: float,
+                   retry_after: Optional[float] = None) -> Optional[float]:
+        """Seconds to sleep before attempt ``attempts + 1``, or None to give up"""
+        if attempts >= self.max_attempts:
+            return None
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempts - 1)))
+        if retry_after is not None:
+            if retry_after > self.max_retry_after:
+                return None
+            delay = max(delay, retry_after)
+        if self.deadline is not None and elapsed + delay > self.deadline:
+            return None
+        return delay
+
+
+class CircuitBreaker:
+    """Thread-safe consecutive-failure circuit breaker shared by all upstream fetches
+
+    After ``failure_threshold`` failures in a row the circuit opens and
+    ``allow`` refuses requests for ``recovery_timeout`` seconds. Then one
+    probe request is let through (half-open): its success closes the
+    circuit, its failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_timeout = recovery_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._changed_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    @property
+    def retry_in(self) -> float:
+        """Seconds until the next request will be let through"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return 0.0
+            return max(0.0, self._changed_at + self.recovery_timeout - time.monotonic())
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now; in half-open state only one probe at a time is"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            now = time.monotonic()
+            if now - self._changed_at < self.recovery_timeout:
+                return False
+            # Open long enough, or a probe never reported back: let one through
+            self._state = self.HALF_OPEN
+            self._changed_at = now
+            return True
+
+    def release_probe(self):
+        """End a half-open probe that says nothing about the upstream, such as a challenge
+        of one session, so the next request probes instead of waiting out another timeout"""
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._state = self.OPEN
+                self._changed_at = time.monotonic() - self.recovery_timeout
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.OPEN:
+                # A request sent before the circuit opened; keep the original timer
+                return
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._changed_at = time.monotonic()
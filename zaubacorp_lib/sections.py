@@ -0,0 +1,228 @@
+# ============================================================================
+# zaubacorp_lib/sections.py
+# ============================================================================
+
+"""
+Compact rc_sections representation.
+
+Parsers build ``RcSection``/``RcTable``/``RcRow`` objects (slotted, with
+interned row keys) instead of nested dicts. ``RcSections`` wraps them in a
+read-only mapping that has the same shape as the original dict tree, but a
+section is only turned into dicts when it is looked up. ``to_json`` writes
+the API form straight from the compact objects, through orjson when it is
+installed (optional dependency; its output is identical for these
+string-only trees).
+"""
+
+import json
+import re
+import sys
+from collections.abc import Mapping
+from dataclasses import dataclass
+from json.encoder import encode_basestring
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+_intern = sys.intern
+
+# Interned once; keys of rows with more than two cells
+_COLUMN_KEYS = tuple(_intern(f"column_{i}") for i in range(32))
+
+
+def column_key(index: int) -> str:
+    if index < len(_COLUMN_KEYS):
+        return _COLUMN_KEYS[index]
+    return _intern(f"column_{index}")
+
+
+_WHITESPACE = re.compile(r'\s+')
+_PROTECTED_EMAIL = re.compile(r'\[email.*?protected\]')
+
+
+def clean_text(text: str) -> str:
+    """Clean and normalize text content: collapsed whitespace, Cloudflare email placeholders"""
+    if not text:
+        return ""
+    text = _WHITESPACE.sub(' ', text.strip())
+    return _PROTECTED_EMAIL.sub('[email protected]', text)
+
+
+def _json_list(values) -> str:
+    return '[' + ','.join(map(encode_basestring, values)) + ']'
+
+
+@dataclass
+class RcRow:
+    """One table row as (key, value) pairs"""
+    __slots__ = ('cells',)
+    cells: Tuple[Tuple[str, str], ...]
+
+    @classmethod
+    def from_cells(cls, cells: List[str], clean_text: Callable[[str], str]) -> Optional["RcRow"]:
+        """Apply the row rules of ``_extract_table_data``; None when the row is dropped
+
+        A two-cell row becomes ``{key: value}``, a wider row becomes
+        ``{column_i: text}`` for its non-empty cells.
+        """
+        if len(cells) == 2:
+            key = clean_text(cells[0])
+            value = clean_text(cells[1])
+            if key and value:
+                return cls(((_intern(key), value),))
+        elif len(cells) > 2:
+            pairs = []
+            for i, cell in enumerate(cells):
+                cell_text = clean_text(cell)
+                if cell_text:
+                    pairs.append((column_key(i), cell_text))
+            if pairs:
+                return cls(tuple(pairs))
+        return None
+
+    def to_dict(self) -> Dict[str, str]:
+        return dict(self.cells)
+
+    def to_json(self) -> str:
+        return '{' + ','.join(
+            f"{encode_basestring(key)}:{encode_basestring(value)}" for key, value in self.cells) + '}'
+
+
+@dataclass
+class RcTable:
+    __slots__ = ('caption', 'rows')
+    caption: str
+    rows: Tuple[RcRow, ...]
+
+    def to_dict(self) -> Dict:
+        return {'caption': self.caption, 'data': [row.to_dict() for row in self.rows]}
+
+    def to_json(self) -> str:
+        return (f'{{"caption":{encode_basestring(self.caption)},"data":['
+                + ','.join(row.to_json() for row in self.rows) + ']}')
+
+
+@dataclass
+class RcSection:
+    """One div.rc section; a field is None when the section had no such elements"""
+    __slots__ = ('descriptions', 'tables')
+    descriptions: Optional[Tuple[str, ...]]
+    tables: Optional[Tuple[RcTable, ...]]
+
+    def narrow(self, fields) -> Optional["RcSection"]:
+        """Copy keeping only ``fields``; None when nothing is left"""
+        descriptions = self.descriptions if 'descriptions' in fields else None
+        tables = self.tables if 'tables' in fields else None
+        if descriptions is None and tables is None:
+            return None
+        return RcSection(descriptions, tables)
+
+    def to_dict(self) -> Dict:
+        section_data = {}
+        if self.descriptions is not None:
+            section_data['descriptions'] = list(self.descriptions)
+        if self.tables is not None:
+            section_data['tables'] = [table.to_dict() for table in self.tables]
+        return section_data
+
+    def to_json(self) -> str:
+        parts = []
+        if self.descriptions is not None:
+            parts.append('"descriptions":' + _json_list(self.descriptions))
+        if self.tables is not None:
+            parts.append('"tables":[' + ','.join(table.to_json() for table in self.tables) + ']')
+        return '{' + ','.join(parts) + '}'
+
+    @classmethod
+    def from_dict(cls, section_data: Dict) -> "RcSection":
+        descriptions = section_data.get('descriptions')
+        tables = section_data.get('tables')
+        return cls(
+            tuple(descriptions) if descriptions is not None else None,
+            tuple(
+                RcTable(table['caption'], tuple(
+                    RcRow(tuple((_intern(key), value) for key, value in row.items()))
+                    for row in table['data']))
+                for table in tables) if tables is not None else None
+        )
+
+
+class RcSections(Mapping):
+    """Read-only ``{title: section dict}`` mapping over compact sections
+
+    Looking a section up materializes (and memoizes) its dict form, so
+    callers that only serialize the result never build the dict tree.
+    Instances are shared through the cache and must not be mutated.
+    """
+    __slots__ = ('_sections', '_materialized', '_json')
+
+    def __init__(self, sections: Optional[Dict[str, RcSection]] = None):
+        self._sections = sections if sections is not None else {}
+        self._materialized: Dict[str, Dict] = {}
+        self._json: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, rc_sections: Dict) -> "RcSections":
+        """Compact form of a plain rc_sections dict, e.g. loaded from the disk cache"""
+        if isinstance(rc_sections, RcSections):
+            return rc_sections
+        return cls({title: RcSection.from_dict(section_data)
+                    for title, section_data in rc_sections.items()})
+
+    def __getitem__(self, title: str) -> Dict:
+        section_data = self._materialized.get(title)
+        if section_data is None:
+            section_data = self._materialized[title] = self._sections[title].to_dict()
+        return section_data
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._sections)
+
+    def __len__(self) -> int:
+        return len(self._sections)
+
+    def __contains__(self, title) -> bool:
+        return title in self._sections
+
+    def compact_items(self):
+        """(title, RcSection) pairs without materializing anything"""
+        return self._sections.items()
+
+    def to_dict(self) -> Dict:
+        return {title: self[title] for title in self._sections}
+
+    def to_json(self) -> str:
+        """JSON text of the dict form, built from the compact objects and memoized"""
+        if self._json is None:
+            text = None
+            if ORJSON_AVAILABLE:
+                try:
+                    # Unmemoized dicts: serializing must not grow cached entries
+                    text = orjson.dumps({title: section.to_dict()
+                                         for title, section in self._sections.items()}).decode('utf-8')
+                except TypeError:
+                    # e.g. a lone surrogate from a numeric character reference
+                    pass
+            if text is None:
+                text = '{' + ','.join(
+                    f"{encode_basestring(title)}:{section.to_json()}"
+                    for title, section in self._sections.items()) + '}'
+            self._json = text
+        return self._json
+
+    def __repr__(self) -> str:
+        return f"RcSections({list(self._sections)!r})"
+
+    def __reduce__(self):
+        return (RcSections, (self._sections,))
+
+
+def rc_sections_json(rc_sections: Mapping) -> str:
+    """JSON text for rc_sections in either form, as json.dumps would write it compactly"""
+    if isinstance(rc_sections, RcSections):
+        return rc_sections.to_json()
+    return json.dumps(rc_sections, ensure_ascii=False, separators=(',', ':'))
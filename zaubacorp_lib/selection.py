@@ -0,0 +1,165 @@
+# ============================================================================
+# zaubacorp_lib/selection.py
+# ============================================================================
+
+from typing import Iterable, List, Mapping, Optional, Union
+
+from .sections import RcSections, clean_text
+
+# Parts of an rc section a selection can keep
+SECTION_FIELDS = ("descriptions", "tables")
+
+
+def _normalize(title: str) -> str:
+    return ' '.join(title.split()).lower()
+
+
+def _split(value: Union[str, Iterable[str], None]) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+    return [item.strip() for item in value if item and item.strip()]
+
+
+class SectionMatcher:
+    """Per-parse state of a Selection: which requested sections are still missing
+
+    ``apply`` only calls ``match``. Parsers also ``add`` the title of every
+    non-empty section they extracted, in document order, and ask
+    ``candidate`` before extracting the next one.
+    """
+    __slots__ = ('pending', 'claimed', '_seen')
+
+    def __init__(self, sections: Iterable[str]):
+        self.pending = list(sections)
+        # Titles of sections that claimed a name, and every title added
+        self.claimed = set()
+        self._seen = set()
+
+    def match(self, title: Optional[str]) -> bool:
+        """Claim every still-missing name ``title`` contains; untitled sections never match"""
+        if title is None or not self.pending:
+            return False
+        normalized = _normalize(title)
+        remaining = [name for name in self.pending if name not in normalized]
+        if len(remaining) == len(self.pending):
+            return False
+        self.pending = remaining
+        return True
+
+    @property
+    def done(self) -> bool:
+        return not self.pending
+
+    def add(self, title: str):
+        """Record the cleaned title of an extracted non-empty section, as ``apply`` will see it
+
+        A repeated title keeps its first position, so only its first
+        occurrence can claim names.
+        """
+        if title in self._seen:
+            return
+        self._seen.add(title)
+        if not title.startswith('section_') and self.match(title):
+            self.claimed.add(title)
+
+    def candidate(self, title: Optional[str]) -> bool:
+        """Whether a section with this raw title can still change the result
+
+        It can if it may claim a missing name, or if it repeats the title of
+        a section that claimed one: the later section replaces the earlier,
+        as in a full parse. Untitled sections never can, since their
+        ``section_N`` numbers count every section before them. Asked before
+        every earlier section was added, the answer errs towards True.
+        """
+        if title is None:
+            return False
+        title = clean_text(title)
+        if title in self.claimed:
+            return True
+        if title in self._seen:
+            return False
+        normalized = _normalize(title)
+        return any(name in normalized for name in self.pending)
+
+
+class Selection:
+    """Which rc_sections, and which parts of them, a lookup should return
+
+    Each name in ``sections`` selects the first section of the fully parsed
+    page whose title contains it, case-insensitively ("director" selects
+    "Director Details"). ``fields`` limits the parts kept per section to a
+    subset of ``SECTION_FIELDS``. ``apply`` defines the result, so a cold
+    fetch and a cache hit return the same data.
+
+    A parse with a selection builds only the requested fields, and only
+    for sections that can still change the result (see
+    ``SectionMatcher.candidate``); other parts are merely noted as present,
+    which decides whether a section can claim a name. The page is still
+    read to its end: a later section repeating a selected title replaces
+    it, so no prefix of the page settles the result.
+    """
+    __slots__ = ('sections', 'fields')
+
+    def __init__(self,
+                 sections: Union[str, Iterable[str], None] = None,
+                 fields: Union[str, Iterable[str], None] = None):
+        names = _split(sections)
+        self.sections = tuple(dict.fromkeys(_normalize(name) for name in names)) or None
+
+        requested = _split(fields)
+        unknown = [field for field in requested if field not in SECTION_FIELDS]
+        if unknown:
+            raise ValueError(
+                f"Unknown section fields {unknown}. Must be among: {list(SECTION_FIELDS)}")
+        self.fields = frozenset(requested or SECTION_FIELDS)
+
+    @classmethod
+    def coerce(cls,
+               sections: Union[str, Iterable[str], None] = None,
+               fields: Union[str, Iterable[str], None] = None) -> Optional["Selection"]:
+        """Build a Selection, or None when nothing narrower than a full parse was asked for"""
+        selection = cls(sections, fields)
+        if selection.sections is None and selection.fields == frozenset(SECTION_FIELDS):
+            return None
+        return selection
+
+    @property
+    def key(self) -> str:
+        """Stable text form, used to keep differently-selected lookups apart"""
+        return f"{','.join(self.sections or ())}|{','.join(sorted(self.fields))}"
+
+    def wants(self, field: str) -> bool:
+        return field in self.fields
+
+    def matcher(self) -> Optional[SectionMatcher]:
+        """Fresh matcher for one parse or ``apply``; None when every section is wanted"""
+        return SectionMatcher(self.sections) if self.sections is not None else None
+
+    def apply(self, rc_sections: Mapping) -> RcSections:
+        """Narrow fully parsed rc_sections, e.g. a cached page, to this selection
+
+        Also turns what a selective parse extracted into the final result.
+        """
+        matcher = self.matcher()
+        selected = {}
+        for title, section in RcSections.from_dict(rc_sections).compact_items():
+            if matcher is not None:
+                if title.startswith('section_') or not matcher.match(title):
+                    continue
+            kept = section.narrow(self.fields)
+            if kept is not None:
+                selected[title] = kept
+            if matcher is not None and matcher.done:
+                break
+        return RcSections(selected)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Selection) and self.key == other.key
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+    def __repr__(self) -> str:
+        return f"Selection(sections={self.sections!r}, fields={sorted(self.fields)!r})"
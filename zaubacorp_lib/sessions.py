@@ -0,0 +1,344 @@
+# ============================================================================
+# zaubacorp_lib/sessions.py
+# ============================================================================
+
+"""
+Pool of upstream identities (session cookies) with per-session budgets.
+
+Each ``UpstreamSession`` carries its own cookies, optional User-Agent and
+``RateLimiter``, so throughput grows with the number of sessions instead
+of being capped by one identity. ``SessionPool.acquire`` sends each
+request through the usable session with the most spare budget, and
+``release`` records its outcome: a session that gets challenged, fails
+``failure_threshold`` times in a row or whose recent success rate drops
+below ``min_success_rate`` is quarantined, for twice as long each time it
+relapses. When the quarantine ends one probe request is let through,
+whose success returns the session to rotation.
+
+The last usable session is never quarantined; an upstream-wide outage is
+the circuit breaker's job.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+from .rate_limit import RateLimiter
+
+# Builds a session's budget from its name and RateLimiter limits
+RateLimiterFactory = Callable[[str, Dict], RateLimiter]
+
+
+def parse_cookie_header(value: str) -> Dict[str, str]:
+    """``{name: value}`` from a Cookie header such as ``ZCSESSID=...; cf_clearance=...``"""
+    cookies = {}
+    for part in value.split(';'):
+        name, _, cookie_value = part.strip().partition('=')
+        if name:
+            cookies[name] = cookie_value
+    return cookies
+
+
+class UpstreamSession:
+    """One upstream identity: cookies, User-Agent, request budget and health"""
+
+    HEALTHY = "healthy"
+    QUARANTINED = "quarantined"
+    PROBING = "probing"
+
+    def __init__(self,
+                 name: str,
+                 cookies: Union[str, Mapping[str, str]],
+                 user_agent: Optional[str] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 window: int = 50):
+        self.name = name
+        self.cookies = dict(parse_cookie_header(cookies) if isinstance(cookies, str) else cookies)
+        self.user_agent = user_agent
+        # Unthrottled unless given; the client's own limiter still applies
+        self.rate_limiter = rate_limiter or RateLimiter(typeahead_rate=None, page_rate=None)
+        self.headers: Dict[str, str] = {}
+        self._build_headers()
+
+        self.state = self.HEALTHY
+        self.quarantined_until = 0.0
+        self.quarantines = 0
+        self._strikes = 0
+        self.inflight = 0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.latency: Optional[float] = None  # EWMA of answered requests, seconds
+        self.outcomes = deque(maxlen=window)
+
+    def _build_headers(self):
+        headers = {'Cookie': '; '.join(f"{name}={value}" for name, value in self.cookies.items())}
+        if self.user_agent:
+            headers['User-Agent'] = self.user_agent
+        # Replaced, never mutated, so readers need no lock
+        self.headers = headers
+
+    @property
+    def success_rate(self) -> Optional[float]:
+        """Share of successful requests among the last ``window``, None before any"""
+        if not self.outcomes:
+            return None
+        return sum(self.outcomes) / len(self.outcomes)
+
+    def to_dict(self) -> Dict:
+        success_rate = self.success_rate
+        return {
+            'name': self.name,
+            'state': self.state,
+            'requests': self.requests,
+            'failures': self.failures,
+            'success_rate': round(success_rate, 3) if success_rate is not None else None,
+            'latency_ms': round(self.latency * 1000, 1) if self.latency is not None else None,
+            'inflight': self.inflight,
+            'quarantines': self.quarantines,
+            'quarantined_for': round(max(0.0, self.quarantined_until - time.monotonic()), 1)
+            if self.state == self.QUARANTINED else 0.0
+        }
+
+
+class SessionPool:
+    """Spreads requests across upstream sessions and quarantines unhealthy ones
+
+    Thread-safe; the sync and async clients share the same bookkeeping.
+    ``acquire`` picks the session whose budget for the request kind has
+    the most tokens available (ties go to the fewest requests in flight,
+    then round-robin), reserves one and returns it with the wait;
+    ``release`` must follow with the outcome.
+    """
+
+    def __init__(self,
+                 sessions: Iterable[UpstreamSession],
+                 failure_threshold: int = 3,
+                 min_success_rate: float = 0.5,
+                 min_samples: int = 10,
+                 quarantine_seconds: float = 60.0,
+                 max_quarantine: float = 900.0,
+                 latency_alpha: float = 0.2):
+        self.sessions: List[UpstreamSession] = list(sessions)
+        if not self.sessions:
+            raise ValueError("SessionPool needs at least one session")
+        self.failure_threshold = max(1, failure_threshold)
+        self.min_success_rate = min_success_rate
+        self.min_samples = max(1, min_samples)
+        self.quarantine_seconds = quarantine_seconds
+        self.max_quarantine = max_quarantine
+        self.latency_alpha = latency_alpha
+        self._next = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def single(cls, cookies: Union[str, Mapping[str, str]], **kwargs) -> "SessionPool":
+        """Pool of one unthrottled session, the clients' default"""
+        return cls([UpstreamSession("default", cookies)], **kwargs)
+
+    @classmethod
+    def from_config(cls,
+                    entries: Iterable[Union[str, Dict]],
+                    defaults: Optional[Dict] = None,
+                    rate_limiter_factory: Optional[RateLimiterFactory] = None,
+                    **kwargs) -> "SessionPool":
+        """Pool from credential entries
+
+        Each entry is a Cookie header string or a dict with ``cookie`` (a
+        header string) or ``cookies`` (a mapping), and optionally ``name``,
+        ``user_agent`` and ``RateLimiter`` limits (``typeahead_rate``,
+        ``typeahead_burst``, ``page_rate``, ``page_burst``) overriding
+        ``defaults``. ``rate_limiter_factory(name, limits)`` builds each
+        budget, e.g. a ``SharedRateLimiter`` keyed by the name; plain
+        ``RateLimiter``s by default.
+        """
+        factory = rate_limiter_factory or (lambda name, limits: RateLimiter(**limits))
+        limit_keys = ('typeahead_rate', 'typeahead_burst', 'page_rate', 'page_burst')
+        sessions = []
+        for i, entry in enumerate(entries):
+            if isinstance(entry, str):
+                entry = {'cookie': entry}
+            name = str(entry.get('name') or f"session-{i + 1}")
+            cookies = entry.get('cookies') or entry.get('cookie')
+            if not cookies:
+                raise ValueError(f"Session {name!r} has no cookie")
+            limits = dict(defaults or {})
+            limits.update({key: entry[key] for key in limit_keys if key in entry})
+            sessions.append(UpstreamSession(
+                name, cookies,
+                user_agent=entry.get('user_agent'),
+                rate_limiter=factory(name, limits)
+            ))
+        return cls(sessions, **kwargs)
+
+    @classmethod
+    def load(cls, source: str, **kwargs) -> "SessionPool":
+        """``from_config`` on a JSON list given inline or as a file path"""
+        if not source.lstrip().startswith('['):
+            with open(os.path.expanduser(source), encoding='utf-8') as f:
+                source = f.read()
+        return cls.from_config(json.loads(source), **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    @property
+    def blocking(self) -> bool:
+        """Whether any session's budget lookups may block on I/O"""
+        return any(session.rate_limiter.blocking for session in self.sessions)
+
+    def _usable(self, session: UpstreamSession, now: float) -> bool:
+        if session.state == UpstreamSession.QUARANTINED:
+            return session.quarantined_until <= now
+        if session.state == UpstreamSession.PROBING:
+            # One probe at a time
+            return session.inflight == 0
+        return True
+
+    def _candidates(self) -> List[UpstreamSession]:
+        now = time.monotonic()
+        count = len(self.sessions)
+        ordered = [self.sessions[(self._next + i) % count] for i in range(count)]
+        self._next = (self._next + 1) % count
+        candidates = [session for session in ordered if self._usable(session, now)]
+        if candidates:
+            return candidates
+        # Everything quarantined or probing: the one released soonest
+        return [min(ordered, key=lambda session: session.quarantined_until)]
+
+    def acquire(self, kind: str) -> Tuple[UpstreamSession, float]:
+        """Pick a session for one ``kind`` request and reserve its budget
+
+        Returns the session and the seconds to wait before sending; the
+        caller sleeps (``RateLimiter.acquire`` semantics) then sends with
+        ``session.headers``.
+        """
+        while True:
+            with self._lock:
+                candidates = self._candidates()
+            # Outside the lock: shared budgets may make a round trip
+            session = candidates[0] if len(candidates) == 1 else min(
+                candidates, key=lambda s: (-s.rate_limiter.available(kind), s.inflight))
+            with self._lock:
+                now = time.monotonic()
+                # Another thread may have started probing it meanwhile; pick again
+                if self._usable(session, now) or not any(
+                        self._usable(other, now) for other in self.sessions):
+                    if session.state == UpstreamSession.QUARANTINED:
+                        session.state = UpstreamSession.PROBING
+                    session.inflight += 1
+                    break
+        return session, session.rate_limiter.reserve(kind)
+
+    async def acquire_async(self, kind: str) -> Tuple[UpstreamSession, float]:
+        """``acquire`` for asyncio callers, off the event loop when budgets block on I/O"""
+        if not self.blocking:
+            return self.acquire(kind)
+        future = asyncio.get_running_loop().run_in_executor(None, self.acquire, kind)
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # The session is still reserved once acquire finishes; hand it back
+            future.add_done_callback(self._abandon_acquired)
+            raise
+
+    def _abandon_acquired(self, future: "asyncio.Future"):
+        if not future.cancelled() and future.exception() is None:
+            self.abandon(future.result()[0])
+
+    def budget(self, kind: str) -> Tuple[float, int, Optional[float]]:
+        """Spare tokens, burst and rate of the ``kind`` budgets of the sessions in rotation
+
+        Spare tokens are infinite when a usable session is unthrottled.
+        """
+        now = time.monotonic()
+        with self._lock:
+            usable = [session for session in self.sessions if self._usable(session, now)]
+        buckets = [session.rate_limiter.buckets[kind] for session in usable]
+        if any(not bucket.rate for bucket in buckets):
+            return float('inf'), 0, None
+        # Outside the lock: shared budgets may make a round trip
+        return (sum(session.rate_limiter.available(kind) for session in usable),
+                sum(bucket.burst for bucket in buckets),
+                sum(bucket.rate for bucket in buckets))
+
+    def release(self,
+                session: UpstreamSession,
+                ok: bool,
+                latency: Optional[float] = None,
+                challenged: bool = False,
+                cookies: Optional[Mapping[str, str]] = None) -> bool:
+        """Record the outcome of a request sent with ``session``
+
+        ``ok`` means the upstream answered (including 404s); ``challenged``
+        that it refused this identity (Cloudflare challenge or 403).
+        ``cookies`` set by the response are kept for the session's later
+        requests. Returns True when the session was quarantined.
+        """
+        with self._lock:
+            session.inflight = max(0, session.inflight - 1)
+            session.requests += 1
+            if cookies:
+                updated = {**session.cookies, **dict(cookies.items())}
+                if updated != session.cookies:
+                    session.cookies = updated
+                    session._build_headers()
+            if ok and not challenged:
+                session.outcomes.append(True)
+                session.consecutive_failures = 0
+                if latency is not None:
+                    session.latency = latency if session.latency is None else (
+                        self.latency_alpha * latency + (1 - self.latency_alpha) * session.latency)
+                if session.state == UpstreamSession.PROBING:
+                    session.state = UpstreamSession.HEALTHY
+                    session._strikes = 0
+                    session.outcomes.clear()
+                    session.outcomes.append(True)
+                return False
+
+            session.outcomes.append(False)
+            session.failures += 1
+            session.consecutive_failures += 1
+            success_rate = session.success_rate
+            unhealthy = (
+                challenged
+                or session.state == UpstreamSession.PROBING
+                or session.consecutive_failures >= self.failure_threshold
+                or (len(session.outcomes) >= self.min_samples
+                    and success_rate is not None and success_rate < self.min_success_rate)
+            )
+            if not unhealthy or session.state == UpstreamSession.QUARANTINED:
+                return False
+            now = time.monotonic()
+            if not any(other is not session and self._usable(other, now) for other in self.sessions):
+                # Keep the last usable session in rotation
+                session.state = UpstreamSession.HEALTHY
+                return False
+            session.state = UpstreamSession.QUARANTINED
+            session.quarantined_until = now + min(
+                self.max_quarantine, self.quarantine_seconds * 2 ** session._strikes)
+            session._strikes += 1
+            session.quarantines += 1
+            return True
+
+    def abandon(self, session: UpstreamSession):
+        """Release a request that ended without an outcome, e.g. when cancelled"""
+        with self._lock:
+            session.inflight = max(0, session.inflight - 1)
+            if session.state == UpstreamSession.PROBING and session.inflight == 0:
+                # Probe again on the next acquire
+                session.state = UpstreamSession.QUARANTINED
+
+    def healthy(self) -> int:
+        """Sessions currently in rotation"""
+        with self._lock:
+            return sum(1 for session in self.sessions if session.state == UpstreamSession.HEALTHY)
+
+    def snapshot(self) -> List[Dict]:
+        """Per-session state, traffic, success rate and latency"""
+        with self._lock:
+            return [session.to_dict() for session in self.sessions]
@@ -0,0 +1,516 @@
+# ============================================================================
+# zaubacorp_lib/shared.py
+# ============================================================================
+
+"""
+State shared between worker processes and hosts.
+
+A ``SharedBackend`` stores expiring byte values with two atomic primitives,
+``set_if_absent`` and ``incr``. On top of it:
+
+- ``SharedCache`` is a cache tier for ``ResponseCache(disk=...)``, so every
+  worker reads the pages and search results any worker fetched;
+- ``SharedRateLimiter`` draws every worker's requests from one budget;
+- ``SharedSingleFlight`` makes concurrent lookups of the same page across
+  processes wait for one fetch instead of each doing their own.
+
+``RedisBackend`` speaks the Redis protocol (no client library needed) for
+multi-host fleets; ``SQLiteBackend`` needs only a file for several workers
+on one host.
+
+An unreachable or failing backend degrades each worker to local state
+rather than failing requests: the shared cache tier misses, the rate
+limiter falls back to its in-process buckets and single-flight lets every
+worker fetch. The asyncio entry points make their backend calls in the
+default executor so a slow backend does not stall the event loop.
+"""
+
+import asyncio
+import json
+import logging
+import socket
+import sqlite3
+import struct
+import threading
+import time
+import uuid
+import zlib
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Optional
+from urllib.parse import urlparse
+
+from .cache import CacheEntry, SQLiteCache
+from .exceptions import SharedBackendError
+from .rate_limit import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+# What a backend raises when it is unreachable or refuses a command
+BACKEND_ERRORS = (OSError, sqlite3.Error, SharedBackendError)
+
+_last_warning = 0.0
+
+
+def _backend_failed(action: str, error: Exception, interval: float = 30.0):
+    """Log a backend failure, as a warning at most once per ``interval`` seconds"""
+    global _last_warning
+    now = time.monotonic()
+    level = logging.WARNING if now - _last_warning >= interval else logging.DEBUG
+    if level == logging.WARNING:
+        _last_warning = now
+    logger.log(level, f"Shared backend {action} failed, using local state: {error!r}")
+
+
+async def _off_loop(func, *args):
+    """Run a blocking backend call in the default executor"""
+    return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+
+class SharedBackend(ABC):
+    """Expiring key/value store shared by every worker
+
+    ``ttl`` is in seconds; None keeps a key until it is deleted.
+    Implementations must make ``set_if_absent``, ``delete_if_equal`` and
+    ``incr`` atomic across processes.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        ...
+
+    @abstractmethod
+    def set_if_absent(self, key: str, value: bytes, ttl: float) -> bool:
+        """Store ``value`` only if ``key`` is missing or expired; True if stored"""
+
+    @abstractmethod
+    def delete(self, key: str):
+        ...
+
+    @abstractmethod
+    def delete_if_equal(self, key: str, value: bytes) -> bool:
+        """Delete ``key`` only while it still holds ``value``; True if deleted"""
+
+    @abstractmethod
+    def incr(self, key: str, ttl: float) -> int:
+        """Add one to an integer counter, creating it with ``ttl`` if missing"""
+
+    def close(self):
+        pass
+
+
+class SQLiteBackend(SharedBackend):
+    """SharedBackend in one SQLite file, for several worker processes on one host"""
+
+    def __init__(self, path: str, timeout: float = 5.0):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS shared "
+                "(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)"
+            )
+
+    @staticmethod
+    def _expires_at(ttl: Optional[float]) -> Optional[float]:
+        return time.time() + ttl if ttl is not None else None
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM shared WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (key, time.time())).fetchone()
+        return row[0] if row is not None else None
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO shared (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, self._expires_at(ttl)))
+
+    def set_if_absent(self, key: str, value: bytes, ttl: float) -> bool:
+        # The DELETE takes the write lock, so both statements run as one
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM shared WHERE key = ? AND expires_at <= ?",
+                               (key, time.time()))
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO shared (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, self._expires_at(ttl)))
+            return cursor.rowcount == 1
+
+    def delete(self, key: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM shared WHERE key = ?", (key,))
+
+    def delete_if_equal(self, key: str, value: bytes) -> bool:
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "DELETE FROM shared WHERE key = ? AND value = ?", (key, value)).rowcount == 1
+
+    def incr(self, key: str, ttl: float) -> int:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM shared WHERE key = ? AND expires_at <= ?",
+                               (key, time.time()))
+            updated = self._conn.execute(
+                "UPDATE shared SET value = CAST(value AS INTEGER) + 1 WHERE key = ?", (key,))
+            if updated.rowcount == 0:
+                self._conn.execute(
+                    "INSERT INTO shared (key, value, expires_at) VALUES (?, 1, ?)",
+                    (key, self._expires_at(ttl)))
+                return 1
+            return self._conn.execute(
+                "SELECT value FROM shared WHERE key = ?", (key,)).fetchone()[0]
+
+    def purge_expired(self) -> int:
+        """Delete expired rows and return how many were removed"""
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "DELETE FROM shared WHERE expires_at <= ?", (time.time(),)).rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class RedisBackend(SharedBackend):
+    """SharedBackend on a Redis (or protocol-compatible) server, for multi-host fleets
+
+    Speaks RESP over one socket guarded by a lock, reconnecting once when
+    the connection drops. ``url`` is ``redis://[:password@]host[:port][/db]``.
+    """
+
+    # Compare-and-delete in one step on the server
+    DELETE_IF_EQUAL = (
+        "if redis.call('GET', KEYS[1]) == ARGV[1] then "
+        "return redis.call('DEL', KEYS[1]) else return 0 end"
+    )
+
+    def __init__(self, url: str = "redis://127.0.0.1:6379/0", timeout: float = 5.0):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 6379
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.password = parsed.password
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._sock: Optional[socket.socket] = None
+        self._reader = None
+
+    def _connect(self):
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._reader = self._sock.makefile("rb")
+        if self.password:
+            self._roundtrip(("AUTH", self.password))
+        if self.db:
+            self._roundtrip(("SELECT", self.db))
+
+    def _disconnect(self):
+        if self._sock is not None:
+            try:
+                self._reader.close()
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = None
+        self._reader = None
+
+    @staticmethod
+    def _encode(args) -> bytes:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        return b"".join(parts)
+
+    def _read_reply(self) -> Any:
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Redis connection closed")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode("utf-8")
+        if kind == b"-":
+            raise SharedBackendError(payload.decode("utf-8"))
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            data = self._reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            length = int(payload)
+            if length < 0:
+                return None
+            return [self._read_reply() for _ in range(length)]
+        raise SharedBackendError(f"Unexpected reply {line!r}")
+
+    def _roundtrip(self, args) -> Any:
+        self._sock.sendall(self._encode(args))
+        return self._read_reply()
+
+    def execute(self, *args) -> Any:
+        """Send one command and return its decoded reply"""
+        with self._lock:
+            for attempt in range(2):
+                if self._sock is None:
+                    self._connect()
+                try:
+                    return self._roundtrip(args)
+                except (ConnectionError, OSError):
+                    self._disconnect()
+                    if attempt:
+                        raise
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.execute("GET", key)
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        if ttl is None:
+            self.execute("SET", key, value)
+        else:
+            self.execute("SET", key, value, "PX", max(1, int(ttl * 1000)))
+
+    def set_if_absent(self, key: str, value: bytes, ttl: float) -> bool:
+        return self.execute("SET", key, value, "NX", "PX", max(1, int(ttl * 1000))) is not None
+
+    def delete(self, key: str):
+        self.execute("DEL", key)
+
+    def delete_if_equal(self, key: str, value: bytes) -> bool:
+        return self.execute("EVAL", self.DELETE_IF_EQUAL, 1, key, value) == 1
+
+    def incr(self, key: str, ttl: float) -> int:
+        count = self.execute("INCR", key)
+        if count == 1:
+            self.execute("PEXPIRE", key, max(1, int(ttl * 1000)))
+        return count
+
+    def close(self):
+        with self._lock:
+            self._disconnect()
+
+
+_STORED_AT = struct.Struct(">d")
+
+
+class SharedCache:
+    """Cache tier on a SharedBackend, a drop-in for ``SQLiteCache`` in ``ResponseCache``
+
+    Values are stored as zlib-compressed JSON behind their store time.
+    Keys are kept ``retain`` seconds past ``ttl`` so expired entries can
+    still be revalidated or served stale. Closing the tier leaves the
+    backend open; whoever created the backend closes it.
+    """
+
+    def __init__(self,
+                 backend: SharedBackend,
+                 ttl: Optional[float] = 86400.0,
+                 retain: float = 86400.0,
+                 prefix: str = "zauba:cache:"):
+        self.backend = backend
+        self.ttl = ttl
+        self.retain = retain
+        self.prefix = prefix
+
+    def get(self, key: str, allow_stale: bool = False) -> Optional[CacheEntry]:
+        try:
+            blob = self.backend.get(self.prefix + key)
+        except BACKEND_ERRORS as e:
+            _backend_failed("cache read", e)
+            return None
+        if blob is None:
+            return None
+        stored_at, = _STORED_AT.unpack_from(blob)
+        if not allow_stale and self.ttl is not None and time.time() - stored_at > self.ttl:
+            return None
+        value = json.loads(zlib.decompress(blob[_STORED_AT.size:]).decode('utf-8'))
+        return CacheEntry(value=value, stored_at=stored_at, tier="shared", ttl=self.ttl)
+
+    def set(self, key: str, value: Any, stored_at: Optional[float] = None):
+        stored_at = stored_at or time.time()
+        blob = zlib.compress(json.dumps(value, default=SQLiteCache._encode).encode('utf-8'))
+        ttl = None
+        if self.ttl is not None:
+            ttl = max(1.0, stored_at + self.ttl + self.retain - time.time())
+        try:
+            self.backend.set(self.prefix + key, _STORED_AT.pack(stored_at) + blob, ttl)
+        except BACKEND_ERRORS as e:
+            _backend_failed("cache write", e)
+
+    def delete(self, key: str):
+        try:
+            self.backend.delete(self.prefix + key)
+        except BACKEND_ERRORS as e:
+            _backend_failed("cache delete", e)
+
+    def purge_expired(self) -> int:
+        """Nothing to do: the backend expires keys itself"""
+        return 0
+
+    def close(self):
+        pass
+
+
+class SharedRateLimiter(RateLimiter):
+    """RateLimiter whose budgets are shared by every worker through a SharedBackend
+
+    Each budget is split into windows of ``burst / rate`` seconds holding
+    ``burst`` requests, counted with atomic increments. A request takes
+    the first window that still has room and waits for it to start, so
+    the fleet as a whole keeps the configured rate. While the backend is
+    unreachable each worker keeps the rate on its own instead.
+    """
+
+    # Budget lookups make backend round trips; async callers run them off the loop
+    blocking = True
+
+    def __init__(self,
+                 backend: SharedBackend,
+                 typeahead_rate: Optional[float] = 1.0,
+                 typeahead_burst: int = 1,
+                 page_rate: Optional[float] = None,
+                 page_burst: int = 1,
+                 prefix: str = "zauba:ratelimit:",
+                 max_windows: int = 64):
+        super().__init__(typeahead_rate, typeahead_burst, page_rate, page_burst)
+        self.backend = backend
+        self.prefix = prefix
+        self.max_windows = max_windows
+
+    def reserve(self, kind: str) -> float:
+        bucket = self.buckets[kind]
+        if not bucket.rate:
+            return 0.0
+        window = bucket.burst / bucket.rate
+        now = time.time()
+        first = int(now // window)
+        try:
+            for slot in range(first, first + self.max_windows):
+                count = self.backend.incr(f"{self.prefix}{kind}:{slot}",
+                                          ttl=(slot - first + 2) * window)
+                if count <= bucket.burst:
+                    return max(0.0, slot * window - now)
+        except BACKEND_ERRORS as e:
+            _backend_failed("rate limit", e)
+            return bucket.reserve()
+        return (first + self.max_windows) * window - now
+
+    def available(self, kind: str) -> float:
+        bucket = self.buckets[kind]
+        if not bucket.rate:
+            return float('inf')
+        slot = int(time.time() // (bucket.burst / bucket.rate))
+        try:
+            used = self.backend.get(f"{self.prefix}{kind}:{slot}")
+        except BACKEND_ERRORS as e:
+            _backend_failed("rate limit", e)
+            return bucket.available()
+        return max(0, bucket.burst - int(used or 0))
+
+    async def acquire_async(self, kind: str) -> float:
+        wait = await _off_loop(self.reserve, kind)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class SharedSingleFlight:
+    """Cross-process lock so one worker fetches a page while the others wait for it
+
+    ``hold(key)`` yields True to the worker that took the lock and False to
+    the others, once the lock is released or ``wait_timeout`` passes; they
+    then read the leader's result from the shared cache. Locks expire after
+    ``lock_ttl`` seconds in case their holder dies. Without a reachable
+    backend every worker leads.
+    """
+
+    def __init__(self,
+                 backend: SharedBackend,
+                 lock_ttl: float = 30.0,
+                 wait_timeout: float = 30.0,
+                 poll_interval: float = 0.05,
+                 prefix: str = "zauba:flight:"):
+        self.backend = backend
+        self.lock_ttl = lock_ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self.prefix = prefix
+
+    def _acquire(self, name: str, token: bytes) -> Optional[bool]:
+        """True if the lock was taken, False if held elsewhere, None without a backend"""
+        try:
+            return self.backend.set_if_absent(name, token, self.lock_ttl)
+        except BACKEND_ERRORS as e:
+            _backend_failed("lock", e)
+            return None
+
+    def _held(self, name: str) -> bool:
+        try:
+            return self.backend.get(name) is not None
+        except BACKEND_ERRORS as e:
+            _backend_failed("lock poll", e)
+            return False
+
+    def _release(self, name: str, token: bytes):
+        # Only while still ours: after lock_ttl another worker may hold it
+        try:
+            self.backend.delete_if_equal(name, token)
+        except BACKEND_ERRORS as e:
+            _backend_failed("unlock", e)
+
+    @contextmanager
+    def hold(self, key: str):
+        name = self.prefix + key
+        token = uuid.uuid4().hex.encode()
+        acquired = self._acquire(name, token)
+        if acquired is None:
+            yield True
+            return
+        if acquired:
+            try:
+                yield True
+            finally:
+                self._release(name, token)
+            return
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline and self._held(name):
+            time.sleep(self.poll_interval)
+        yield False
+
+    @asynccontextmanager
+    async def hold_async(self, key: str):
+        name = self.prefix + key
+        token = uuid.uuid4().hex.encode()
+        acquired = await _off_loop(self._acquire, name, token)
+        if acquired is None:
+            yield True
+            return
+        if acquired:
+            try:
+                yield True
+            finally:
+                await _off_loop(self._release, name, token)
+            return
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline and await _off_loop(self._held, name):
+            await asyncio.sleep(self.poll_interval)
+        yield False
+
+
+def backend_from_url(url: str) -> SharedBackend:
+    """``redis://host:port/db``, ``sqlite:///relative.db`` or ``sqlite:////absolute.db``"""
+    if url.startswith("redis://"):
+        return RedisBackend(url)
+    if url.startswith("sqlite:///"):
+        return SQLiteBackend(url[len("sqlite:///"):])
+    raise ValueError(f"Unsupported shared backend URL: {url}")
@@ -0,0 +1,209 @@
+# ============================================================================
+# zaubacorp_lib/streaming.py
+# ============================================================================
+
+"""
+Parse-while-downloading for company pages.
+
+``ContentDecoder`` undoes a response's Content-Encoding (gzip, deflate, br
+or a chain of them) one chunk at a time, and ``StreamingPageParser`` feeds
+the decoded text straight into the ``stream`` engine's tokenizer. A page
+is extracted as its chunks arrive, and the compressed body, its
+decompressed copy and the decoded string are never held whole.
+"""
+
+import codecs
+import time
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+from .cache import content_hasher
+from .extraction import HtmlExtractionMixin
+from .parsers import STREAM_CHUNK_SIZE, RcSectionStreamParser, add_rc_section
+from .sections import RcSection, RcSections
+from .selection import Selection
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# Only advertise what can be decoded, here and by requests/httpx
+ACCEPT_ENCODING = "gzip, deflate, br" if BROTLI_AVAILABLE else "gzip, deflate"
+
+# Bytes read from the socket per step
+STREAM_READ_SIZE = 16384
+
+
+class _GzipDecoder:
+    """gzip, including bodies made of several concatenated members"""
+
+    def __init__(self):
+        self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    def decompress(self, data: bytes) -> bytes:
+        output = []
+        while data:
+            output.append(self._decompressor.decompress(data))
+            data = self._decompressor.unused_data
+            if data:
+                self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        return b"".join(output)
+
+    def flush(self) -> bytes:
+        return self._decompressor.flush()
+
+
+class _DeflateDecoder:
+    """deflate as zlib-wrapped data, or the raw streams some servers send instead"""
+
+    def __init__(self):
+        self._decompressor = None
+        self._head = b""
+
+    def decompress(self, data: bytes) -> bytes:
+        if self._decompressor is None:
+            self._head += data
+            if len(self._head) < 2:
+                return b""
+            data, self._head = self._head, b""
+            # A zlib header is CM=8 with a 16-bit value divisible by 31
+            wrapped = data[0] & 0x0F == 8 and (data[0] << 8 | data[1]) % 31 == 0
+            self._decompressor = zlib.decompressobj(zlib.MAX_WBITS if wrapped else -zlib.MAX_WBITS)
+        return self._decompressor.decompress(data)
+
+    def flush(self) -> bytes:
+        if self._decompressor is None:
+            return zlib.decompress(self._head, -zlib.MAX_WBITS) if self._head else b""
+        return self._decompressor.flush()
+
+
+class _BrotliDecoder:
+    def __init__(self):
+        self._decompressor = brotli.Decompressor()
+        # brotli names it process, brotlicffi decompress
+        self.decompress = getattr(self._decompressor, 'process', None) or self._decompressor.decompress
+
+    def flush(self) -> bytes:
+        return b""
+
+
+_DECODERS = {
+    'gzip': _GzipDecoder,
+    'x-gzip': _GzipDecoder,
+    'deflate': _DeflateDecoder,
+}
+if BROTLI_AVAILABLE:
+    _DECODERS['br'] = _BrotliDecoder
+
+
+class ContentDecoder:
+    """Incremental decoder for a Content-Encoding header value
+
+    Codings are undone in reverse order of application; ``identity`` and a
+    missing header pass bytes through. Unsupported codings (and ``br``
+    without the brotli package) raise ``ValueError`` up front.
+    """
+
+    def __init__(self, content_encoding: Optional[str] = None):
+        codings = [coding.strip().lower() for coding in (content_encoding or "").split(",")]
+        self._decoders = []
+        for coding in reversed(codings):
+            if coding in ("", "identity"):
+                continue
+            decoder = _DECODERS.get(coding)
+            if decoder is None:
+                raise ValueError(f"Unsupported Content-Encoding: {coding}")
+            self._decoders.append(decoder())
+
+    def decompress(self, data: bytes) -> bytes:
+        for decoder in self._decoders:
+            data = decoder.decompress(data)
+        return data
+
+    def flush(self) -> bytes:
+        data = b""
+        for decoder in self._decoders:
+            data = (decoder.decompress(data) if data else b"") + decoder.flush()
+        return data
+
+
+class StreamingPageParser(HtmlExtractionMixin):
+    """Company page extraction fed with raw response chunks as they arrive
+
+    ``feed`` decodes a chunk, tokenizes it and returns the ``(title,
+    section)`` pairs of the div.rc sections it completed; ``close`` returns
+    the full ``RcSections``, the same the ``stream`` engine extracts from
+    the whole page. With a ``selection``, ``feed`` returns only sections
+    that can change its result, with only the requested fields filled in,
+    and ``close`` applies the selection to them. ``digest`` is the
+    ``content_hash`` of the decoded body.
+    ``timings`` add up time spent per stage, as in
+    ``parse_company_page_timed``.
+    """
+
+    parser_engine = "stream"
+
+    def __init__(self, content_encoding: Optional[str] = None, selection: Optional[Selection] = None):
+        self._decoder = ContentDecoder(content_encoding)
+        self._text = codecs.getincrementaldecoder('utf-8')()
+        self._hash = content_hasher()
+        self._parser = RcSectionStreamParser(selection)
+        self._selection = selection
+        self._sections: Dict[str, RcSection] = {}
+        self.size = 0
+        self.timings = {'decode': 0.0, 'parse': 0.0, 'extract': 0.0}
+
+    @property
+    def digest(self) -> str:
+        return self._hash.hexdigest()
+
+    def _release(self, final: bool = False) -> List[Tuple[str, RcSection]]:
+        started = time.perf_counter()
+        completed = []
+        for raw_section in self._parser.completed_sections(final):
+            title = add_rc_section(self._sections, raw_section, self._clean_text)
+            if title is not None:
+                completed.append((title, self._sections[title]))
+        self.timings['extract'] += time.perf_counter() - started
+        return completed
+
+    def _parse(self, data: bytes, final: bool = False) -> List[Tuple[str, RcSection]]:
+        started = time.perf_counter()
+        self._hash.update(data)
+        self.size += len(data)
+        text = self._text.decode(data, final)
+        self.timings['decode'] += time.perf_counter() - started
+
+        # Tokenize in bounded steps, however much a chunk decompressed to,
+        # handing finished sections over between steps
+        completed = []
+        for start in range(0, len(text), STREAM_CHUNK_SIZE):
+            started = time.perf_counter()
+            self._parser.feed(text[start:start + STREAM_CHUNK_SIZE])
+            self.timings['parse'] += time.perf_counter() - started
+            completed += self._release()
+        if final:
+            started = time.perf_counter()
+            self._parser.close()
+            self.timings['parse'] += time.perf_counter() - started
+            completed += self._release(final=True)
+        return completed
+
+    def feed(self, chunk: bytes) -> List[Tuple[str, RcSection]]:
+        """Consume one chunk of the raw (still encoded) body"""
+        started = time.perf_counter()
+        data = self._decoder.decompress(chunk)
+        self.timings['decode'] += time.perf_counter() - started
+        return self._parse(data)
+
+    def close(self) -> RcSections:
+        """Finish the body and return the sections"""
+        started = time.perf_counter()
+        data = self._decoder.flush()
+        self.timings['decode'] += time.perf_counter() - started
+        self._parse(data, final=True)
+        if self._selection is not None:
+            return self._selection.apply(RcSections(self._sections))
+        return RcSections(self._sections)
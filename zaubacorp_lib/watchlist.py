@@ -0,0 +1,323 @@
+# ============================================================================
+# zaubacorp_lib/watchlist.py
+# ============================================================================
+
+"""
+Watchlist of companies whose rc_sections are tracked between refreshes.
+
+Each refresh stores a digest of the page's rc_sections JSON; a snapshot is
+only decoded and diffed when that digest changed, so an unchanged company
+costs one hash comparison. Detected changes are appended to a numbered log
+that consumers read with ``changes(since=<last sequence seen>)``.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from .models import CompanyData
+from .sections import RcRow, RcSection, RcSections, RcTable, rc_sections_json
+
+
+@dataclass
+class TableChange:
+    """Rows added to, removed from or changed in one table
+
+    Key/value rows whose key is present on both sides with a different
+    value are reported in ``changed_rows`` as ``{key, old, new}``.
+    """
+    caption: str
+    change: str  # added, removed or modified
+    added_rows: List[Dict[str, str]] = field(default_factory=list)
+    removed_rows: List[Dict[str, str]] = field(default_factory=list)
+    changed_rows: List[Dict[str, str]] = field(default_factory=list)
+
+    def to_dict(self) -> Dict:
+        return {
+            'caption': self.caption,
+            'change': self.change,
+            'added_rows': self.added_rows,
+            'removed_rows': self.removed_rows,
+            'changed_rows': self.changed_rows
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "TableChange":
+        return cls(**data)
+
+
+@dataclass
+class SectionChange:
+    title: str
+    change: str  # added, removed or modified
+    added_descriptions: List[str] = field(default_factory=list)
+    removed_descriptions: List[str] = field(default_factory=list)
+    tables: List[TableChange] = field(default_factory=list)
+
+    def to_dict(self) -> Dict:
+        return {
+            'title': self.title,
+            'change': self.change,
+            'added_descriptions': self.added_descriptions,
+            'removed_descriptions': self.removed_descriptions,
+            'tables': [table.to_dict() for table in self.tables]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "SectionChange":
+        return cls(**{**data, 'tables': [TableChange.from_dict(table) for table in data['tables']]})
+
+
+@dataclass
+class CompanyChanges:
+    """Everything that changed on one company page between two refreshes"""
+    sequence: int
+    company_id: str
+    detected_at: str
+    sections: List[SectionChange]
+
+    def to_dict(self) -> Dict:
+        return {
+            'sequence': self.sequence,
+            'company_id': self.company_id,
+            'detected_at': self.detected_at,
+            'sections': [section.to_dict() for section in self.sections]
+        }
+
+
+def _multiset_diff(old: Iterable, new: Iterable) -> Tuple[List, List]:
+    """(removed, added) items, counting duplicates and keeping each side's order"""
+    old = list(old)
+    new = list(new)
+    surplus_old = Counter(old)
+    surplus_old.subtract(new)
+    surplus_new = Counter(new)
+    surplus_new.subtract(old)
+
+    def take(items, surplus):
+        taken = []
+        for item in items:
+            if surplus[item] > 0:
+                surplus[item] -= 1
+                taken.append(item)
+        return taken
+
+    return take(old, surplus_old), take(new, surplus_new)
+
+
+def _diff_rows(old_rows: Tuple[RcRow, ...], new_rows: Tuple[RcRow, ...]) -> Tuple[List, List, List]:
+    """(added, removed, changed) rows; a key/value row with a new value counts as changed"""
+    removed, added = _multiset_diff((row.cells for row in old_rows), (row.cells for row in new_rows))
+
+    def single_keys(rows):
+        keys = Counter(cells[0][0] for cells in rows if len(cells) == 1)
+        return {key for key, count in keys.items() if count == 1}
+
+    paired = single_keys(removed) & single_keys(added)
+    old_values = {cells[0][0]: cells[0][1] for cells in removed if len(cells) == 1 and cells[0][0] in paired}
+    changed = [{'key': cells[0][0], 'old': old_values[cells[0][0]], 'new': cells[0][1]}
+               for cells in added if len(cells) == 1 and cells[0][0] in paired]
+    return ([dict(cells) for cells in added if len(cells) != 1 or cells[0][0] not in paired],
+            [dict(cells) for cells in removed if len(cells) != 1 or cells[0][0] not in paired],
+            changed)
+
+
+def _tables_by_caption(tables: Optional[Tuple[RcTable, ...]]) -> Dict[Tuple[str, int], RcTable]:
+    """Tables keyed by (caption, occurrence), so repeated captions pair up in order"""
+    keyed = {}
+    seen = Counter()
+    for table in tables or ():
+        keyed[(table.caption, seen[table.caption])] = table
+        seen[table.caption] += 1
+    return keyed
+
+
+def _diff_tables(old_tables, new_tables) -> List[TableChange]:
+    old = _tables_by_caption(old_tables)
+    new = _tables_by_caption(new_tables)
+    changes = []
+    for key, table in new.items():
+        previous = old.get(key)
+        if previous is None:
+            changes.append(TableChange(table.caption, 'added',
+                                       added_rows=[row.to_dict() for row in table.rows]))
+        elif previous.rows != table.rows:
+            added, removed, changed = _diff_rows(previous.rows, table.rows)
+            changes.append(TableChange(table.caption, 'modified', added, removed, changed))
+    for key, table in old.items():
+        if key not in new:
+            changes.append(TableChange(table.caption, 'removed',
+                                       removed_rows=[row.to_dict() for row in table.rows]))
+    return changes
+
+
+def _diff_section(title: str, old: Optional[RcSection], new: Optional[RcSection]) -> SectionChange:
+    change = 'added' if old is None else 'removed' if new is None else 'modified'
+    removed, added = _multiset_diff(old.descriptions or () if old else (),
+                                    new.descriptions or () if new else ())
+    return SectionChange(title, change, added, removed,
+                         _diff_tables(old.tables if old else None, new.tables if new else None))
+
+
+def diff_rc_sections(old: Mapping, new: Mapping) -> List[SectionChange]:
+    """Per-section and per-table-row differences between two rc_sections
+
+    Both sides may be plain dicts or ``RcSections``; unchanged sections are
+    skipped by comparing their compact forms.
+    """
+    old_sections = dict(RcSections.from_dict(old).compact_items())
+    new_sections = dict(RcSections.from_dict(new).compact_items())
+    changes = []
+    for title, section in new_sections.items():
+        previous = old_sections.get(title)
+        if previous != section:
+            changes.append(_diff_section(title, previous, section))
+    for title, section in old_sections.items():
+        if title not in new_sections:
+            changes.append(_diff_section(title, section, None))
+    return changes
+
+
+class Watchlist:
+    """Companies to poll, their last rc_sections and a log of what changed
+
+    ``path`` persists everything to SQLite; without it the watchlist lives
+    in memory. ``record`` is what the clients' ``refresh_watchlist`` calls
+    with each fresh ``CompanyData``; the first successful snapshot of a
+    company is its baseline and produces no change.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        with self._lock, self._conn:
+            if path is not None:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS watchlist "
+                "(company_id TEXT PRIMARY KEY, added_at REAL NOT NULL, checked_at REAL, "
+                "digest TEXT, snapshot BLOB)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS changes "
+                "(sequence INTEGER PRIMARY KEY AUTOINCREMENT, company_id TEXT NOT NULL, "
+                "detected_at TEXT NOT NULL, sections TEXT NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS changes_company ON changes (company_id, sequence)")
+
+    def add(self, company_ids: Iterable[str]) -> int:
+        """Start watching companies; returns how many were not watched yet"""
+        now = time.time()
+        with self._lock, self._conn:
+            cursor = self._conn.executemany(
+                "INSERT OR IGNORE INTO watchlist (company_id, added_at) VALUES (?, ?)",
+                [(company_id, now) for company_id in company_ids])
+            return cursor.rowcount
+
+    def remove(self, company_ids: Iterable[str]) -> int:
+        """Stop watching companies and drop their snapshots; their logged changes are kept"""
+        with self._lock, self._conn:
+            cursor = self._conn.executemany(
+                "DELETE FROM watchlist WHERE company_id = ?",
+                [(company_id,) for company_id in company_ids])
+            return cursor.rowcount
+
+    def company_ids(self) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT company_id FROM watchlist ORDER BY added_at, company_id").fetchall()
+        return [row[0] for row in rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM watchlist").fetchone()[0]
+
+    def __contains__(self, company_id) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM watchlist WHERE company_id = ?", (company_id,)).fetchone() is not None
+
+    def record(self, company_data: CompanyData) -> Optional[CompanyChanges]:
+        """Store a fresh snapshot; returns the logged changes, or None if nothing changed
+
+        Failed lookups and companies that are not watched are ignored.
+        """
+        if not company_data.success:
+            return None
+        text = rc_sections_json(company_data.rc_sections)
+        digest = hashlib.sha1(text.encode('utf-8')).hexdigest()
+        now = time.time()
+
+        # Held throughout so concurrent refreshes of one company diff in turn
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT digest, snapshot FROM watchlist WHERE company_id = ?",
+                (company_data.company_id,)).fetchone()
+            if row is None:
+                return None
+            old_digest, snapshot = row
+            if old_digest == digest:
+                with self._conn:
+                    self._conn.execute("UPDATE watchlist SET checked_at = ? WHERE company_id = ?",
+                                       (now, company_data.company_id))
+                return None
+
+            sections = []
+            if snapshot is not None:
+                old_sections = json.loads(zlib.decompress(snapshot).decode('utf-8'))
+                sections = diff_rc_sections(old_sections, company_data.rc_sections)
+
+            detected_at = time.strftime('%Y-%m-%d %H:%M:%S')
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE watchlist SET checked_at = ?, digest = ?, snapshot = ? WHERE company_id = ?",
+                    (now, digest, zlib.compress(text.encode('utf-8')), company_data.company_id))
+                if not sections:
+                    return None
+                cursor = self._conn.execute(
+                    "INSERT INTO changes (company_id, detected_at, sections) VALUES (?, ?, ?)",
+                    (company_data.company_id, detected_at,
+                     json.dumps([section.to_dict() for section in sections], ensure_ascii=False)))
+        return CompanyChanges(cursor.lastrowid, company_data.company_id, detected_at, sections)
+
+    def changes(self,
+                since: int = 0,
+                company_id: Optional[str] = None,
+                limit: Optional[int] = 100) -> List[CompanyChanges]:
+        """Logged changes with a sequence above ``since``, oldest first
+
+        Pass the last ``sequence`` seen as ``since`` to read only what is new.
+        """
+        query = "SELECT sequence, company_id, detected_at, sections FROM changes WHERE sequence > ?"
+        params: list = [since]
+        if company_id is not None:
+            query += " AND company_id = ?"
+            params.append(company_id)
+        query += " ORDER BY sequence"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [
+            CompanyChanges(sequence, company_id, detected_at,
+                           [SectionChange.from_dict(section) for section in json.loads(sections)])
+            for sequence, company_id, detected_at, sections in rows
+        ]
+
+    def purge_changes(self, before: int) -> int:
+        """Delete logged changes with a sequence below ``before``"""
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM changes WHERE sequence < ?", (before,)).rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()